@@ -28,13 +28,29 @@ import json
 import time
 import re
 import asyncio
-import google.generativeai as genai
-import json as _json
 from datetime import datetime
+from functools import partial
 from urllib.parse import urlparse
 from cookie_handler import CookieBannerHandler, apply_cookie_handling
-import psycopg2
-import os
+from apply_link_index import get_shared_index
+from host_scheduler import HostRateLimiter
+from job_enrichment import extract_and_clean_job_details, enrich_job_with_gemini, enrich_jobs_with_gemini, build_pending_job
+from job_pipeline import JobPipeline
+from gemini_client import configure_shared_gemini_client
+from enrichment_backends import configure_shared_enrichment_backend, close_shared_enrichment_backend
+from enrichment_cache import configure_shared_enrichment_cache, get_shared_enrichment_cache, DEFAULT_ENRICHMENT_CACHE_PATH
+from local_extractor import EXTRACTION_STATS
+from detail_fetcher import DetailFetcher
+from detail_cache import DetailCache, DEFAULT_DETAIL_CACHE_DIR
+from response_capture import ResponseCapture
+from ats_adapters import HttpTransport, detect_ats_adapter
+from resource_blocker import ResourceBlockingPolicy, BLOCKING_STATS, install_resource_blocking, remove_resource_blocking
+from checkpoint import CheckpointJournal, DEFAULT_CHECKPOINT_DIR
+from result_sink import JsonlResultSink
+import queue
+import hashlib
+import threading
+from concurrent.futures import Future
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -85,54 +101,72 @@ COMPANIES_CONFIG_FILE = "Final_Selectors.json"  # Path to the JSON file with com
 GLOBAL_CONFIG = {
     'max_jobs_per_company': 100000,  # Maximum jobs per company
     'headless': True,               # Set to True to run browser in background  
-    'delay_between_companies': 2,   # Seconds to wait between companies
+    'host_min_interval': 2,         # Seconds between requests to the same registrable domain
+    'host_burst': 1,                # Requests allowed back-to-back per domain after idling
+    'host_rate_overrides': {},      # Per-domain min interval, e.g. {'myworkdayjobs.com': 5}
     'max_pages_fallback': 5000,       # Fallback max pages if not specified
     'scroll_pause': 2,              # Seconds to wait between scrolls
     'use_extension': False,         # Use browser extension for cookie handling
     'cookie_strategy': 'hide_and_accept',  # Cookie handling strategy: hide_only, click_only, hide_and_accept, hide_and_reject
+    'ats_adapters': True,           # List Workday, Eightfold, Greenhouse, Lever and Oracle HCM sites through their APIs
+    'resource_blocking': True,      # Abort images, media, fonts and trackers; False, or a dict of block_/allow_ types and domains
+    'max_workers': 4,               # Number of companies scraped concurrently (one browser per worker)
+    'detail_concurrency': 4,        # Job detail pages crawled at once across all workers
+    'detail_fetch': 'auto',         # Detail pages: auto (HTTP first, browser fallback), http or browser; per-company override in selectors
+    'detail_min_chars': 400,        # HTTP-fetched detail text shorter than this falls back to the browser
+    'detail_http_connections': 20,  # Connection limit of the pooled HTTP client for detail pages
+    'detail_cache_dir': DEFAULT_DETAIL_CACHE_DIR,  # On-disk cache of fetched detail pages (None disables it)
+    'detail_cache_ttl': 7 * 24 * 3600,  # Seconds a cached detail page is used before it is revalidated
+    'detail_cache_max_mb': 500,     # Size bound of the detail cache; least recently used pages are evicted
+    'detail_token_budget': 1500,    # Tokens of job detail text sent to Gemini; the most relevant sections are kept
+    'enrichment_backend': 'gemini', # gemini; stub (local server, no key or spend) or rules (no LLM) for offline benchmarks
+    'stub_backend': {'latency': 0.8, 'error_rate': 0.02, 'throttle_rate': 0.05, 'seed': 1234},  # Stub answers; 'url' reuses a running stub
+    'enrichment_mode': 'inline',    # inline: Gemini during the scrape; deferred: store jobs as pending for enrichment_worker.py
+    'enrichment_batch_size': 8,     # Jobs per batched Gemini request (1 = one request per job)
+    'enrichment_batch_token_budget': 12000,  # Estimated input tokens per batched request; smaller batches when jobs are long
+    'enrichment_batch_linger': 2.0, # Seconds the batch collector waits for more jobs to fill a batch
+    'enrichment_concurrency': 8,    # Gemini requests in flight at once across all workers
+    'gemini_rpm': 1000,             # Gemini requests per minute across all keys (GEMINI_KEYS="key1,key2" rotates keys)
+    'gemini_tpm': 1000000,          # Gemini input + output tokens per minute across all keys
+    'gemini_max_retries': 5,        # Retries with jittered backoff for 429, 5xx and network errors
+    'enrichment_cache_path': DEFAULT_ENRICHMENT_CACHE_PATH,  # SQLite cache of Gemini results per job content (None disables it)
+    'enrichment_cache_ttl': 30 * 24 * 3600,  # Seconds a cached enrichment result is reused
+    'local_extraction': True,       # Extract fields with local rules first; Gemini is asked only for the rest
+    'local_extraction_min_confidence': 0.8,  # Local values below this confidence are left to Gemini
+    'pipeline_queue_size': 20,      # Capacity of each queue between pipeline stages
+    'checkpoint_dir': DEFAULT_CHECKPOINT_DIR,  # Where crash-safe session journals are written
+    'result_format': 'jsonl',       # Results file format: json (one document), jsonl or jsonl.gz (streamed)
+    'batch_dom_extraction': True,   # Read all job cards of a page in one page.evaluate() instead of per-card calls
+    'apply_link_index_max_age': 3600,  # Seconds before the in-memory apply_link index is reloaded
 }
 
-# Database connection for duplicate checking
-def get_db_connection():
-    """Get database connection using environment variables"""
-    try:
-        database_url = os.getenv('DATABASE_URL')
-        if not database_url:
-            safe_print("⚠️ DATABASE_URL not found in environment variables")
-            return None
-        
-        conn = psycopg2.connect(database_url)
-        return conn
-    except Exception as e:
-        safe_print(f"⚠️ Database connection failed: {e}")
-        return None
+# Shared per-host politeness budget for listing navigation and detail fetches
+HOST_SCHEDULER = HostRateLimiter(
+    min_interval=GLOBAL_CONFIG['host_min_interval'],
+    burst=GLOBAL_CONFIG['host_burst'],
+    overrides=GLOBAL_CONFIG['host_rate_overrides']
+)
+
+# JSON client of the ATS adapters, paced by the same per-host budget
+ATS_TRANSPORT = HttpTransport(HOST_SCHEDULER)
+
+# Request counters of the enrichment backend's client, kept after it is closed for the session summary
+GEMINI_CLIENT_STATS = {}
 
 def check_apply_link_exists(apply_link):
-    """Check if apply_link already exists in the database"""
+    """Check if apply_link is already known: saved in the database or accepted earlier in this session"""
     if not apply_link or apply_link == 'N/A':
         return False
     
-    try:
-        conn = get_db_connection()
-        if not conn:
-            # If database connection fails, don't skip jobs
-            safe_print("⚠️ Database unavailable, proceeding without duplicate check")
-            return False
-        
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT COUNT(*) FROM jobs WHERE apply_link = %s", (apply_link,))
-            count = cursor.fetchone()[0]
-            conn.close()
-            
-            if count > 0:
-                safe_print(f"🔍 Duplicate apply_link found, skipping job: {apply_link}")
-                return True
-            return False
-            
-    except Exception as e:
-        safe_print(f"⚠️ Error checking apply_link in database: {e}")
-        # If database check fails, don't skip the job
-        return False
+    # Known links are loaded once into memory instead of querying the database per card
+    if apply_link in get_shared_index(GLOBAL_CONFIG['apply_link_index_max_age']):
+        safe_print(f"🔍 Duplicate apply_link found, skipping job: {apply_link}")
+        return True
+    return False
+
+def remember_apply_link(apply_link):
+    """Record an accepted job so later cards with the same link are skipped"""
+    get_shared_index(GLOBAL_CONFIG['apply_link_index_max_age']).add(apply_link)
 
 def aggregate_stats(overall_stats, page_stats):
     """Aggregate statistics from individual page extraction"""
@@ -232,6 +266,31 @@ def load_companies_config(filename):
         safe_print(f"❌ Error loading {filename}: {e}")
         return None
 
+def parse_shard_spec(spec):
+    """Parse a shard spec like '0/4' into (index, count); shard indexes are 0-based"""
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard spec '{spec}', expected i/N (e.g. 0/4)")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard spec '{spec}', index must be between 0 and {count - 1}")
+    return index, count
+
+def select_shard(companies, shard_index, shard_count):
+    """Pick this shard's deterministic subset of companies
+
+    Companies are assigned by a stable hash of their name and URL, so every
+    process (on any machine) agrees on the split and adding a company to the
+    file does not reshuffle all the others.
+    """
+    selected = []
+    for company in companies:
+        key = f"{company.get('company', company.get('company_name', ''))}|{company.get('url', '')}"
+        bucket = int(hashlib.sha1(key.encode('utf-8')).hexdigest(), 16) % shard_count
+        if bucket == shard_index:
+            selected.append(company)
+    return selected
+
 def normalize_company_config(company_config):
     """Normalize company configuration to match expected format"""
     config = company_config.copy()
@@ -267,6 +326,9 @@ def normalize_company_config(company_config):
         'max_pages': config.get('max_pages', GLOBAL_CONFIG['max_pages_fallback']),
         'scroll_pause': GLOBAL_CONFIG['scroll_pause'],
         'max_jobs': GLOBAL_CONFIG['max_jobs_per_company'],
+        'detail_token_budget': GLOBAL_CONFIG['detail_token_budget'],
+        'local_extraction': GLOBAL_CONFIG['local_extraction'],
+        'local_extraction_min_confidence': GLOBAL_CONFIG['local_extraction_min_confidence'],
         'headless': GLOBAL_CONFIG['headless']
     }
 
@@ -360,6 +422,7 @@ def handle_url_param_pagination(page, config, page_number):
             new_url = f"{current_url}{separator}{param}={next_value}"
 
         print(f"   ✓ Navigating to: {param}={next_value}")
+        HOST_SCHEDULER.acquire(new_url)
         page.goto(new_url, wait_until='domcontentloaded', timeout=30000)
         page.wait_for_timeout(3000)
 
@@ -396,6 +459,7 @@ def handle_button_pagination(page, config, current_page):
             return False
             
         print(f"Clicking next page button (Page {current_page + 1})")
+        HOST_SCHEDULER.acquire(page.url)
         next_button.click()
         
         # Wait for new job cards to load instead of networkidle
@@ -545,37 +609,159 @@ def parse_metadata(metadata_text):
 
     return location, posted_date
 
-def extract_and_clean_job_details(job_data, config):
-    """Extract and clean job details for better Gemini processing"""
-    cleaned_data = {
-        'title': job_data.get('title', 'N/A'),
-        'company': job_data.get('company', config.get('company_name', 'N/A')),
-        'location': job_data.get('location', 'N/A'),
-        'posted_date': job_data.get('posted_date', 'N/A'),
-        'apply_link': job_data.get('apply_link', 'N/A'),
-        'description': job_data.get('description', 'N/A'),
-        'job_details_info': job_data.get('job_details_info', 'N/A'),
-        'source_url': config.get('url', 'N/A')
+# Reads every job card of the listing page in a single round-trip. Selectors
+# are plain CSS (querySelector); textContent is trimmed like text_content().strip()
+# on the Python side. A missing element is null, an unused selector undefined.
+BATCH_CARD_EXTRACTION_JS = """
+(selectors) => {
+    const readText = (card, selector) => {
+        if (!selector) return undefined;
+        const element = card.querySelector(selector);
+        return element ? (element.textContent || '').trim() : null;
+    };
+    return Array.from(document.querySelectorAll(selectors.card)).map((card) => {
+        let href = null;
+        if (selectors.link) {
+            const linkElement = card.querySelector(selectors.link);
+            href = linkElement ? linkElement.getAttribute('href') : null;
+        } else {
+            href = card.getAttribute('href');
+        }
+        return {
+            title: readText(card, selectors.title),
+            location: readText(card, selectors.location),
+            posted: readText(card, selectors.posted),
+            description: readText(card, selectors.description),
+            metadata: readText(card, selectors.metadata),
+            href: href
+        };
+    });
+}
+"""
+
+def extract_cards_batch(page, config):
+    """Return the raw fields of every job card on the page from one page.evaluate() call"""
+    selectors = {
+        'card': config['card_selector'],
+        'title': config.get('title_selector'),
+        'location': config.get('location_selector'),
+        'posted': config.get('posted_selector'),
+        'description': config.get('description_selector'),
+        'metadata': config.get('metadata_selector') if config.get('use_metadata_parsing', False) else None,
+        'link': config.get('link_selector')
     }
+    return page.evaluate(BATCH_CARD_EXTRACTION_JS, selectors)
+
+def apply_parsed_metadata(job_data, metadata_text):
+    """Fill location, posted date (and experience/skills when available) from a card's metadata text"""
+    parsed = parse_metadata(metadata_text)
+    # Handle both 2-value and 4-value returns
+    if isinstance(parsed, tuple) and len(parsed) == 4:
+        parsed_location, parsed_posted_date, parsed_experience, parsed_skills = parsed
+        job_data['location'] = parsed_location
+        job_data['posted_date'] = parsed_posted_date
+        job_data['experience'] = parsed_experience
+        job_data['skills'] = parsed_skills
+    elif isinstance(parsed, tuple) and len(parsed) == 2:
+        parsed_location, parsed_posted_date = parsed
+        job_data['location'] = parsed_location
+        job_data['posted_date'] = parsed_posted_date
+    else:
+        job_data['location'] = 'N/A'
+        job_data['posted_date'] = 'N/A'
+    job_data['metadata_raw'] = metadata_text  # Store raw metadata for debugging
+
+def build_job_from_card_fields(fields, config):
+    """Turn one card's raw fields from extract_cards_batch() into job data, like the per-card path does"""
+    def text_or_na(value):
+        return value if value is not None else 'N/A'
+    
+    job_data = {'title': text_or_na(fields.get('title')) if config['title_selector'] else 'N/A'}
+    job_data['company'] = config.get('company_name', 'N/A')
+    
+    if config.get('use_metadata_parsing', False) and config.get('metadata_selector'):
+        if fields.get('metadata') is not None:
+            apply_parsed_metadata(job_data, fields['metadata'])
+        else:
+            job_data['location'] = 'N/A'
+            job_data['posted_date'] = 'N/A'
+            job_data['metadata_raw'] = 'N/A'
     
-    # Clean up description and job details
-    if cleaned_data['description'] != 'N/A':
-        # Remove extra whitespace and normalize
-        cleaned_data['description'] = ' '.join(cleaned_data['description'].split())
+    # Individual selectors are applied after metadata parsing, as in the per-card path
+    job_data['location'] = text_or_na(fields.get('location')) if config['location_selector'] else 'N/A'
+    job_data['posted_date'] = text_or_na(fields.get('posted')) if config['posted_selector'] else 'N/A'
+    job_data['description'] = text_or_na(fields.get('description')) if config.get('description_selector') else 'N/A'
     
-    if cleaned_data['job_details_info'] != 'N/A':
-        # Clean up job details info
-        cleaned_data['job_details_info'] = ' '.join(cleaned_data['job_details_info'].split())
+    job_data['apply_link'] = resolve_apply_link(fields.get('href'), config)
+    return job_data
+
+def resolve_apply_link(href, config):
+    """Turn a card's href into an absolute apply link"""
+    if not href:
+        return 'N/A'
     
-    # Extract additional fields if available
-    additional_fields = ['job_id', 'department', 'employment_type', 'experience_level', 
-                        'remote_work', 'salary', 'deadline', 'requirements', 'benefits', 'skills']
+    company_name = config.get('company_name', '').lower()
+    # Special handling for Google careers
+    if company_name == 'google':
+        # Handle both '/jobs' and 'jobs/' at the start
+        if href.startswith('/jobs'):
+            return "https://www.google.com/about/careers/applications" + href
+        elif href.startswith('jobs/'):
+            return "https://www.google.com/about/careers/applications/" + href
     
-    for field in additional_fields:
-        if field in job_data and job_data[field] not in ['N/A', None, '']:
-            cleaned_data[field] = job_data[field]
+    if href.startswith('/'):
+        from urllib.parse import urljoin, urlparse
+        parsed_url = urlparse(config['url'])
+        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        return urljoin(base_url, href)
+    return href
+
+def submit_job_card(job_data, index, config, batch, checkpoint=None, page_number=None):
+    """
+    Dedupe one extracted card and hand it to the pipeline batch.
+    Returns 'duplicate', 'restored' or 'queued'.
+    """
+    # Check if apply_link already exists in database - skip if duplicate
+    if check_apply_link_exists(job_data.get('apply_link')):
+        safe_print(f"⏭️ Skipping duplicate job {index + 1}: {job_data.get('title', 'Unknown')} - apply_link already exists")
+        return 'duplicate'
     
-    return cleaned_data
+    # Skip jobs already enriched before a crash; they are restored from the checkpoint
+    if checkpoint and checkpoint.is_job_enriched(job_data.get('apply_link')):
+        return 'restored'
+        
+    # Add standard fields with N/A defaults (but don't overwrite existing values)
+    standard_fields = {
+        'salary': 'N/A',
+        'employment_type': 'N/A', 
+        'experience_level': 'N/A',
+        'department': 'N/A',
+        'requirements': 'N/A',
+        'benefits': 'N/A',
+        'deadline': 'N/A',
+        'job_id': 'N/A',
+        'tags': 'N/A',
+        'skills': 'N/A',
+        'remote_work': 'N/A',
+        'scraped_at': datetime.now().isoformat(),
+        'source_url': config['url']
+    }
+
+    # Only add fields that don't already exist
+    for key, value in standard_fields.items():
+        if key not in job_data:
+            job_data[key] = value
+
+    # Ensure description and posted_date exist if not set by metadata parsing
+    if 'description' not in job_data:
+        job_data['description'] = 'N/A'
+    if 'posted_date' not in job_data:
+        job_data['posted_date'] = 'N/A'
+    
+    # Detail crawl and Gemini enrichment happen downstream in the pipeline
+    batch.submit(job_data, config, page_number)
+    remember_apply_link(job_data.get('apply_link'))
+    return 'queued'
 
 def handle_dynamic_cookies(page, cookie_handler=None):
     """Handle cookies that may appear dynamically during scraping"""
@@ -591,13 +777,72 @@ def handle_dynamic_cookies(page, cookie_handler=None):
             safe_print(f"   ⚠️ Dynamic cookie handling failed: {e}")
     return False
 
-def extract_job_data(page, config, existing_jobs=None, cookie_handler=None):
-    """Extract job data using the provided selectors"""
-    if existing_jobs is None:
-        existing_jobs = []
-    
-    jobs = existing_jobs.copy()
-    
+def open_detail_cache():
+    """Open the on-disk detail page cache, or None when it is disabled or unusable"""
+    if not GLOBAL_CONFIG['detail_cache_dir']:
+        return None
+    try:
+        return DetailCache(
+            GLOBAL_CONFIG['detail_cache_dir'],
+            ttl=GLOBAL_CONFIG['detail_cache_ttl'],
+            max_bytes=GLOBAL_CONFIG['detail_cache_max_mb'] * 1024 * 1024
+        )
+    except Exception as e:
+        safe_print(f"⚠️ Could not open detail cache, fetching every detail page: {e}")
+        return None
+
+def create_job_pipeline():
+    """Create the session-wide detail crawl -> enrichment -> persistence pipeline"""
+    # Detail pages go over pooled HTTP first; one warm crawl4ai browser serves the rest
+    detail_fetcher = DetailFetcher(
+        concurrency=GLOBAL_CONFIG['detail_concurrency'],
+        host_scheduler=HOST_SCHEDULER,
+        default_mode=GLOBAL_CONFIG['detail_fetch'],
+        min_chars=GLOBAL_CONFIG['detail_min_chars'],
+        http_connections=GLOBAL_CONFIG['detail_http_connections'],
+        cache=open_detail_cache(),
+        text_mode=GLOBAL_CONFIG['resource_blocking'] is not False
+    )
+    # Every enrichment thread shares one Gemini client and its rate budgets
+    configure_shared_gemini_client(
+        rpm=GLOBAL_CONFIG['gemini_rpm'],
+        tpm=GLOBAL_CONFIG['gemini_tpm'],
+        max_in_flight=GLOBAL_CONFIG['enrichment_concurrency'],
+        max_retries=GLOBAL_CONFIG['gemini_max_retries']
+    )
+    # gemini in production; the stub and rules backends measure throughput offline
+    configure_shared_enrichment_backend(
+        GLOBAL_CONFIG['enrichment_backend'],
+        **(GLOBAL_CONFIG['stub_backend'] if GLOBAL_CONFIG['enrichment_backend'] == 'stub' else {})
+    )
+    # Unchanged postings reuse their earlier Gemini result instead of a new request
+    configure_shared_enrichment_cache(GLOBAL_CONFIG['enrichment_cache_path'], ttl=GLOBAL_CONFIG['enrichment_cache_ttl'])
+    if GLOBAL_CONFIG['enrichment_mode'] == 'deferred':
+        # Scraping never waits for Gemini; enrichment_worker.py picks the pending jobs up from the database
+        return JobPipeline(
+            detail_fetcher=detail_fetcher,
+            enricher=build_pending_job,
+            detail_concurrency=GLOBAL_CONFIG['detail_concurrency'],
+            enrichment_concurrency=GLOBAL_CONFIG['enrichment_concurrency'],
+            queue_size=GLOBAL_CONFIG['pipeline_queue_size']
+        )
+    return JobPipeline(
+        detail_fetcher=detail_fetcher,
+        enricher=enrich_job_with_gemini,
+        detail_concurrency=GLOBAL_CONFIG['detail_concurrency'],
+        enrichment_concurrency=GLOBAL_CONFIG['enrichment_concurrency'],
+        queue_size=GLOBAL_CONFIG['pipeline_queue_size'],
+        # Several jobs per Gemini request; the batch size adapts to the token budget
+        batch_enricher=partial(enrich_jobs_with_gemini,
+                               token_budget=GLOBAL_CONFIG['enrichment_batch_token_budget'],
+                               max_batch_size=GLOBAL_CONFIG['enrichment_batch_size'])
+        if GLOBAL_CONFIG['enrichment_batch_size'] > 1 else None,
+        enrichment_batch_size=GLOBAL_CONFIG['enrichment_batch_size'],
+        batch_linger=GLOBAL_CONFIG['enrichment_batch_linger']
+    )
+
+def extract_job_data(page, config, batch, cookie_handler=None, page_number=None, checkpoint=None):
+    """Read job cards on the current page and submit them to the pipeline batch"""
     # Initialize statistics tracking
     stats = {
         'total_job_cards_found': 0,
@@ -608,6 +853,8 @@ def extract_job_data(page, config, existing_jobs=None, cookie_handler=None):
         'crawl4ai_errors': 0,
         'browser_closed_early': False
     }
+    queued = 0
+    restored = 0
     
     # Wait for job cards to be present instead of networkidle
     try:
@@ -615,14 +862,42 @@ def extract_job_data(page, config, existing_jobs=None, cookie_handler=None):
     except:
         print("Warning: Job cards not found, but continuing extraction")
 
+    # Read every card in one round-trip when possible
+    card_fields = None
+    if config.get('batch_dom_extraction', GLOBAL_CONFIG['batch_dom_extraction']):
+        try:
+            card_fields = extract_cards_batch(page, config)
+        except Exception as e:
+            print(f"Batch DOM extraction failed, falling back to per-card extraction: {e}")
+        if card_fields:
+            # The per-card loop checks every 10 cards; one batched read gets one check per page
+            handle_dynamic_cookies(page, cookie_handler)
+    
     # Find all job cards with error handling
     try:
-        job_cards = page.query_selector_all(config['card_selector'])
-        stats['total_job_cards_found'] = len(job_cards)
-        print(f"Found {len(job_cards)} job cards on current page")
+        job_cards = page.query_selector_all(config['card_selector']) if card_fields is None else []
+        stats['total_job_cards_found'] = len(job_cards) if card_fields is None else len(card_fields)
+        print(f"Found {stats['total_job_cards_found']} job cards on current page")
     except Exception as e:
         print(f"Error finding job cards: {e}")
-        return jobs, stats
+        return stats
+    
+    for i, fields in enumerate(card_fields or []):
+        if batch.submitted >= config['max_jobs'] and config.get('pagination_type') != 'infinite_scroll':
+            print(f"Reached maximum job limit of {config['max_jobs']}")
+            break
+        try:
+            outcome = submit_job_card(build_job_from_card_fields(fields, config), i, config, batch, checkpoint, page_number)
+        except Exception as e:
+            print(f"Error processing job card {i + 1}: {e}")
+            stats['skipped_extraction_errors'] += 1
+            continue
+        if outcome == 'duplicate':
+            stats['skipped_duplicates'] += 1
+        elif outcome == 'restored':
+            restored += 1
+        else:
+            queued += 1
 
     # Extract data from all job cards 
     browser_closed = False
@@ -636,7 +911,7 @@ def extract_job_data(page, config, existing_jobs=None, cookie_handler=None):
             handle_dynamic_cookies(page, cookie_handler)
             
         # Stop if we've reached max_jobs total (but let infinite scroll get all available jobs first)
-        if len(jobs) >= config['max_jobs'] and config.get('pagination_type') != 'infinite_scroll':
+        if batch.submitted >= config['max_jobs'] and config.get('pagination_type') != 'infinite_scroll':
             print(f"Reached maximum job limit of {config['max_jobs']}")
             break
 
@@ -684,23 +959,7 @@ def extract_job_data(page, config, existing_jobs=None, cookie_handler=None):
                 try:
                     metadata_element = card.query_selector(config['metadata_selector'])
                     if metadata_element:
-                        metadata_text = metadata_element.text_content().strip()
-                        parsed = parse_metadata(metadata_text)
-                        # Handle both 2-value and 4-value returns
-                        if isinstance(parsed, tuple) and len(parsed) == 4:
-                            parsed_location, parsed_posted_date, parsed_experience, parsed_skills = parsed
-                            job_data['location'] = parsed_location
-                            job_data['posted_date'] = parsed_posted_date
-                            job_data['experience'] = parsed_experience
-                            job_data['skills'] = parsed_skills
-                        elif isinstance(parsed, tuple) and len(parsed) == 2:
-                            parsed_location, parsed_posted_date = parsed
-                            job_data['location'] = parsed_location
-                            job_data['posted_date'] = parsed_posted_date
-                        else:
-                            job_data['location'] = 'N/A'
-                            job_data['posted_date'] = 'N/A'
-                        job_data['metadata_raw'] = metadata_text  # Store raw metadata for debugging
+                        apply_parsed_metadata(job_data, metadata_element.text_content().strip())
                     else:
                         job_data['location'] = 'N/A'
                         job_data['posted_date'] = 'N/A'
@@ -812,315 +1071,89 @@ def extract_job_data(page, config, existing_jobs=None, cookie_handler=None):
             if browser_closed:
                 break
 
-            if href:
-                company_name = config.get('company_name', '').lower()
-                # Special handling for Google careers
-                if company_name == 'google':
-                    # Handle both '/jobs' and 'jobs/' at the start
-                    if href.startswith('/jobs'):
-                        job_data['apply_link'] = "https://www.google.com/about/careers/applications" + href
-                    elif href.startswith('jobs/'):
-                        job_data['apply_link'] = "https://www.google.com/about/careers/applications/" + href
-                    elif href.startswith('/'):
-                        from urllib.parse import urljoin, urlparse
-                        parsed_url = urlparse(config['url'])
-                        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-                        job_data['apply_link'] = urljoin(base_url, href)
-                    else:
-                        job_data['apply_link'] = href
-                else:
-                    if href.startswith('/'):
-                        from urllib.parse import urljoin, urlparse
-                        parsed_url = urlparse(config['url'])
-                        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-                        job_data['apply_link'] = urljoin(base_url, href)
-                    else:
-                        job_data['apply_link'] = href
-            else:
-                job_data['apply_link'] = 'N/A'
-                
-            # Check if apply_link already exists in database - skip if duplicate
-            if check_apply_link_exists(job_data.get('apply_link')):
-                stats['skipped_duplicates'] += 1
-                safe_print(f"⏭️ Skipping duplicate job {i + 1}: {job_data.get('title', 'Unknown')} - apply_link already exists")
-                continue
-                
-            # Visit job details page and scrape its HTML with better error handling
-            job_details_info = 'N/A'
-            apply_link = job_data.get('apply_link', None)
-            if apply_link and apply_link != 'N/A':
-                try:
-                    import asyncio
-                    from crawl4ai import AsyncWebCrawler
-                    from crawl4ai.content_filter_strategy import BM25ContentFilter
-                    from crawl4ai.async_configs import CrawlerRunConfig
-                    from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
-                    async def crawl_job_details(url):
-                        bm25_filter = BM25ContentFilter(
-                            user_query="Job Description, Responsibilities, Skills, Requirements",
-                            bm25_threshold=1.2,
-                            language="english")
-
-                        markdowngen = DefaultMarkdownGenerator(content_filter=bm25_filter, options={"ignore_links": True, "images": True, "code_blocks": True})
-                        run_config = CrawlerRunConfig(markdown_generator=markdowngen, magic=True,page_timeout=50000, simulate_user=True, override_navigator=True)
-                        async with AsyncWebCrawler() as crawler:
-                            result = await crawler.arun(url=url, config=run_config)
-                            return result.markdown
-                    try:
-                        loop = asyncio.get_event_loop()
-                        if loop.is_running():
-                            import nest_asyncio
-                            nest_asyncio.apply()
-                            job_details_info = loop.run_until_complete(crawl_job_details(apply_link))
-                        else:
-                            job_details_info = loop.run_until_complete(crawl_job_details(apply_link))
-                    except Exception as e:
-                        print(f"Error running crawl4ai event loop for job {i+1}: {e}")
-                        stats['crawl4ai_errors'] += 1
-                        job_details_info = 'N/A'
-                except Exception as e:
-                    print(f"Error scraping job details with crawl4ai for job {i+1}: {e}")
-                    stats['crawl4ai_errors'] += 1
-                    job_details_info = 'N/A'
-            job_data['job_details_info'] = job_details_info
-
-            
-
-            # Add standard fields with N/A defaults (but don't overwrite existing values)
-            standard_fields = {
-                'salary': 'N/A',
-                'employment_type': 'N/A', 
-                'experience_level': 'N/A',
-                'department': 'N/A',
-                'requirements': 'N/A',
-                'benefits': 'N/A',
-                'deadline': 'N/A',
-                'job_id': 'N/A',
-                'tags': 'N/A',
-                'skills': 'N/A',
-                'remote_work': 'N/A',
-                'scraped_at': datetime.now().isoformat(),
-                'source_url': config['url']
-            }
-
-            # Only add fields that don't already exist
-            for key, value in standard_fields.items():
-                if key not in job_data:
-                    job_data[key] = value
-
-            # Ensure description and posted_date exist if not set by metadata parsing
-            if 'description' not in job_data:
-                job_data['description'] = 'N/A'
-            if 'posted_date' not in job_data:
-                job_data['posted_date'] = 'N/A'
-            
-            # --- Gemini AI enrichment ---
-            cleaned_job = None
-            try:
-                import google.generativeai as genai
-                import json as _json
-                import os
-                GEMINI_API_KEY = os.getenv("GEMINI_KEY")  # TODO: Set your actual key
-                genai.configure(api_key=GEMINI_API_KEY)
-                model = genai.GenerativeModel('gemini-2.0-flash')
-                
-                # Clean and prepare job data for Gemini processing
-                cleaned_job_data = extract_and_clean_job_details(job_data, config)
-                
-                # Create a comprehensive prompt for better job detail extraction
-                gemini_prompt = f"""
-You are a professional job data analyst. Analyze the following scraped job data and create a clean, structured JSON response.
-
-RAW JOB DATA:
-{json.dumps(cleaned_job_data, indent=2, ensure_ascii=False)}
-
-TASK: Extract and structure the following information into a clean JSON format:
-
-REQUIRED FIELDS:
-- title: Job title (string)
-- company: Company name (string)
-- location: Job location (string)
-- posted_date: When the job was posted (string, format: MM/DD/YYYY or "N/A")
-- apply_link: Application URL (string)
-- experience: Experience level required (string, e.g., "3-5 years", "N/A")
-- job_id: Job identifier if available either check from the job details info or check in the URL  (string or number or null)
-- department: Department/team (string or null)
-- employment_type: Full-time, Part-time, Contract, etc. (string or null)
-- experience_level: Entry, Mid, Senior, etc. (string or null)
-- remote_work: Remote, Hybrid, On-site (string or null)
-- salary: Salary information if available (string or null)
-- deadline: Application deadline if available (string or null)
-
-DETAILED FIELDS:
-- description: Clean and Short job description (string)
-- requirements: Array of required qualifications/skills
-- preferred_qualifications: Array of preferred qualifications/skills
-- responsibilities: Array of job responsibilities
-- benefits: Array of benefits/perks
-- skills: Array of technical skills mentioned
-- tags: Array of relevant tags/categories
-
-RULES:
-1. Clean and normalize all text data
-2. Convert lists to proper arrays
-3. Use null for missing data (not "N/A")
-4. Extract skills from requirements and description
-5. Identify experience level from title and requirements
-6. Determine employment type from description
-7. Extract salary if mentioned
-8. Parse dates into consistent format
-9. Remove HTML tags and extra whitespace
-10. Ensure all arrays are properly formatted
-
-OUTPUT: Return ONLY valid JSON without any markdown formatting, code blocks, or additional text.
-"""
-                
-                response = model.generate_content(gemini_prompt)
-                cleaned_text = response.text if hasattr(response, 'text') else str(response)
-                
-                # Save raw Gemini response for debugging
-                with open("gemini_response.json", "w", encoding="utf-8") as f:
-                    f.write(cleaned_text)
-                
-                # Clean the response text
-                cleaned_text = cleaned_text.strip()
-                
-                # Remove markdown code blocks if present
-                if cleaned_text.startswith('```json'):
-                    cleaned_text = cleaned_text[7:]
-                elif cleaned_text.startswith('```'):
-                    cleaned_text = cleaned_text[3:]
-                
-                if cleaned_text.endswith('```'):
-                    cleaned_text = cleaned_text[:-3]
-                
-                # Try to parse the JSON
-                try:
-                    cleaned_job = _json.loads(cleaned_text)
-                    
-                    # Validate and ensure required fields exist
-                    required_fields = ['title', 'company', 'location', 'posted_date', 'apply_link']
-                    for field in required_fields:
-                        if field not in cleaned_job:
-                            cleaned_job[field] = job_data.get(field, 'N/A')
-                    
-                    # Add metadata
-                    cleaned_job['scraped_at'] = datetime.now().isoformat()
-                    cleaned_job['source_url'] = config['url']
-                    cleaned_job['job_details_info'] = job_data.get('job_details_info', 'N/A')
-                    
-                    # Ensure arrays are properly formatted
-                    array_fields = ['requirements', 'preferred_qualifications', 'responsibilities', 'benefits', 'skills', 'tags']
-                    for field in array_fields:
-                        if field in cleaned_job:
-                            if isinstance(cleaned_job[field], str):
-                                # Convert string to array if it's a comma-separated list
-                                if ',' in cleaned_job[field]:
-                                    cleaned_job[field] = [item.strip() for item in cleaned_job[field].split(',') if item.strip()]
-                                else:
-                                    cleaned_job[field] = [cleaned_job[field]] if cleaned_job[field] != 'N/A' else []
-                            elif not isinstance(cleaned_job[field], list):
-                                cleaned_job[field] = []
-                        else:
-                            cleaned_job[field] = []
-                    
-                    safe_print(f"✅ Successfully processed job: {cleaned_job.get('title', 'Unknown')}")
-                    
-                except Exception as e:
-                    safe_print(f"❌ JSON parsing error: {e}")
-                    stats['gemini_processing_errors'] += 1
-                    # Fallback: create a basic structured job from raw data
-                    cleaned_job = {
-                        'title': job_data.get('title', 'N/A'),
-                        'company': job_data.get('company', 'N/A'),
-                        'location': job_data.get('location', 'N/A'),
-                        'posted_date': job_data.get('posted_date', 'N/A'),
-                        'apply_link': job_data.get('apply_link', 'N/A'),
-                        'description': job_data.get('description', 'N/A'),
-                        'requirements': [],
-                        'preferred_qualifications': [],
-                        'responsibilities': [],
-                        'benefits': [],
-                        'skills': [],
-                        'tags': [],
-                        'job_id': job_data.get('job_id', None),
-                        'department': job_data.get('department', None),
-                        'employment_type': job_data.get('employment_type', None),
-                        'experience_level': job_data.get('experience_level', None),
-                        'remote_work': job_data.get('remote_work', None),
-                        'salary': job_data.get('salary', None),
-                        'deadline': job_data.get('deadline', None),
-                        'scraped_at': datetime.now().isoformat(),
-                        'source_url': config['url'],
-                        'job_details_info': job_data.get('job_details_info', 'N/A'),
-                        'gemini_error': f"JSON parsing failed: {e}",
-                        'raw_gemini_response': cleaned_text
-                    }
-                    
-            except Exception as e:
-                safe_print(f"❌ Gemini API error: {e}")
-                stats['gemini_processing_errors'] += 1
-                # Fallback: create structured job from raw data
-                cleaned_job = {
-                    'title': job_data.get('title', 'N/A'),
-                    'company': job_data.get('company', 'N/A'),
-                    'location': job_data.get('location', 'N/A'),
-                    'posted_date': job_data.get('posted_date', 'N/A'),
-                    'apply_link': job_data.get('apply_link', 'N/A'),
-                    'description': job_data.get('description', 'N/A'),
-                    'requirements': [],
-                    'preferred_qualifications': [],
-                    'responsibilities': [],
-                    'benefits': [],
-                    'skills': [],
-                    'tags': [],
-                    'job_id': job_data.get('job_id', None),
-                    'department': job_data.get('department', None),
-                    'employment_type': job_data.get('employment_type', None),
-                    'experience_level': job_data.get('experience_level', None),
-                    'remote_work': job_data.get('remote_work', None),
-                    'salary': job_data.get('salary', None),
-                    'deadline': job_data.get('deadline', None),
-                    'scraped_at': datetime.now().isoformat(),
-                    'source_url': config['url'],
-                    'job_details_info': job_data.get('job_details_info', 'N/A'),
-                    'gemini_error': f"Gemini API failed: {e}"
-                }
-
-            # Add the cleaned job to the results
-            jobs.append(cleaned_job)
-            stats['successful_extractions'] += 1
-                
+            job_data['apply_link'] = resolve_apply_link(href, config)
             
+            outcome = submit_job_card(job_data, i, config, batch, checkpoint, page_number)
+            if outcome == 'duplicate':
+                stats['skipped_duplicates'] += 1
+            elif outcome == 'restored':
+                restored += 1
+            else:
+                queued += 1
 
         except Exception as e:
             print(f"Error processing job card {i + 1}: {e}")
             stats['skipped_extraction_errors'] += 1
             continue
-        print(f"\n=== EXTRACTION STATISTICS ===")
+    print(f"\n=== EXTRACTION STATISTICS ===")
     safe_print(f"📊 Job Cards Found: {stats['total_job_cards_found']}")
-    safe_print(f"✅ Successfully Extracted: {stats['successful_extractions']}")
+    safe_print(f"📥 Queued for Detail Crawl & Enrichment: {queued}")
+    if restored:
+        safe_print(f"♻️ Restored from Checkpoint: {restored}")
     safe_print(f"⏭️ Skipped (Duplicates): {stats['skipped_duplicates']}")
     safe_print(f"❌ Skipped (Extraction Errors): {stats['skipped_extraction_errors']}")
-    print(f"🔄 Crawl4AI Errors: {stats['crawl4ai_errors']}")
-    print(f"🤖 Gemini Processing Errors: {stats['gemini_processing_errors']}")
     if stats['browser_closed_early']:
         safe_print(f"⚠️ Browser was closed early during extraction")
-    safe_print(f"📈 Success Rate: {(stats['successful_extractions'] / max(stats['total_job_cards_found'], 1) * 100):.1f}%")
     print("-" * 60)
+
+    if checkpoint and page_number is not None:
+        checkpoint.record_page(config.get('company_name', 'Unknown'), page_number, queued + restored)
+
+    return stats
+    
     
-    for job in jobs:
-        
-        print(f"Job #{job.get('index', 'N/A')}")
-        print(f"Title: {job.get('title', 'N/A')}")
-        print(f"Location: {job.get('location', 'N/A')}")
-        print(f"Posted Date: {job.get('posted_date', 'N/A')}")
-        print(f"Link: {job.get('apply_link', 'N/A')}")
-        print("-" * 80)
 
-    return jobs, stats
+def extract_api_jobs(capture, config, batch, checkpoint=None, resume_page=0):
+    """
+    Submit jobs straight from a captured search API, paging through the API
+    directly. Returns (pages read, statistics in extract_job_data's format).
+    """
+    stats = {
+        'total_job_cards_found': 0,
+        'skipped_duplicates': 0,
+        'skipped_extraction_errors': 0,
+        'successful_extractions': 0,
+        'gemini_processing_errors': 0,
+        'crawl4ai_errors': 0,
+        'browser_closed_early': False
+    }
+    company_name = config.get('company_name', 'Unknown')
+    pages_read = 0
     
+    for page_number, records in capture.iter_pages(config.get('max_pages', 1)):
+        pages_read = page_number
+        if page_number <= resume_page:
+            safe_print(f"⏭️ API page {page_number} already completed in checkpoint, skipping")
+            continue
+        
+        print(f"\n--- Reading API Page {page_number} ({len(records)} jobs) ---")
+        stats['total_job_cards_found'] += len(records)
+        queued = 0
+        for i, record in enumerate(records):
+            if batch.submitted >= config['max_jobs']:
+                break
+            try:
+                job_data = capture.build_job(record)
+                job_data['company'] = company_name
+                job_data['apply_link'] = resolve_apply_link(job_data['apply_link'] if job_data['apply_link'] != 'N/A' else None, config)
+                outcome = submit_job_card(job_data, i, config, batch, checkpoint, page_number)
+            except Exception as e:
+                print(f"Error processing API job {i + 1}: {e}")
+                stats['skipped_extraction_errors'] += 1
+                continue
+            if outcome == 'duplicate':
+                stats['skipped_duplicates'] += 1
+            else:
+                queued += 1
+        
+        if checkpoint:
+            checkpoint.record_page(company_name, page_number, queued)
+        if batch.submitted >= config['max_jobs']:
+            print(f"Reached maximum job limit of {config['max_jobs']}")
+            break
     
+    safe_print(f"📡 Search API: {capture.stats['api_jobs']} jobs from {capture.stats['api_pages']} API pages")
+    return pages_read, stats
 
 def save_results(jobs, config, start_time, end_time, pages_scraped, errors, timing_data, filename="job_scraper_results.json"):
     """Save results in the specified format"""
@@ -1155,10 +1188,82 @@ def save_results(jobs, config, start_time, end_time, pages_scraped, errors, timi
     except Exception as e:
         print(f"Error saving results: {e}")
 
-def scrape_single_company(page, config, overall_start_time, cookie_handler=None):
-    """Scrape jobs for a single company"""
+def open_listing_page(page, config, errors, api_capture=None):
+    """
+    Navigate to the careers page, handle cookie banners and wait for the
+    search API or the job cards. Returns (loaded, api_capture); api_capture
+    becomes None when the configured search API never showed up.
+    """
+    print(f"\nNavigating to: {config['url']}")
+    try:
+        HOST_SCHEDULER.acquire(config['url'])
+        page.goto(config['url'], wait_until='domcontentloaded', timeout=30000)
+        safe_print("✅ Page loaded successfully")
+        
+        # Handle cookies if not using extension
+        if not GLOBAL_CONFIG.get('use_extension', False):
+            try:
+                print(f"🍪 Applying cookie handling strategy: {GLOBAL_CONFIG['cookie_strategy']}")
+                cookie_results = apply_cookie_handling(page, GLOBAL_CONFIG['cookie_strategy'])
+                
+                banners_found = len(cookie_results.get('detected_banners', []))
+                hidden_count = cookie_results.get('hide_stats', {}).get('hidden_count', 0)
+                clicked_count = cookie_results.get('click_stats', {}).get('clicked_count', 0)
+                
+                if banners_found > 0:
+                    safe_print(f"   🎯 Detected {banners_found} cookie banners")
+                    if hidden_count > 0:
+                        print(f"   🙈 Hidden {hidden_count} cookie elements")
+                    if clicked_count > 0:
+                        print(f"   👆 Clicked {clicked_count} cookie buttons")
+                else:
+                    print(f"   ✨ No cookie banners detected")
+                    
+            except Exception as e:
+                safe_print(f"   ⚠️ Cookie handling failed: {e}")
+                errors.append(f"Cookie handling error: {e}")
+        
+    except Exception as e:
+        print(f"Navigation failed: {e}")
+        errors.append(f"Navigation error: {e}")
+        return False, api_capture
+
+    if api_capture is not None and api_capture.wait_for_payload(15000):
+        safe_print("📡 Search API discovered, reading jobs from its JSON instead of the DOM")
+    else:
+        if api_capture is not None:
+            safe_print("⚠️ Search API response not seen, falling back to DOM scraping")
+            api_capture.detach()
+            api_capture = None
+        
+        # Wait for job cards to load instead of networkidle
+        try:
+            page.wait_for_selector(config['card_selector'], timeout=15000)
+            print("Job cards loaded successfully")
+            page.wait_for_timeout(2000)  # Brief additional wait
+        except Exception as e:
+            print(f"Warning: Job cards selector not found: {e}")
+            errors.append(f"Job cards not found: {e}")
+    return True, api_capture
+
+def scrape_single_company(page, config, overall_start_time, cookie_handler=None, pipeline=None, checkpoint=None, result_sink=None,
+                          ats_adapter=None):
+    """
+    Scrape jobs for a single company, feeding its cards into the job pipeline.
+    
+    With an ats_adapter (see ats_adapters.py) the listing is read from the
+    ATS API and page may be None.
+    
+    With a result_sink, finished jobs are streamed to it and not kept in the
+    returned result; job_count / failed_job_count carry the totals instead.
+    """
     company_name = config.get('company_name', config.get('company', 'Unknown'))
     
+    # Jobs and pages already finished before an interrupted run
+    restored_jobs = checkpoint.restored_jobs(company_name) if checkpoint else []
+    restored_count, restored_failed = checkpoint.restored_counts(company_name) if checkpoint else (0, 0)
+    resume_page = checkpoint.last_completed_page(company_name) if checkpoint else 0
+    
     # Initialize tracking variables for this company
     start_time = datetime.now()
     errors = []
@@ -1175,68 +1280,48 @@ def scrape_single_company(page, config, overall_start_time, cookie_handler=None)
     print(f"{'='*80}")
     print_company_config(config)
     
+    # Companies on a known ATS are listed through its API; the rest need the page
+    api_capture = ats_adapter
+    if api_capture is None and config.get('api_capture'):
+        # Listen for the site's search API before navigating so its first call is seen
+        api_capture = ResponseCapture(page, config['api_capture'])
+        api_capture.attach()
+    
     try:
         # Track navigation time
         nav_start = time.time()
-        print(f"\nNavigating to: {config['url']}")
-        
-        # Add better navigation handling
-        try:
-            page.goto(config['url'], wait_until='domcontentloaded', timeout=30000)
-            safe_print("✅ Page loaded successfully")
-            
-            # Handle cookies if not using extension
-            if not GLOBAL_CONFIG.get('use_extension', False):
-                try:
-                    print(f"🍪 Applying cookie handling strategy: {GLOBAL_CONFIG['cookie_strategy']}")
-                    cookie_results = apply_cookie_handling(page, GLOBAL_CONFIG['cookie_strategy'])
-                    
-                    banners_found = len(cookie_results.get('detected_banners', []))
-                    hidden_count = cookie_results.get('hide_stats', {}).get('hidden_count', 0)
-                    clicked_count = cookie_results.get('click_stats', {}).get('clicked_count', 0)
-                    
-                    if banners_found > 0:
-                        safe_print(f"   🎯 Detected {banners_found} cookie banners")
-                        if hidden_count > 0:
-                            print(f"   🙈 Hidden {hidden_count} cookie elements")
-                        if clicked_count > 0:
-                            print(f"   👆 Clicked {clicked_count} cookie buttons")
-                    else:
-                        print(f"   ✨ No cookie banners detected")
-                        
-                except Exception as e:
-                    safe_print(f"   ⚠️ Cookie handling failed: {e}")
-                    errors.append(f"Cookie handling error: {e}")
-            
-        except Exception as e:
-            print(f"Navigation failed: {e}")
-            errors.append(f"Navigation error: {e}")
-            return {
-                "company_name": company_name,
-                "config": config,
-                "jobs": [],
-                "start_time": start_time,
-                "end_time": datetime.now(),
-                "pages_scraped": 0,
-                "errors": errors,
-                "timing_data": timing_data,
-                "status": "failed"
-            }
-
-        # Wait for job cards to load instead of networkidle
-        try:
-            page.wait_for_selector(config['card_selector'], timeout=15000)
-            print("Job cards loaded successfully")
-            page.wait_for_timeout(2000)  # Brief additional wait
-        except Exception as e:
-            print(f"Warning: Job cards selector not found: {e}")
-            errors.append(f"Job cards not found: {e}")
+        if ats_adapter is not None:
+            safe_print(f"🔌 Listing jobs through the {ats_adapter.name} API, no browser needed")
+        else:
+            loaded, api_capture = open_listing_page(page, config, errors, api_capture)
+            if not loaded:
+                return {
+                    "company_name": company_name,
+                    "config": config,
+                    "jobs": [],
+                    "start_time": start_time,
+                    "end_time": datetime.now(),
+                    "pages_scraped": 0,
+                    "errors": errors,
+                    "timing_data": timing_data,
+                    "status": "failed"
+                }
         
         nav_end = time.time()
         timing_data["navigation"] = round(nav_end - nav_start, 2)
         timing_data["page_load"] = timing_data["navigation"]  # Same for this case
         
         all_jobs = []
+        def on_job(job, page_number):
+            # Stream the job out first; the checkpoint then marks it as done
+            if result_sink:
+                result_sink.write_job(company_name, job)
+            if checkpoint:
+                checkpoint.record_job(company_name, page_number, job)
+        
+        batch = pipeline.open_batch(company_name, on_job, keep_jobs=result_sink is None)
+        if restored_count:
+            safe_print(f"♻️ Restored {restored_count} enriched jobs from checkpoint (pages 1-{resume_page} complete)")
         current_page = 0
         max_pages = config.get('max_pages', 1)
         
@@ -1254,21 +1339,36 @@ def scrape_single_company(page, config, overall_start_time, cookie_handler=None)
         # Track total scraping time
         scraping_start = time.time()
         
+        if api_capture is not None:
+            # Jobs come straight from the search API; no DOM reads or pagination clicks
+            try:
+                current_page, api_stats = extract_api_jobs(api_capture, config, batch, checkpoint, resume_page)
+                overall_stats = aggregate_stats(overall_stats, api_stats)
+            except Exception as e:
+                error_msg = f"Error paging through search API: {str(e)}"
+                print(error_msg)
+                errors.append(error_msg)
+        
         # Handle infinite scroll differently from button pagination
-        if config.get('pagination_type') == 'infinite_scroll':
+        elif config.get('pagination_type') == 'infinite_scroll':
             print(f"\n--- Scraping with Infinite Scroll ---")
             
             try:
-                # For infinite scroll, do all scrolling first, then extract all data
-                print("Starting infinite scroll to load all jobs...")
-                handle_infinite_scroll(page, config, 0)
-                
-                # Now extract all jobs from the fully loaded page
-                all_jobs, page_stats = extract_job_data(page, config, all_jobs, cookie_handler)
-                overall_stats = aggregate_stats(overall_stats, page_stats)
-                current_page = 1  # Count as 1 "page" for reporting
+                if resume_page >= 1:
+                    # The whole scrolled list is a single page and it already finished
+                    safe_print("⏭️ Infinite scroll page already completed in checkpoint, skipping")
+                    current_page = 1
+                else:
+                    # For infinite scroll, do all scrolling first, then extract all data
+                    print("Starting infinite scroll to load all jobs...")
+                    handle_infinite_scroll(page, config, 0)
+                    
+                    # Now extract all jobs from the fully loaded page
+                    page_stats = extract_job_data(page, config, batch, cookie_handler, 1, checkpoint)
+                    overall_stats = aggregate_stats(overall_stats, page_stats)
+                    current_page = 1  # Count as 1 "page" for reporting
                 
-                print(f"Infinite scroll complete. Total jobs collected: {len(all_jobs)}")
+                print(f"Infinite scroll complete. Total jobs queued: {batch.submitted}")
                 
             except Exception as e:
                 error_msg = f"Error during infinite scroll: {str(e)}"
@@ -1277,7 +1377,7 @@ def scrape_single_company(page, config, overall_start_time, cookie_handler=None)
                 
                 # Try to extract whatever jobs are currently visible
                 try:
-                    all_jobs, page_stats = extract_job_data(page, config, all_jobs, cookie_handler)
+                    page_stats = extract_job_data(page, config, batch, cookie_handler, 1, checkpoint)
                     overall_stats = aggregate_stats(overall_stats, page_stats)
                 except Exception as extract_error:
                     print(f"Failed to extract jobs after infinite scroll error: {extract_error}")
@@ -1285,7 +1385,7 @@ def scrape_single_company(page, config, overall_start_time, cookie_handler=None)
                 
         else:
             # Handle button pagination or no pagination
-            while current_page < max_pages and len(all_jobs) < config['max_jobs']:
+            while current_page < max_pages and batch.submitted < config['max_jobs']:
                 print(f"\n--- Scraping Page {current_page + 1} ---")
                 
                 try:
@@ -1297,14 +1397,17 @@ def scrape_single_company(page, config, overall_start_time, cookie_handler=None)
                         print("Page was closed, stopping scraping")
                         break
                         
-                    # Extract job data from current page
-                    all_jobs, page_stats = extract_job_data(page, config, all_jobs, cookie_handler)
-                    overall_stats = aggregate_stats(overall_stats, page_stats)
+                    # Extract job data from current page, unless the checkpoint says it is done
+                    if current_page + 1 <= resume_page:
+                        safe_print(f"⏭️ Page {current_page + 1} already completed in checkpoint, skipping extraction")
+                    else:
+                        page_stats = extract_job_data(page, config, batch, cookie_handler, current_page + 1, checkpoint)
+                        overall_stats = aggregate_stats(overall_stats, page_stats)
                     
-                    print(f"Total jobs collected so far: {len(all_jobs)}")
+                    print(f"Total jobs queued so far: {batch.submitted}")
                     
                     # Check if we've reached max jobs
-                    if len(all_jobs) >= config['max_jobs']:
+                    if batch.submitted >= config['max_jobs']:
                         print(f"Reached maximum job limit of {config['max_jobs']}")
                         break
                     
@@ -1332,6 +1435,16 @@ def scrape_single_company(page, config, overall_start_time, cookie_handler=None)
                     errors.append(error_msg)
                     break
         
+        # Wait for this company's jobs to finish detail crawl and enrichment
+        print(f"Waiting for {batch.pending} queued jobs to finish detail crawl and enrichment...")
+        all_jobs, pipeline_stats = batch.wait()
+        if not result_sink:
+            all_jobs = restored_jobs + all_jobs
+        job_count = restored_count + pipeline_stats['successful_extractions']
+        failed_job_count = restored_failed + pipeline_stats['gemini_processing_errors']
+        overall_stats = aggregate_stats(overall_stats, dict(pipeline_stats, total_job_cards_found=0, skipped_duplicates=0,
+                                                            skipped_extraction_errors=0, browser_closed_early=False))
+        
         scraping_end = time.time()
         timing_data["total"] = round(scraping_end - nav_start, 2)
         
@@ -1341,7 +1454,7 @@ def scrape_single_company(page, config, overall_start_time, cookie_handler=None)
         # Display results for this company
         print(f"\n=== {company_name} SCRAPING COMPLETED ===")
         print(f"Total pages scraped: {current_page}")
-        print(f"Total jobs found: {len(all_jobs)}")
+        print(f"Total jobs found: {job_count}")
         print(f"Total time: {timing_data['total']} seconds")
         
         # Display detailed statistics
@@ -1364,10 +1477,19 @@ def scrape_single_company(page, config, overall_start_time, cookie_handler=None)
         print(f"⚡ Processing Rate: {overall_stats['total_job_cards_found'] / max(timing_data['total'], 1):.1f} jobs/second")
         print(f"{'='*60}")
         
+        for job in all_jobs:
+            print(f"Title: {job.get('title', 'N/A')}")
+            print(f"Location: {job.get('location', 'N/A')}")
+            print(f"Posted Date: {job.get('posted_date', 'N/A')}")
+            print(f"Link: {job.get('apply_link', 'N/A')}")
+            print("-" * 80)
+        
         return {
             "company_name": company_name,
             "config": config,
             "jobs": all_jobs,
+            "job_count": job_count,
+            "failed_job_count": failed_job_count,
             "start_time": start_time,
             "end_time": end_time,
             "pages_scraped": current_page,
@@ -1382,6 +1504,15 @@ def scrape_single_company(page, config, overall_start_time, cookie_handler=None)
         print(error_msg)
         errors.append(error_msg)
         
+        # Still collect whatever this company already pushed into the pipeline
+        job_count, failed_job_count = restored_count, restored_failed
+        if 'batch' in locals():
+            all_jobs, pipeline_stats = batch.wait()
+            if not result_sink:
+                all_jobs = restored_jobs + all_jobs
+            job_count += pipeline_stats['successful_extractions']
+            failed_job_count += pipeline_stats['gemini_processing_errors']
+        
         end_time = datetime.now()
         timing_data["total"] = round(time.time() - time.mktime(start_time.timetuple()), 2)
         
@@ -1389,6 +1520,8 @@ def scrape_single_company(page, config, overall_start_time, cookie_handler=None)
             "company_name": company_name,
             "config": config,
             "jobs": all_jobs if 'all_jobs' in locals() else [],
+            "job_count": job_count,
+            "failed_job_count": failed_job_count,
             "start_time": start_time,
             "end_time": end_time,
             "pages_scraped": current_page if 'current_page' in locals() else 0,
@@ -1406,96 +1539,136 @@ def scrape_single_company(page, config, overall_start_time, cookie_handler=None)
             "status": "failed"
         }
 
-def save_multi_company_results(all_results, overall_start_time, overall_end_time, filename="multi_company_job_results.json"):
-    """Save results for all companies in the structured format"""
+def build_session_id(overall_start_time, shard=None):
+    """Session identifier shared by the results file and the checkpoint journal"""
+    session_id = f"session_{overall_start_time.strftime('%Y%m%d_%H%M%S')}"
+    if shard:
+        session_id += f"_shard{shard[0]}of{shard[1]}"
+    return session_id
+
+def count_result_jobs(result):
+    """Return (total, failed) job counts of a company result, streamed or in memory"""
+    if 'job_count' in result:
+        return result['job_count'], result.get('failed_job_count', 0)
+    jobs = result.get('jobs', [])
+    return len(jobs), len([j for j in jobs if "gemini_error" in j])
+
+def build_session_statistics(all_results):
+    """Sum the per-company extraction statistics of a session"""
+    overall_session_stats = {
+        'total_job_cards_found': 0,
+        'total_skipped_duplicates': 0,
+        'total_skipped_extraction_errors': 0,
+        'total_successful_extractions': 0,
+        'total_gemini_processing_errors': 0,
+        'total_crawl4ai_errors': 0,
+        'companies_with_browser_errors': 0
+    }
+    
+    for result in all_results:
+        if 'statistics' in result:
+            stats = result['statistics']
+            overall_session_stats['total_job_cards_found'] += stats['total_job_cards_found']
+            overall_session_stats['total_skipped_duplicates'] += stats['skipped_duplicates']
+            overall_session_stats['total_skipped_extraction_errors'] += stats['skipped_extraction_errors']
+            overall_session_stats['total_successful_extractions'] += stats['successful_extractions']
+            overall_session_stats['total_gemini_processing_errors'] += stats['gemini_processing_errors']
+            overall_session_stats['total_crawl4ai_errors'] += stats['crawl4ai_errors']
+            if stats['browser_closed_early']:
+                overall_session_stats['companies_with_browser_errors'] += 1
+    
+    return overall_session_stats
+
+def build_session_block(all_results, overall_start_time, overall_end_time, shard=None):
+    """Create the scraping_session block written at the top of (or at the end of) a results file"""
+    session_block = {
+        "start_time": overall_start_time.isoformat(),
+        "session_id": build_session_id(overall_start_time, shard),
+        "status": "completed",
+        "total_companies": len(all_results),
+        "completed_companies": len([r for r in all_results if r["status"] in ["success", "partial_success"]]),
+        "successful_companies": len([r for r in all_results if r["status"] == "success"]),
+        "total_jobs_scraped": sum(count_result_jobs(r)[0] for r in all_results),
+        "end_time": overall_end_time.isoformat(),
+        "total_duration_seconds": (overall_end_time - overall_start_time).total_seconds(),
+        "session_statistics": build_session_statistics(all_results)
+    }
+    if shard:
+        session_block["shard"] = f"{shard[0]}/{shard[1]}"
+    return session_block
+
+def build_company_entry(result):
+    """Create one company's entry of the results file"""
+    # Filter out jobs with Gemini errors and create clean job list
+    clean_jobs = []
+    gemini_errors = []
+    
+    for job in result["jobs"]:
+        if "gemini_error" in job:
+            gemini_errors.append({
+                "job_title": job.get("title", "Unknown"),
+                "error": job["gemini_error"],
+                "raw_response": job.get("raw_gemini_response", "")
+            })
+        else:
+            # Only include successfully processed jobs
+            clean_jobs.append(job)
+    
+    total_jobs, failed_jobs = count_result_jobs(result)
+    
+    return {
+        "company": result["company_name"],
+        "url": result["config"]["url"],
+        "status": result["status"],
+        "start_time": result["start_time"].isoformat(),
+        "jobs": clean_jobs,  # Only Gemini-cleaned jobs
+        "pagination_info": {
+            "pages_scraped": result["pages_scraped"],
+            "total_jobs_found": total_jobs,
+            "successful_jobs": total_jobs - failed_jobs,
+            "failed_jobs": failed_jobs,
+            "pagination_type": result["config"].get("pagination_type", "none")
+        },
+        "timing": result["timing_data"],
+        "errors": result["errors"],
+        "gemini_processing_errors": gemini_errors,
+        "statistics": result.get("statistics", {}),  # Include detailed statistics
+        "end_time": result["end_time"].isoformat()
+    }
+
+def save_multi_company_results(all_results, overall_start_time, overall_end_time, filename="multi_company_job_results.json", shard=None, result_sink=None):
+    """
+    Save results for all companies in the structured format.
+    
+    With a result_sink the jobs and company summaries were already streamed
+    while scraping, so only the closing session record is written.
+    """
     try:
-        # Calculate overall statistics
-        overall_session_stats = {
-            'total_job_cards_found': 0,
-            'total_skipped_duplicates': 0,
-            'total_skipped_extraction_errors': 0,
-            'total_successful_extractions': 0,
-            'total_gemini_processing_errors': 0,
-            'total_crawl4ai_errors': 0,
-            'companies_with_browser_errors': 0
-        }
+        session_block = build_session_block(all_results, overall_start_time, overall_end_time, shard)
+        overall_session_stats = session_block["session_statistics"]
         
-        for result in all_results:
-            if 'statistics' in result:
-                stats = result['statistics']
-                overall_session_stats['total_job_cards_found'] += stats['total_job_cards_found']
-                overall_session_stats['total_skipped_duplicates'] += stats['skipped_duplicates']
-                overall_session_stats['total_skipped_extraction_errors'] += stats['skipped_extraction_errors']
-                overall_session_stats['total_successful_extractions'] += stats['successful_extractions']
-                overall_session_stats['total_gemini_processing_errors'] += stats['gemini_processing_errors']
-                overall_session_stats['total_crawl4ai_errors'] += stats['crawl4ai_errors']
-                if stats['browser_closed_early']:
-                    overall_session_stats['companies_with_browser_errors'] += 1
-        
-        # Create the structured output
-        output = {
-            "scraping_session": {
-                "start_time": overall_start_time.isoformat(),
-                "session_id": f"session_{overall_start_time.strftime('%Y%m%d_%H%M%S')}",
-                "status": "completed",
-                "total_companies": len(all_results),
-                "completed_companies": len([r for r in all_results if r["status"] in ["success", "partial_success"]]),
-                "successful_companies": len([r for r in all_results if r["status"] == "success"]),
-                "total_jobs_scraped": sum(len(r["jobs"]) for r in all_results),
-                "end_time": overall_end_time.isoformat(),
-                "total_duration_seconds": (overall_end_time - overall_start_time).total_seconds(),
-                "session_statistics": overall_session_stats
-            },
-            "companies": {}
-        }
-        
-        # Add each company's results
-        for result in all_results:
-            company_name = result["company_name"]
-            
-            # Filter out jobs with Gemini errors and create clean job list
-            clean_jobs = []
-            gemini_errors = []
+        if result_sink:
+            result_sink.write_session(session_block)
+            safe_print(f"\n✅ Session summary appended to: {result_sink.filename}")
+        else:
+            # Create the structured output
+            output = {
+                "scraping_session": session_block,
+                "companies": {}
+            }
             
-            for job in result["jobs"]:
-                if "gemini_error" in job:
-                    gemini_errors.append({
-                        "job_title": job.get("title", "Unknown"),
-                        "error": job["gemini_error"],
-                        "raw_response": job.get("raw_gemini_response", "")
-                    })
-                else:
-                    # Only include successfully processed jobs
-                    clean_jobs.append(job)
+            # Add each company's results
+            for result in all_results:
+                output["companies"][result["company_name"]] = build_company_entry(result)
             
-            output["companies"][company_name] = {
-                "company": company_name,
-                "url": result["config"]["url"],
-                "status": result["status"],
-                "start_time": result["start_time"].isoformat(),
-                "jobs": clean_jobs,  # Only Gemini-cleaned jobs
-                "pagination_info": {
-                    "pages_scraped": result["pages_scraped"],
-                    "total_jobs_found": len(result["jobs"]),
-                    "successful_jobs": len(clean_jobs),
-                    "failed_jobs": len(gemini_errors),
-                    "pagination_type": result["config"].get("pagination_type", "none")
-                },
-                "timing": result["timing_data"],
-                "errors": result["errors"],
-                "gemini_processing_errors": gemini_errors,
-                "statistics": result.get("statistics", {}),  # Include detailed statistics
-                "end_time": result["end_time"].isoformat()
-            }
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
-        safe_print(f"\n✅ All results saved to: {filename}")
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(output, f, indent=2, ensure_ascii=False)
+            safe_print(f"\n✅ All results saved to: {filename}")
         
         # Calculate Gemini processing statistics
-        total_jobs = sum(len(r["jobs"]) for r in all_results)
-        total_clean_jobs = sum(len([j for j in r["jobs"] if "gemini_error" not in j]) for r in all_results)
-        total_gemini_errors = total_jobs - total_clean_jobs
+        total_jobs = sum(count_result_jobs(r)[0] for r in all_results)
+        total_gemini_errors = sum(count_result_jobs(r)[1] for r in all_results)
+        total_clean_jobs = total_jobs - total_gemini_errors
         
         # Print comprehensive session summary
         safe_print(f"\n🎯 COMPREHENSIVE SESSION SUMMARY")
@@ -1535,91 +1708,209 @@ def save_multi_company_results(all_results, overall_start_time, overall_end_time
         safe_print(f"❌ Error saving results: {e}")
         return False
 
-def main():
-    """Main function to run the multi-company job scraper"""
+def get_browser_launch_options():
+    """Build Chromium launch options based on the cookie handling preference"""
+    extension_path = r"C:\Programs\Playwright Scrapper 2\idcac_extension"  # Path to unpacked extension
     
-    safe_print("🚀 Multi-Company Job Scraper")
-    safe_print("=" * 80)
+    if GLOBAL_CONFIG['use_extension'] and not GLOBAL_CONFIG['headless']:
+        # Use extension-based cookie handling (requires non-headless mode)
+        return {
+            'user_data_dir': "/tmp/playwright-profile",  # Persistent User Profile
+            'headless': GLOBAL_CONFIG['headless'],
+            'args': [
+                f"--disable-extensions-except={extension_path}", 
+                f"--load-extension={extension_path}",
+                "--disable-web-security",
+                "--disable-features=VizDisplayCompositor",
+                "--no-sandbox",
+                "--disable-dev-shm-usage"
+            ]
+        }
     
-    # Load companies configuration
-    companies_config = load_companies_config(COMPANIES_CONFIG_FILE)
-    if not companies_config:
-        print("\nPlease create a JSON file with the following structure:")
-        print("""
-[
-  {
-    "company": "Atlassian",
-    "url": "https://www.atlassian.com/company/careers/all-jobs",
-    "job_card": "tbody tr",
-    "title": "td:first-child a",
-    "link": "td:first-child a", 
-    "location": "td:nth-child(2)",
-    "pagination_type": "one_page"
-  },
-  {
-    "company": "Next Company",
-    "url": "...",
-    ...
-  }
-]
-        """)
-        return
+    # Use module-based cookie handling (works in headless mode)
+    return {
+        'headless': GLOBAL_CONFIG['headless'],
+        'args': [
+            "--disable-web-security",
+            "--disable-features=VizDisplayCompositor", 
+            "--no-sandbox",
+            "--disable-dev-shm-usage"
+        ]
+    }
+
+def build_failed_result(company_config, error):
+    """Build the result record for a company that could not be scraped at all"""
+    return {
+        "company_name": company_config.get('company', company_config.get('company_name', 'Unknown')),
+        "config": company_config,
+        "jobs": [],
+        "start_time": datetime.now(),
+        "end_time": datetime.now(),
+        "pages_scraped": 0,
+        "errors": [str(error)],
+        "timing_data": {"total": 0},
+        "status": "failed"
+    }
+
+class BrowserWorkerPool:
+    """
+    Pool of worker threads that scrape companies concurrently.
     
-    overall_start_time = datetime.now()
-    all_results = []
+    Playwright's sync API is bound to the thread that started it, so every
+    worker owns its own sync_playwright() session and Chromium instance.
+    Each company is scraped in a fresh, isolated browser context, so cookies
+    and storage never leak between sites. A slow site only blocks its own
+    worker while the others keep pulling companies off the shared queue.
+    Politeness is enforced per host by HOST_SCHEDULER, not per worker.
+    Companies on a known ATS are listed through its API and never start a
+    browser, so a worker only launches Chromium once an unknown site needs it.
     
-    safe_print(f"\n📊 Starting scraping for {len(companies_config)} companies...")
-    print(f"Global Settings:")
-    print(f"  Max jobs per company: {GLOBAL_CONFIG['max_jobs_per_company']}")
-    print(f"  Headless mode: {GLOBAL_CONFIG['headless']}")
-    print(f"  Delay between companies: {GLOBAL_CONFIG['delay_between_companies']} seconds")
+    The checkpoint journal and result sink are passed per company, so one
+    warm pool can serve several sessions (see scraper_daemon.py). Finished
+    companies are recorded in the journal and their summaries streamed to
+    the sink, if those are given.
+    """
     
-    with sync_playwright() as p:
-        extension_path = r"C:\Programs\Playwright Scrapper 2\idcac_extension"  # Path to unpacked extension
-        
-        # Configure browser launch based on cookie handling preference
-        if GLOBAL_CONFIG['use_extension'] and not GLOBAL_CONFIG['headless']:
-            # Use extension-based cookie handling (requires non-headless mode)
-            context_options = {
-                'user_data_dir': "/tmp/playwright-profile",  # Persistent User Profile
-                'headless': GLOBAL_CONFIG['headless'],
-                'args': [
-                    f"--disable-extensions-except={extension_path}", 
-                    f"--load-extension={extension_path}",
-                    "--disable-web-security",
-                    "--disable-features=VizDisplayCompositor",
-                    "--no-sandbox",
-                    "--disable-dev-shm-usage"
-                ]
-            }
+    def __init__(self, worker_count=None, pipeline=None):
+        self.pipeline = pipeline
+        self.use_persistent_context = GLOBAL_CONFIG['use_extension'] and not GLOBAL_CONFIG['headless']
+        worker_count = worker_count or GLOBAL_CONFIG['max_workers']
+        if self.use_persistent_context and worker_count > 1:
+            # A persistent profile directory can only be opened by one browser at a time
+            safe_print("⚠️ Extension mode uses a persistent profile, limiting pool to 1 worker")
+            worker_count = 1
+        self.worker_count = max(1, worker_count)
+        self.tasks = queue.Queue()
+        self.threads = []
+    
+    def start(self):
+        """Start the worker threads (each launches its own browser on first use)"""
+        if self.use_persistent_context:
             safe_print(f"🔧 Using browser extension for cookie handling")
         else:
-            # Use module-based cookie handling (works in headless mode)
-            context_options = {
-                'headless': GLOBAL_CONFIG['headless'],
-                'args': [
-                    "--disable-web-security",
-                    "--disable-features=VizDisplayCompositor", 
-                    "--no-sandbox",
-                    "--disable-dev-shm-usage"
-                ]
-            }
             safe_print(f"🔧 Using Python module for cookie handling (Strategy: {GLOBAL_CONFIG['cookie_strategy']})")
         
-        try:
-            if GLOBAL_CONFIG['use_extension'] and not GLOBAL_CONFIG['headless']:
-                context = p.chromium.launch_persistent_context(**context_options)
-                page = context.new_page()
-            else:
-                browser = p.chromium.launch(**context_options)
-                context = browser.new_context()
-                page = context.new_page()
+        for worker_id in range(self.worker_count):
+            thread = threading.Thread(target=self._worker_loop, args=(worker_id + 1,), name=f"scraper-worker-{worker_id + 1}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        safe_print(f"✅ Started {self.worker_count} browser workers")
+    
+    def submit(self, company_config, overall_start_time, checkpoint=None, result_sink=None):
+        """Queue one company for scraping and return a Future for its result"""
+        future = Future()
+        self.tasks.put((company_config, overall_start_time, checkpoint, result_sink, future))
+        return future
+    
+    def run(self, companies_config, overall_start_time, checkpoint=None, result_sink=None):
+        """Scrape all companies and return their results in configuration order"""
+        futures = [self.submit(company_config, overall_start_time, checkpoint, result_sink) for company_config in companies_config]
+        return [future.result() for future in futures]
+    
+    def close(self):
+        """Stop all workers and close their browsers"""
+        for _ in self.threads:
+            self.tasks.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+    
+    def _launch(self, p):
+        """Launch a browser for this worker; returns (browser, persistent_context)"""
+        launch_options = get_browser_launch_options()
+        if self.use_persistent_context:
+            return None, p.chromium.launch_persistent_context(**launch_options)
+        return p.chromium.launch(**launch_options), None
+    
+    def _worker_loop(self, worker_id):
+        """Worker thread body: own a browser and scrape companies from the queue"""
+        with sync_playwright() as p:
+            browser, persistent_context = None, None
             
             # Initialize cookie handler if not using extension
             cookie_handler = None
             if not GLOBAL_CONFIG['use_extension']:
                 cookie_handler = CookieBannerHandler()
-                safe_print(f"✅ Cookie handler module initialized")
+            
+            while True:
+                task = self.tasks.get()
+                if task is None:
+                    break
+                company_config, overall_start_time, checkpoint, result_sink, future = task
+                
+                try:
+                    # Known ATS platforms are listed through their API without touching the browser
+                    result = self._scrape_company_api(company_config, overall_start_time, checkpoint, result_sink)
+                    
+                    if result is None:
+                        # Relaunch the browser if it was never started or has crashed
+                        if (browser is None and persistent_context is None) or (browser is not None and not browser.is_connected()):
+                            browser, persistent_context = self._launch(p)
+                            safe_print(f"✅ Worker {worker_id}: browser launched")
+                        
+                        result = self._scrape_company(browser, persistent_context, company_config, overall_start_time,
+                                                      cookie_handler, checkpoint, result_sink)
+                except Exception as e:
+                    safe_print(f"❌ Error processing company {company_config.get('company', 'Unknown')}: {e}")
+                    result = build_failed_result(company_config, e)
+                    browser, persistent_context = self._close_browser(browser, persistent_context)
+                
+                # Failed companies stay open in the journal so --resume retries them
+                if checkpoint and result['status'] != 'failed':
+                    try:
+                        checkpoint.record_company(result)
+                    except Exception as e:
+                        safe_print(f"⚠️ Failed to checkpoint {result['company_name']}: {e}")
+                
+                if result_sink:
+                    try:
+                        result_sink.write_company(build_company_entry(result))
+                    except Exception as e:
+                        safe_print(f"⚠️ Failed to write company summary for {result['company_name']}: {e}")
+                
+                future.set_result(result)
+            
+            self._close_browser(browser, persistent_context)
+    
+    def _scrape_company_api(self, company_config, overall_start_time, checkpoint=None, result_sink=None):
+        """
+        Scrape a company through its ATS API. Returns None when no adapter
+        matches, or when the API failed before its first page, so the
+        company goes through the browser instead.
+        """
+        if not GLOBAL_CONFIG['ats_adapters']:
+            return None
+        normalized_config = normalize_company_config(company_config)
+        ats_adapter = detect_ats_adapter(normalized_config, ATS_TRANSPORT)
+        if ats_adapter is None:
+            return None
+        
+        result = scrape_single_company(None, normalized_config, overall_start_time, None, self.pipeline,
+                                       checkpoint, result_sink, ats_adapter=ats_adapter)
+        if result['pages_scraped'] == 0 and result['errors']:
+            safe_print(f"⚠️ {ats_adapter.name} API failed for {result['company_name']}, falling back to the browser")
+            return None
+        return result
+    
+    def _scrape_company(self, browser, persistent_context, company_config, overall_start_time, cookie_handler,
+                        checkpoint=None, result_sink=None):
+        """Scrape one company in its own browser context"""
+        # Normalize the configuration
+        normalized_config = normalize_company_config(company_config)
+        
+        if persistent_context is not None:
+            context = persistent_context
+        else:
+            context = browser.new_context()
+        
+        page = None
+        route_handler = None
+        try:
+            # Skip images, media, fonts and trackers the listing scraper never reads
+            policy = ResourceBlockingPolicy.from_config(GLOBAL_CONFIG['resource_blocking'], normalized_config.get('resource_blocking'))
+            route_handler = install_resource_blocking(context, policy)
+            
+            page = context.new_page()
             
             # Set better page options
             page.set_default_timeout(30000)  # 30 second timeout
@@ -1629,57 +1920,65 @@ def main():
             page.on("pageerror", lambda err: print(f"Page error: {err}"))
             page.on("crash", lambda: print("Page crashed"))
             
-        except Exception as e:
-            safe_print(f"❌ Failed to create browser context: {e}")
-            return
-
-        try:
-            for i, company_config in enumerate(companies_config):
-                try:
-                    # Normalize the configuration
-                    normalized_config = normalize_company_config(company_config)
-                    
-                    # Scrape this company
-                    result = scrape_single_company(page, normalized_config, overall_start_time, cookie_handler)
-                    all_results.append(result)
-                    
-                    # Add delay between companies (except for the last one)
-                    if i < len(companies_config) - 1:
-                        delay = GLOBAL_CONFIG['delay_between_companies']
-                        print(f"\n⏱️ Waiting {delay} seconds before next company...")
-                        time.sleep(delay)
-                        
-                except Exception as e:
-                    safe_print(f"❌ Error processing company {company_config.get('company', 'Unknown')}: {e}")
-                    # Add a failed result
-                    all_results.append({
-                        "company_name": company_config.get('company', 'Unknown'),
-                        "config": company_config,
-                        "jobs": [],
-                        "start_time": datetime.now(),
-                        "end_time": datetime.now(),
-                        "pages_scraped": 0,
-                        "errors": [str(e)],
-                        "timing_data": {"total": 0},
-                        "status": "failed"
-                    })
-                    continue
-                    
+            # Scrape this company
+            return scrape_single_company(page, normalized_config, overall_start_time, cookie_handler,
+                                         self.pipeline, checkpoint, result_sink)
         finally:
             try:
-                if GLOBAL_CONFIG['use_extension'] and not GLOBAL_CONFIG['headless']:
-                    context.close()
-                    safe_print("✅ Browser context closed successfully")
+                if persistent_context is not None:
+                    # The persistent context is reused by the next company, which has its own policy
+                    remove_resource_blocking(context, route_handler)
+                    if page is not None:
+                        page.close()
                 else:
                     context.close()
-                    browser.close()
-                    safe_print("✅ Browser closed successfully")
             except Exception as e:
-                safe_print(f"⚠️ Error closing browser: {e}")
-    
-    overall_end_time = datetime.now()
+                safe_print(f"⚠️ Error closing browser context: {e}")
     
-    # Display final summary
+    def _close_browser(self, browser, persistent_context):
+        """Close whatever browser this worker currently owns"""
+        try:
+            if persistent_context is not None:
+                persistent_context.close()
+                safe_print("✅ Browser context closed successfully")
+            elif browser is not None:
+                browser.close()
+                safe_print("✅ Browser closed successfully")
+        except Exception as e:
+            safe_print(f"⚠️ Error closing browser: {e}")
+        return None, None
+
+def build_results_filename(overall_start_time, shard=None, result_format=None):
+    """Results file of a session (a resumed run keeps appending to the interrupted run's file)"""
+    filename = f"multi_company_results_{overall_start_time.strftime('%Y%m%d_%H%M%S')}"
+    if shard:
+        filename += f"_shard{shard[0]}of{shard[1]}"
+    return filename + f".{result_format or GLOBAL_CONFIG['result_format']}"
+
+def open_result_sink(filename, result_format=None):
+    """Open the streaming sink for a session, or None for the single-document JSON format"""
+    if (result_format or GLOBAL_CONFIG['result_format']) == 'json':
+        return None
+    return JsonlResultSink(filename)
+
+def collect_session_results(companies_config, pending_companies, scraped_results, checkpoint, result_sink=None):
+    """Merge restored and freshly scraped company results, keeping configuration order"""
+    all_results = []
+    scraped_results = iter(scraped_results)
+    for company_config in companies_config:
+        company_name = company_config.get('company', 'Unknown')
+        if checkpoint.is_company_done(company_name) and company_config not in pending_companies:
+            restored_result = checkpoint.restored_result(company_name)
+            if result_sink:
+                # Its jobs were streamed to the results file by the interrupted run
+                restored_result['jobs'] = []
+            all_results.append(restored_result)
+        else:
+            all_results.append(next(scraped_results))
+    return all_results
+
+def print_session_summary(all_results, overall_start_time, overall_end_time):
+    """Print the end-of-session summary and company-wise table"""
     print(f"\n{'='*80}")
     safe_print("🎉 MULTI-COMPANY SCRAPING COMPLETED")
     print(f"{'='*80}")
@@ -1688,7 +1987,7 @@ def main():
     successful_companies = len([r for r in all_results if r["status"] == "success"])
     partial_companies = len([r for r in all_results if r["status"] == "partial_success"])
     failed_companies = len([r for r in all_results if r["status"] == "failed"])
-    total_jobs = sum(len(r["jobs"]) for r in all_results)
+    total_jobs = sum(count_result_jobs(r)[0] for r in all_results)
     total_time = (overall_end_time - overall_start_time).total_seconds()
     
     safe_print(f"📊 SUMMARY:")
@@ -1698,6 +1997,19 @@ def main():
     print(f"  Failed: {failed_companies}")
     print(f"  Total jobs scraped: {total_jobs:,}")
     print(f"  Total time: {total_time:.2f} seconds ({total_time/60:.1f} minutes)")
+    print(f"  Host throttling: {HOST_SCHEDULER.stats['throttled']}/{HOST_SCHEDULER.stats['requests']} requests delayed ({HOST_SCHEDULER.stats['total_wait_seconds']:.1f}s total wait)")
+    print(f"  Resource blocking: {BLOCKING_STATS.summary()}")
+    enrichment_cache = get_shared_enrichment_cache()
+    if enrichment_cache is not None and enrichment_cache.stats['lookups']:
+        print(f"  Enrichment cache: {enrichment_cache.summary()}")
+    if EXTRACTION_STATS.jobs:
+        print(f"  Local extraction: {EXTRACTION_STATS.summary()}")
+    if GEMINI_CLIENT_STATS:
+        print(f"  LLM requests ({GLOBAL_CONFIG['enrichment_backend']}): {GEMINI_CLIENT_STATS['succeeded']} succeeded, {GEMINI_CLIENT_STATS['retries']} retried "
+              f"({GEMINI_CLIENT_STATS['throttled']} throttled), {GEMINI_CLIENT_STATS['failed']} failed, "
+              f"{GEMINI_CLIENT_STATS['rate_wait_seconds']:.1f}s waiting on the rate budget")
+    index_stats = get_shared_index(GLOBAL_CONFIG['apply_link_index_max_age']).stats
+    print(f"  Duplicate index: {index_stats['hits']}/{index_stats['lookups']} cards already known, {index_stats['added']} links added")
     
     if total_jobs > 0:
         print(f"  Average jobs per company: {total_jobs/total_companies:.1f}")
@@ -1711,22 +2023,151 @@ def main():
     for result in all_results:
         company_name = result["company_name"][:24]  # Truncate long names
         status = result["status"]
-        job_count = len(result["jobs"])
+        job_count = count_result_jobs(result)[0]
         pages = result["pages_scraped"]
         duration = result["timing_data"].get("total", 0)
         
         print(f"{company_name:<25} {status:<15} {job_count:<8} {pages:<6} {duration:<8.1f}s")
+
+def finish_session(all_results, overall_start_time, overall_end_time, filename, shard, checkpoint, result_sink=None):
+    """Write the session results, close the sink and drop the checkpoint once saved"""
+    saved = save_multi_company_results(all_results, overall_start_time, overall_end_time, filename, shard, result_sink)
+    if result_sink:
+        result_sink.close()
+    if saved:
+        # Results are safely on disk, the journal is no longer needed
+        checkpoint.remove()
+    else:
+        checkpoint.close()
+    return saved
+
+def main():
+    """Main function to run the multi-company job scraper"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Multi-Company Job Scraper')
+    parser.add_argument('--companies', default=COMPANIES_CONFIG_FILE, help='Path to companies JSON file')
+    parser.add_argument('--shard', help='Only scrape shard i of N (0-based), e.g. --shard 0/4')
+    parser.add_argument('--workers', type=int, help='Number of concurrent browser workers')
+    parser.add_argument('--resume', metavar='SESSION_ID', help='Resume an interrupted session from its checkpoint journal')
+    parser.add_argument('--format', choices=['json', 'jsonl', 'jsonl.gz'], help='Results file format (default: %s)' % GLOBAL_CONFIG['result_format'])
+    args = parser.parse_args()
+    
+    if args.format:
+        GLOBAL_CONFIG['result_format'] = args.format
+    
+    shard = None
+    if args.shard:
+        try:
+            shard = parse_shard_spec(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    checkpoint = None
+    if args.resume:
+        try:
+            checkpoint = CheckpointJournal.load(args.resume, GLOBAL_CONFIG['checkpoint_dir'])
+        except FileNotFoundError as e:
+            parser.error(str(e))
+        # Scrape the same companies and shard the interrupted run was started with
+        args.companies = checkpoint.session.get('companies_file') or args.companies
+        if checkpoint.session.get('shard'):
+            shard = tuple(checkpoint.session['shard'])
+    if args.workers:
+        GLOBAL_CONFIG['max_workers'] = args.workers
+    
+    safe_print("🚀 Multi-Company Job Scraper")
+    safe_print("=" * 80)
+    
+    # Load companies configuration
+    companies_config = load_companies_config(args.companies)
+    if companies_config and shard:
+        total_companies = len(companies_config)
+        companies_config = select_shard(companies_config, *shard)
+        safe_print(f"🧩 Shard {shard[0]}/{shard[1]}: {len(companies_config)} of {total_companies} companies")
+        if not companies_config:
+            safe_print("⚠️ No companies assigned to this shard, nothing to do")
+            return
+    if not companies_config:
+        print("\nPlease create a JSON file with the following structure:")
+        print("""
+[
+  {
+    "company": "Atlassian",
+    "url": "https://www.atlassian.com/company/careers/all-jobs",
+    "job_card": "tbody tr",
+    "title": "td:first-child a",
+    "link": "td:first-child a", 
+    "location": "td:nth-child(2)",
+    "pagination_type": "one_page"
+  },
+  {
+    "company": "Next Company",
+    "url": "...",
+    ...
+  }
+]
+        """)
+        return
+    
+    overall_start_time = (checkpoint.start_time() if checkpoint else None) or datetime.now()
+    
+    if checkpoint is None:
+        # Streamed results already hold the job bodies; the journal then only tracks links and counts
+        checkpoint = CheckpointJournal(build_session_id(overall_start_time, shard), GLOBAL_CONFIG['checkpoint_dir'],
+                                       store_jobs=GLOBAL_CONFIG['result_format'] == 'json')
+    checkpoint.record_session(overall_start_time, args.companies, shard)
+    
+    # Companies finished before the interruption are taken from the journal as-is
+    pending_companies = [c for c in companies_config if not checkpoint.is_company_done(c.get('company', 'Unknown'))]
+    if args.resume:
+        safe_print(f"♻️ Resuming {checkpoint.session_id}: {len(companies_config) - len(pending_companies)} companies already done, {len(pending_companies)} to go")
+    
+    safe_print(f"\n📊 Starting scraping for {len(companies_config)} companies...")
+    print(f"Global Settings:")
+    print(f"  Max jobs per company: {GLOBAL_CONFIG['max_jobs_per_company']}")
+    print(f"  Headless mode: {GLOBAL_CONFIG['headless']}")
+    print(f"  Min interval per host: {GLOBAL_CONFIG['host_min_interval']} seconds")
+    print(f"  Concurrent workers: {GLOBAL_CONFIG['max_workers']}")
+    print(f"  Checkpoint journal: {checkpoint.path}")
+    safe_print(f"💡 If interrupted, continue with: python Final_Scraper.py --resume {checkpoint.session_id}")
+    
+    filename = build_results_filename(overall_start_time, shard)
+    result_sink = open_result_sink(filename)
+    if result_sink:
+        print(f"  Streaming results to: {filename}")
+    
+    # Load known apply links once, before the workers start checking cards against them
+    get_shared_index(GLOBAL_CONFIG['apply_link_index_max_age'])
+    
+    pipeline = create_job_pipeline()
+    pool = BrowserWorkerPool(GLOBAL_CONFIG['max_workers'], pipeline)
+    try:
+        pipeline.start()
+        pool.start()
+        scraped_results = pool.run(pending_companies, overall_start_time, checkpoint, result_sink)
+    finally:
+        pool.close()
+        pipeline.close()
+        GEMINI_CLIENT_STATS.update(close_shared_enrichment_backend())
+    
+    all_results = collect_session_results(companies_config, pending_companies, scraped_results, checkpoint, result_sink)
+    overall_end_time = datetime.now()
+    
+    # Display final summary
+    print_session_summary(all_results, overall_start_time, overall_end_time)
     
     # Save results
-    timestamp = overall_start_time.strftime("%Y%m%d_%H%M%S")
-    filename = f"multi_company_results_{timestamp}.json"
-    save_multi_company_results(all_results, overall_start_time, overall_end_time, filename)
+    finish_session(all_results, overall_start_time, overall_end_time, filename, shard, checkpoint, result_sink)
     
     safe_print(f"\n✅ Results saved to: {filename}")
     safe_print("🎯 Ready for job categorization!")
+    if shard:
+        safe_print(f"💡 Combine shard files with: python merge_results.py multi_company_results_*_shard*of{shard[1]}.{GLOBAL_CONFIG['result_format']}")
     
-    # Wait for user input before closing
-    input("\nPress Enter to exit...")
+    # Wait for user input before closing (skipped for unattended and sharded runs)
+    if sys.stdin.isatty():
+        input("\nPress Enter to exit...")
 
 if __name__ == "__main__":
     main()
@@ -31,12 +31,17 @@ import asyncio
 import time
 # Import the special case scraper
 from crawl_ex import UniversalJobScraper
+from async_browser_pool import BrowserPoolThread
 import google.generativeai as genai
 import json as _json
 from datetime import datetime
 from urllib.parse import urlparse
 from cookie_handler import CookieBannerHandler, apply_cookie_handling
-import psycopg2
+from apply_link_index import get_shared_index
+from detail_fetcher import SyncDetailFetcher
+from detail_cache import get_shared_detail_cache
+from detail_trimmer import trim_job_details, DEFAULT_DETAIL_TOKEN_BUDGET
+from resource_blocker import ResourceBlockingPolicy, BLOCKING_STATS, install_resource_blocking, remove_resource_blocking
 import os
 from dotenv import load_dotenv
 
@@ -93,58 +98,44 @@ GLOBAL_CONFIG = {
     'scroll_pause': 2,              # Seconds to wait between scrolls
     'use_extension': False,         # Use browser extension for cookie handling
     'cookie_strategy': 'hide_and_accept',  # Cookie handling strategy: hide_only, click_only, hide_and_accept, hide_and_reject
+    'resource_blocking': True,      # Abort images, media, fonts and trackers; False, or a dict of block_/allow_ types and domains
     'load_more_batch_size': 10,     # Number of jobs to process before loading more (for Load_more pagination)
+    'crawl_ex_browsers': 2,         # Browsers in the shared crawl_ex pool used by special-case companies
+    'crawl_ex_contexts_per_browser': 3,  # Contexts (companies or detail pages) per pooled browser at once
+    'special_case_timeout': 900,    # Seconds to wait for a special-case company's crawl
+    'apply_link_index_max_age': 3600,  # Seconds before the in-memory apply_link index is reloaded
 }
 
-# Database connection for duplicate checking
-def get_db_connection():
-    """Get database connection using environment variables"""
-    try:
-        database_url = os.getenv('DATABASE_URL')
-        if not database_url:
-            safe_print("⚠️ DATABASE_URL not found in environment variables")
-            return None
-        
-        conn = psycopg2.connect(database_url)
-        return conn
-    except Exception as e:
-        safe_print(f"⚠️ Database connection failed: {e}")
-        return None
+# Warm crawl4ai browser shared by every job details fetch of the session, backed by the on-disk detail cache
+DETAIL_FETCHER = SyncDetailFetcher(cache=get_shared_detail_cache())
+
+# Session-wide async browser pool for crawl_ex special cases, on its own loop thread
+CRAWL_EX_POOL = BrowserPoolThread()
+PENDING_SPECIAL_CASES = {}  # company name -> Future of a crawl started by start_special_case_crawls()
 
 def check_apply_link_exists(apply_link):
-    """Check if apply_link already exists in the database"""
+    """Check if apply_link is already known: saved in the database or accepted earlier in this session"""
     if not apply_link or apply_link == 'N/A':
         return False
     
-    try:
-        conn = get_db_connection()
-        if not conn:
-            # If database connection fails, don't skip jobs
-            safe_print("⚠️ Database unavailable, proceeding without duplicate check")
-            return False
-        
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT COUNT(*) FROM jobs WHERE apply_link = %s", (apply_link,))
-            count = cursor.fetchone()[0]
-            conn.close()
-            
-            if count > 0:
-                safe_print(f"🔍 Duplicate apply_link found, skipping job: {apply_link}")
-                return True
-            return False
-            
-    except Exception as e:
-        safe_print(f"⚠️ Error checking apply_link in database: {e}")
-        # If database check fails, don't skip the job
-        return False
+    # Known links are loaded once into memory instead of querying the database per card
+    if apply_link in get_shared_index(GLOBAL_CONFIG['apply_link_index_max_age']):
+        safe_print(f"🔍 Duplicate apply_link found, skipping job: {apply_link}")
+        return True
+    return False
 
-async def handle_special_case_scraping(config, browser_config=None, cookie_handler=None):
+def remember_apply_link(apply_link):
+    """Record an accepted job so later cards with the same link are skipped"""
+    get_shared_index(GLOBAL_CONFIG['apply_link_index_max_age']).add(apply_link)
+
+async def handle_special_case_scraping(config, browser_config=None, cookie_handler=None, browser_pool=None):
     """Handle special case scraping using crawl_ex UniversalJobScraper with advanced browser configuration
     
     Args:
         config: Company configuration dict
         browser_config: Advanced browser configuration dict with extension_path, context_options, etc.
         cookie_handler: Cookie banner handler instance for advanced cookie management
+        browser_pool: AsyncBrowserPool shared by all special-case companies of the session
     
     Returns:
         List of cleaned job data ready for unified Gemini processing
@@ -164,6 +155,7 @@ async def handle_special_case_scraping(config, browser_config=None, cookie_handl
             "pagination_selector": config.get('pagination_selector', '.pagination'),
             "pagination_type": config.get('pagination_type', 'Load_more'),
             "detail_container": config.get('detail_container', '.position-container'),
+            "resource_blocking": config.get('resource_blocking'),
             "batch_size": config.get('batch_size', GLOBAL_CONFIG['load_more_batch_size']),  # Batch size for Load_more
             "detail_selectors": {
                 "title": [config.get('title_selector', '.title'), "h1", ".job-title"],
@@ -176,7 +168,8 @@ async def handle_special_case_scraping(config, browser_config=None, cookie_handl
         }
         
         # Initialize the Universal Job Scraper with advanced browser configuration
-        scraper = UniversalJobScraper(company_config=universal_config, browser_config=browser_config, cookie_handler=cookie_handler)
+        scraper = UniversalJobScraper(company_config=universal_config, browser_config=browser_config, cookie_handler=cookie_handler,
+                                      browser_pool=browser_pool)
         
         # Scrape jobs using the crawl_ex method
         safe_print("🚀 Starting crawl_ex scraping...")
@@ -226,9 +219,12 @@ async def handle_special_case_scraping(config, browser_config=None, cookie_handl
                     cleaned_job_data['description'] = ' '.join(cleaned_job_data['description'].split())
                 
                 if cleaned_job_data['job_details_info'] != 'N/A':
-                    cleaned_job_data['job_details_info'] = ' '.join(cleaned_job_data['job_details_info'].split())
+                    trimmed = trim_job_details(cleaned_job_data['job_details_info'],
+                                               config.get('detail_token_budget', DEFAULT_DETAIL_TOKEN_BUDGET))
+                    cleaned_job_data['job_details_info'] = ' '.join(trimmed.split())
                 
                 cleaned_jobs.append(cleaned_job_data)
+                remember_apply_link(apply_link)
                 safe_print(f"✅ Prepared: {cleaned_job_data.get('title', 'Unknown')}")
             
             safe_print(f"🎉 Special case data preparation completed: {len(cleaned_jobs)} jobs ready for Gemini")
@@ -242,6 +238,21 @@ async def handle_special_case_scraping(config, browser_config=None, cookie_handl
         safe_print(f"❌ Error in special case scraping: {str(e)}")
         return []
 
+def start_special_case_crawl(config, browser_config=None, cookie_handler=None):
+    """Schedule a special-case company's crawl_ex run on the shared browser pool; returns a Future"""
+    return CRAWL_EX_POOL.submit(handle_special_case_scraping, config, browser_config, cookie_handler,
+                                browser_config=browser_config)
+
+def start_special_case_crawls(companies_config, browser_config=None, cookie_handler=None):
+    """Start the crawls of all special-case companies up front so they run concurrently on the pool"""
+    for company_config in companies_config:
+        config = normalize_company_config(company_config)
+        if config.get('special_case', False):
+            company_name = config.get('company_name', config.get('company', 'Unknown'))
+            PENDING_SPECIAL_CASES[company_name] = start_special_case_crawl(config, browser_config, cookie_handler)
+    if PENDING_SPECIAL_CASES:
+        safe_print(f"🚀 Started {len(PENDING_SPECIAL_CASES)} special-case crawls on the shared browser pool")
+
 def scrape_special_case_company(config, overall_start_time, browser_config=None, cookie_handler=None):
     """Handle special case scraping for a company using crawl_ex method with advanced browser configuration"""
     company_name = config.get('company_name', config.get('company', 'Unknown'))
@@ -250,19 +261,12 @@ def scrape_special_case_company(config, overall_start_time, browser_config=None,
     try:
         safe_print(f"🚀 Starting special case scraping for {company_name} with advanced browser config")
         
-        # Use asyncio to run the async crawl_ex method with browser configuration
-        import asyncio
-        import threading
-        import concurrent.futures
-        
-        def run_async_in_thread():
-            """Run async function in a separate thread with its own event loop"""
-            return asyncio.run(handle_special_case_scraping(config, browser_config, cookie_handler))
-        
-        # Run the async function in a separate thread to avoid event loop conflicts
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(run_async_in_thread)
-            cleaned_jobs_data = future.result(timeout=300)  # 5 minute timeout
+        # The crawl runs on the shared browser pool's loop; it may already have been started by
+        # start_special_case_crawls() so that several special-case companies crawl at once
+        future = PENDING_SPECIAL_CASES.pop(company_name, None)
+        if future is None:
+            future = start_special_case_crawl(config, browser_config, cookie_handler)
+        cleaned_jobs_data = future.result(timeout=GLOBAL_CONFIG['special_case_timeout'])
         
         # Now process each cleaned job through the same Gemini pipeline as regular scraping
         processed_jobs = []
@@ -282,7 +286,7 @@ def scrape_special_case_company(config, overall_start_time, browser_config=None,
 You are a professional job data analyst. Analyze the following scraped job data and create a clean, structured JSON response.
 
 RAW JOB DATA:
-{json.dumps(cleaned_job_data, indent=2, ensure_ascii=False)}
+{json.dumps(cleaned_job_data, ensure_ascii=False, separators=(',', ':'))}
 
 TASK: Extract and structure the following information into a clean JSON format:
 
@@ -878,8 +882,10 @@ def extract_and_clean_job_details(job_data, config):
         cleaned_data['description'] = ' '.join(cleaned_data['description'].split())
     
     if cleaned_data['job_details_info'] != 'N/A':
-        # Clean up job details info
-        cleaned_data['job_details_info'] = ' '.join(cleaned_data['job_details_info'].split())
+        # Keep the most relevant sections within the token budget
+        trimmed = trim_job_details(cleaned_data['job_details_info'],
+                                   config.get('detail_token_budget', DEFAULT_DETAIL_TOKEN_BUDGET))
+        cleaned_data['job_details_info'] = ' '.join(trimmed.split())
     
     # Extract additional fields if available
     additional_fields = ['job_id', 'department', 'employment_type', 'experience_level', 
@@ -1164,34 +1170,8 @@ def extract_job_data(page, config, existing_jobs=None, cookie_handler=None):
             apply_link = job_data.get('apply_link', None)
             if apply_link and apply_link != 'N/A':
                 try:
-                    import asyncio
-                    from crawl4ai import AsyncWebCrawler
-                    from crawl4ai.content_filter_strategy import BM25ContentFilter
-                    from crawl4ai.async_configs import CrawlerRunConfig
-                    from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
-                    async def crawl_job_details(url):
-                        bm25_filter = BM25ContentFilter(
-                            user_query="Job Description, Responsibilities, Skills, Requirements",
-                            bm25_threshold=1.2,
-                            language="english")
-
-                        markdowngen = DefaultMarkdownGenerator(content_filter=bm25_filter, options={"ignore_links": True, "images": True, "code_blocks": True})
-                        run_config = CrawlerRunConfig(markdown_generator=markdowngen, magic=True,page_timeout=50000, simulate_user=True, override_navigator=True)
-                        async with AsyncWebCrawler() as crawler:
-                            result = await crawler.arun(url=url, config=run_config)
-                            return result.markdown
-                    try:
-                        loop = asyncio.get_event_loop()
-                        if loop.is_running():
-                            import nest_asyncio
-                            nest_asyncio.apply()
-                            job_details_info = loop.run_until_complete(crawl_job_details(apply_link))
-                        else:
-                            job_details_info = loop.run_until_complete(crawl_job_details(apply_link))
-                    except Exception as e:
-                        print(f"Error running crawl4ai event loop for job {i+1}: {e}")
-                        stats['crawl4ai_errors'] += 1
-                        job_details_info = 'N/A'
+                    # HTTP first, then the session's warm crawl4ai browser instead of one browser per job
+                    job_details_info = DETAIL_FETCHER.fetch(apply_link, config)
                 except Exception as e:
                     print(f"Error scraping job details with crawl4ai for job {i+1}: {e}")
                     stats['crawl4ai_errors'] += 1
@@ -1246,7 +1226,7 @@ def extract_job_data(page, config, existing_jobs=None, cookie_handler=None):
 You are a professional job data analyst. Analyze the following scraped job data and create a clean, structured JSON response.
 
 RAW JOB DATA:
-{json.dumps(cleaned_job_data, indent=2, ensure_ascii=False)}
+{json.dumps(cleaned_job_data, ensure_ascii=False, separators=(',', ':'))}
 
 TASK: Extract and structure the following information into a clean JSON format:
 
@@ -1403,6 +1383,7 @@ OUTPUT: Return ONLY valid JSON without any markdown formatting, code blocks, or
 
             # Add the cleaned job to the results
             jobs.append(cleaned_job)
+            remember_apply_link(job_data.get('apply_link'))
             stats['successful_extractions'] += 1
                 
             
@@ -1952,22 +1933,35 @@ def main():
             safe_print(f"❌ Failed to create browser context: {e}")
             return
 
+        # Create browser configuration object
+        browser_config = {
+            'extension_path': extension_path,
+            'context_options': context_options,
+            'use_extension': GLOBAL_CONFIG['use_extension'],
+            'headless': GLOBAL_CONFIG['headless'],
+            'resource_blocking': GLOBAL_CONFIG['resource_blocking'],
+            'max_browsers': GLOBAL_CONFIG['crawl_ex_browsers'],
+            'contexts_per_browser': GLOBAL_CONFIG['crawl_ex_contexts_per_browser']
+        }
+        
         try:
+            # Special-case companies crawl concurrently on the pool while the others are scraped below
+            start_special_case_crawls(companies_config, browser_config, cookie_handler)
+            
             for i, company_config in enumerate(companies_config):
                 try:
                     # Normalize the configuration
                     normalized_config = normalize_company_config(company_config)
                     
-                    # Create browser configuration object
-                    browser_config = {
-                        'extension_path': extension_path,
-                        'context_options': context_options,
-                        'use_extension': GLOBAL_CONFIG['use_extension'],
-                        'headless': GLOBAL_CONFIG['headless']
-                    }
+                    # Skip images, media, fonts and trackers for this company's pages
+                    policy = ResourceBlockingPolicy.from_config(GLOBAL_CONFIG['resource_blocking'], normalized_config.get('resource_blocking'))
+                    route_handler = install_resource_blocking(context, policy)
                     
                     # Scrape this company
-                    result = scrape_single_company(page, normalized_config, overall_start_time, cookie_handler, browser_config)
+                    try:
+                        result = scrape_single_company(page, normalized_config, overall_start_time, cookie_handler, browser_config)
+                    finally:
+                        remove_resource_blocking(context, route_handler)
                     all_results.append(result)
                     
                     # Add delay between companies (except for the last one)
@@ -2003,6 +1997,8 @@ def main():
                     safe_print("✅ Browser closed successfully")
             except Exception as e:
                 safe_print(f"⚠️ Error closing browser: {e}")
+            DETAIL_FETCHER.close()
+            CRAWL_EX_POOL.close()
     
     overall_end_time = datetime.now()
     
@@ -2025,6 +2021,7 @@ def main():
     print(f"  Failed: {failed_companies}")
     print(f"  Total jobs scraped: {total_jobs:,}")
     print(f"  Total time: {total_time:.2f} seconds ({total_time/60:.1f} minutes)")
+    print(f"  Resource blocking: {BLOCKING_STATS.summary()}")
     
     if total_jobs > 0:
         print(f"  Average jobs per company: {total_jobs/total_companies:.1f}")
@@ -0,0 +1,108 @@
+"""
+Known Apply Link Index
+In-memory duplicate detection against the jobs table
+
+Instead of opening a new database connection per job card to run
+SELECT COUNT(*) FROM jobs WHERE apply_link = %s, every known apply_link is
+loaded once per session and kept as a sorted array of 64-bit BLAKE2b
+digests (8 bytes per link). Links accepted during the session go into a
+small set on top of it, so a job seen twice in one run is also skipped.
+That set is dropped whenever the index is reloaded: a job that was queued
+but never saved (enrichment or insert failed) is not in the fresh database
+snapshot, so it is scraped again instead of being skipped for good.
+
+At 64 bits a digest collision (a new job wrongly treated as a duplicate)
+needs on the order of billions of stored links, so hits are not re-checked
+against the database.
+"""
+
+import os
+import time
+import bisect
+import hashlib
+import threading
+from array import array
+
+from db_pool import pooled_connection
+
+DEFAULT_INDEX_MAX_AGE = 3600  # Seconds before a long-lived process reloads the index
+
+
+def link_digest(apply_link):
+    """64-bit digest of an apply link"""
+    return int.from_bytes(hashlib.blake2b(apply_link.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class ApplyLinkIndex:
+    """Compact, thread-safe set of known apply links"""
+
+    def __init__(self, apply_links=()):
+        self.loaded = array('Q', sorted({link_digest(link) for link in apply_links if link and link != 'N/A'}))
+        self.added = set()
+        self.lock = threading.Lock()
+        self.loaded_at = time.monotonic()
+        self.stats = {'lookups': 0, 'hits': 0, 'added': 0}
+
+    @classmethod
+    def from_database(cls, batch_size=10000):
+        """Load every apply_link of the jobs table, streaming rows through a server-side cursor"""
+        with pooled_connection() as conn:
+            with conn.cursor(name='apply_link_index') as cursor:
+                cursor.itersize = batch_size
+                cursor.execute("SELECT apply_link FROM jobs WHERE apply_link IS NOT NULL AND apply_link <> 'N/A'")
+                return cls(row[0] for row in cursor)
+
+    def __len__(self):
+        return len(self.loaded) + len(self.added)
+
+    def __contains__(self, apply_link):
+        if not apply_link or apply_link == 'N/A':
+            return False
+        digest = link_digest(apply_link)
+        position = bisect.bisect_left(self.loaded, digest)
+        found = (position < len(self.loaded) and self.loaded[position] == digest) or digest in self.added
+        with self.lock:
+            self.stats['lookups'] += 1
+            if found:
+                self.stats['hits'] += 1
+        return found
+
+    def add(self, apply_link):
+        """Remember a link accepted during this session"""
+        if not apply_link or apply_link == 'N/A':
+            return
+        with self.lock:
+            self.added.add(link_digest(apply_link))
+            self.stats['added'] += 1
+
+    def age(self):
+        return time.monotonic() - self.loaded_at
+
+
+_shared_index = None
+_shared_index_lock = threading.Lock()
+
+
+def get_shared_index(max_age=DEFAULT_INDEX_MAX_AGE):
+    """
+    Process-wide index, loaded on first use and reloaded once it is older than
+    max_age (so a resident daemon picks up jobs saved by other processes).
+    A reload starts from the database alone; links accepted since the last
+    load count as known only if they were actually saved.
+
+    If the database is unavailable an empty index is used, which means no
+    job is skipped as a duplicate, the same as the old per-card check did.
+    """
+    global _shared_index
+    with _shared_index_lock:
+        if _shared_index is None or (max_age and _shared_index.age() > max_age):
+            started = time.time()
+            try:
+                if not os.getenv('DATABASE_URL'):
+                    raise RuntimeError("DATABASE_URL not found in environment variables")
+                _shared_index = ApplyLinkIndex.from_database()
+                print(f"🔍 Loaded {len(_shared_index):,} known apply links in {time.time() - started:.1f}s")
+            except Exception as e:
+                print(f"⚠️ Could not load known apply links, proceeding without duplicate check: {e}")
+                _shared_index = ApplyLinkIndex()
+        return _shared_index
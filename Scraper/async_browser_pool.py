@@ -0,0 +1,284 @@
+"""
+Async Browser Pool
+Session-wide pool of async Playwright browsers for the crawl_ex scraper
+
+UniversalJobScraper used to launch a new Chromium for every company and
+another one for every job detail URL. The pool launches up to max_browsers
+browsers on demand. It lends out isolated contexts, or single pages, with
+at most contexts_per_browser leases per browser. A browser is retired once
+it has served recycle_after leases, failed max_failures leases in a row, or
+lost its connection; it is closed as soon as its last lease comes back and a
+fresh one is launched on demand.
+
+Playwright's async objects belong to the event loop that created them, so a
+pool lives on one loop. get_shared_browser_pool() returns the pool of the
+running loop; synchronous callers (Final_Scraper_copy's special cases) use
+BrowserPoolThread, which keeps a pool on a background loop thread.
+
+With a persistent context (extension mode) there is only one "browser"
+and one lease at a time: leases take turns on that context, and the pages
+and routes a lease added are removed when it is returned.
+"""
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+DEFAULT_MAX_BROWSERS = 2
+DEFAULT_CONTEXTS_PER_BROWSER = 4
+DEFAULT_RECYCLE_AFTER = 100   # Leases served before a browser is replaced
+DEFAULT_MAX_FAILURES = 3      # Consecutive failed leases before a browser is replaced
+BASIC_LAUNCH_OPTIONS = {'headless': False, 'slow_mo': 200}  # crawl_ex's historical default
+
+
+class _PooledBrowser:
+    """One browser (or persistent context) and its lease bookkeeping"""
+
+    def __init__(self, browser=None, persistent_context=None):
+        self.browser = browser
+        self.persistent_context = persistent_context
+        self.active = 0
+        self.served = 0
+        self.failures = 0
+        self.retired = False
+
+    def is_healthy(self):
+        if self.retired:
+            return False
+        if self.browser is not None:
+            return self.browser.is_connected()
+        return True
+
+    async def close(self):
+        try:
+            if self.persistent_context is not None:
+                await self.persistent_context.close()
+            elif self.browser is not None:
+                await self.browser.close()
+        except Exception as e:
+            print(f"⚠️ Error closing pooled browser: {e}")
+
+
+class AsyncBrowserPool:
+    """
+    Bounded pool of async Playwright browsers.
+
+    Args:
+        launch_options: chromium.launch() options
+        persistent_options: chromium.launch_persistent_context() options (extension mode, single browser)
+        max_browsers: browsers running at once
+        contexts_per_browser: leases per browser at once
+        recycle_after: leases a browser serves before it is replaced
+        max_failures: consecutive failed leases before a browser is replaced
+    """
+
+    def __init__(self, launch_options=None, persistent_options=None, max_browsers=DEFAULT_MAX_BROWSERS,
+                 contexts_per_browser=DEFAULT_CONTEXTS_PER_BROWSER, recycle_after=DEFAULT_RECYCLE_AFTER,
+                 max_failures=DEFAULT_MAX_FAILURES):
+        self.launch_options = dict(launch_options if launch_options is not None else BASIC_LAUNCH_OPTIONS)
+        self.persistent_options = persistent_options
+        # A persistent profile directory can only be opened by one browser at a time
+        self.max_browsers = 1 if persistent_options else max(1, max_browsers)
+        # Leases of a persistent context share its routes, so they take turns
+        self.contexts_per_browser = 1 if persistent_options else max(1, contexts_per_browser)
+        self.recycle_after = recycle_after
+        self.max_failures = max_failures
+
+        self.playwright = None
+        self.browsers = []
+        self.lock = None
+        self.slots = None
+        self.closed = False
+        self.stats = {'launches': 0, 'recycled': 0, 'leases': 0, 'failed_leases': 0}
+
+    @classmethod
+    def from_browser_config(cls, browser_config=None, **options):
+        """Pool for a crawl_ex browser_config (see Final_Scraper_copy.main)"""
+        browser_config = browser_config or {}
+        for key in ('max_browsers', 'contexts_per_browser', 'recycle_after'):
+            if key in browser_config:
+                options.setdefault(key, browser_config[key])
+        context_options = browser_config.get('context_options')
+        if context_options and browser_config.get('use_extension') and not browser_config.get('headless'):
+            return cls(persistent_options=context_options, **options)
+        return cls(launch_options=context_options, **options)
+
+    @property
+    def shares_context(self):
+        return self.persistent_options is not None
+
+    async def start(self):
+        """Start Playwright (called automatically by the first lease)"""
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+            self.slots = asyncio.Semaphore(self.max_browsers * self.contexts_per_browser)
+        async with self.lock:
+            if self.playwright is None:
+                from playwright.async_api import async_playwright
+                self.playwright = await async_playwright().start()
+
+    async def _launch(self):
+        if self.persistent_options:
+            context = await self.playwright.chromium.launch_persistent_context(**self.persistent_options)
+            pooled = _PooledBrowser(persistent_context=context)
+        else:
+            pooled = _PooledBrowser(browser=await self.playwright.chromium.launch(**self.launch_options))
+        self.browsers.append(pooled)
+        self.stats['launches'] += 1
+        print(f"🌐 Browser pool: launched browser {len(self.browsers)}/{self.max_browsers}")
+        return pooled
+
+    async def _checkout(self):
+        """Pick the least busy healthy browser with a free slot, launching one if needed"""
+        async with self.lock:
+            for pooled in [pooled for pooled in self.browsers if not pooled.is_healthy()]:
+                pooled.retired = True
+                if pooled.active == 0:
+                    await self._remove(pooled)
+            available = [pooled for pooled in self.browsers
+                         if pooled.is_healthy() and pooled.active < self.contexts_per_browser]
+            if available:
+                pooled = min(available, key=lambda item: item.active)
+            else:
+                # The slot semaphore bounds leases, so this is either below max_browsers or
+                # replacing retired browsers that are still draining their last leases
+                pooled = await self._launch()
+            pooled.active += 1
+            return pooled
+
+    async def _checkin(self, pooled, failed):
+        async with self.lock:
+            pooled.active -= 1
+            pooled.served += 1
+            pooled.failures = pooled.failures + 1 if failed else 0
+            if (pooled.served >= self.recycle_after or pooled.failures >= self.max_failures
+                    or not pooled.is_healthy()):
+                pooled.retired = True
+            if pooled.retired and pooled.active == 0:
+                await self._remove(pooled)
+
+    async def _remove(self, pooled):
+        if pooled in self.browsers:
+            self.browsers.remove(pooled)
+            self.stats['recycled'] += 1
+            await pooled.close()
+
+    @asynccontextmanager
+    async def context(self, **context_options):
+        """Lease an isolated browser context (the shared one in persistent mode)"""
+        if self.closed:
+            raise RuntimeError("browser pool is closed")
+        await self.start()
+        await self.slots.acquire()
+        pooled = None
+        context = None
+        existing_pages = set()
+        failed = False
+        try:
+            pooled = await self._checkout()
+            if pooled.persistent_context is not None:
+                context = pooled.persistent_context
+                existing_pages = set(context.pages)
+            else:
+                context = await pooled.browser.new_context(**context_options)
+            self.stats['leases'] += 1
+            yield context
+        except Exception:
+            failed = True
+            self.stats['failed_leases'] += 1
+            raise
+        finally:
+            if context is not None:
+                try:
+                    if pooled.persistent_context is not None:
+                        # Hand the shared context back the way the lease found it
+                        await context.unroute_all(behavior='ignoreErrors')
+                        for page in context.pages:
+                            if page not in existing_pages:
+                                await page.close()
+                    else:
+                        await context.close()
+                except Exception as e:
+                    print(f"⚠️ Error releasing browser context: {e}")
+            if pooled is not None:
+                await self._checkin(pooled, failed)
+            self.slots.release()
+
+    @asynccontextmanager
+    async def page(self, **context_options):
+        """Lease a single page in its own context"""
+        async with self.context(**context_options) as context:
+            page = await context.new_page()
+            yield page
+
+    async def close(self):
+        """Close every browser and stop Playwright"""
+        self.closed = True
+        browsers, self.browsers = self.browsers, []
+        for pooled in browsers:
+            await pooled.close()
+        playwright, self.playwright = self.playwright, None
+        if playwright is not None:
+            await playwright.stop()
+        if self.stats['leases']:
+            print(f"🌐 Browser pool closed: {self.stats['leases']} leases, "
+                  f"{self.stats['launches']} launches, {self.stats['recycled']} recycled")
+
+
+_shared_pools = {}
+
+
+def get_shared_browser_pool(browser_config=None):
+    """Session pool of the running event loop, created on first use"""
+    loop = asyncio.get_running_loop()
+    pool = _shared_pools.get(loop)
+    if pool is None or pool.closed:
+        pool = AsyncBrowserPool.from_browser_config(browser_config)
+        _shared_pools[loop] = pool
+    return pool
+
+
+async def close_shared_browser_pool():
+    """Close the running loop's session pool, if one was created"""
+    pool = _shared_pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
+
+
+class BrowserPoolThread:
+    """
+    Keeps an AsyncBrowserPool on a background event loop for synchronous
+    callers. submit(coroutine_function, *args) schedules
+    coroutine_function(*args, browser_pool=pool) on that loop and returns a
+    concurrent.futures.Future, so several companies can share the pool at once.
+    """
+
+    def __init__(self):
+        self.pool = None
+        self.loop = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def _ensure_loop(self, browser_config=None):
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(target=self.loop.run_forever, name='browser-pool', daemon=True)
+                self.thread.start()
+                self.pool = AsyncBrowserPool.from_browser_config(browser_config)
+            return self.loop
+
+    def submit(self, coroutine_function, *args, browser_config=None):
+        loop = self._ensure_loop(browser_config)
+        return asyncio.run_coroutine_threadsafe(coroutine_function(*args, browser_pool=self.pool), loop)
+
+    def close(self):
+        """Close the pool's browsers and stop the background loop"""
+        with self.lock:
+            loop, self.loop = self.loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.pool.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self.thread.join()
+        loop.close()
@@ -29,7 +29,9 @@ import subprocess
 import json
 import time
 from datetime import datetime
-from database_pipeline import DatabasePipeline, save_scraper_results_to_db
+from database_pipeline import save_scraper_results_to_db
+from result_sink import is_jsonl_results_file, iter_result_records
+from db_pool import pooled_connection
 
 def safe_print(text):
     """Safe printing function that handles Unicode characters on Windows"""
@@ -176,13 +178,22 @@ def run_scraper_with_db_integration(companies_file=None, auto_save=True, keep_js
         
         # Check if file has content
         try:
-            with open(results_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if 'companies' in data:
-                    total_jobs = sum(len(company_data.get('jobs', [])) for company_data in data['companies'].values())
-                    safe_print(f"📊 Results file contains {total_jobs} jobs from {len(data['companies'])} companies")
-                else:
-                    safe_print("⚠️ Results file format may be different")
+            if is_jsonl_results_file(results_file):
+                # Count streamed records without loading the file
+                total_jobs, companies = 0, set()
+                for record in iter_result_records(results_file):
+                    if record.get('type') == 'job':
+                        total_jobs += 1
+                        companies.add(record['company'])
+                safe_print(f"📊 Results file contains {total_jobs} jobs from {len(companies)} companies")
+            else:
+                with open(results_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                    if 'companies' in data:
+                        total_jobs = sum(len(company_data.get('jobs', [])) for company_data in data['companies'].values())
+                        safe_print(f"📊 Results file contains {total_jobs} jobs from {len(data['companies'])} companies")
+                    else:
+                        safe_print("⚠️ Results file format may be different")
         except Exception as e:
             safe_print(f"⚠️ Could not analyze results file: {e}")
         
@@ -249,9 +260,11 @@ def find_latest_results_file():
     
     # Look for timestamped files created by Final_Scraper.py
     try:
-        # Pattern: multi_company_results_YYYYMMDD_HHMMSS.json
+        # Pattern: multi_company_results_YYYYMMDD_HHMMSS.json (or .jsonl / .jsonl.gz when streamed)
         import glob
-        timestamped_files = glob.glob(os.path.join(current_dir, "multi_company_results_*.json"))
+        timestamped_files = []
+        for extension in ("json", "jsonl", "jsonl.gz"):
+            timestamped_files.extend(glob.glob(os.path.join(current_dir, f"multi_company_results_*.{extension}")))
         if timestamped_files:
             # Return the most recent one
             timestamped_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
@@ -294,45 +307,42 @@ def find_latest_results_file():
 def show_database_stats():
     """Show current database statistics"""
     try:
-        db_pipeline = DatabasePipeline()
-        
-        with db_pipeline.connection.cursor() as cursor:
-            # Get company count
-            cursor.execute("SELECT COUNT(*) FROM companies")
-            company_count = cursor.fetchone()[0]
+        with pooled_connection() as connection:
+            with connection.cursor() as cursor:
+                # Get company count
+                cursor.execute("SELECT COUNT(*) FROM companies")
+                company_count = cursor.fetchone()[0]
             
-            # Get job count
-            cursor.execute("SELECT COUNT(*) FROM jobs") 
-            job_count = cursor.fetchone()[0]
+                # Get job count
+                cursor.execute("SELECT COUNT(*) FROM jobs") 
+                job_count = cursor.fetchone()[0]
             
-            # Get recent jobs (last 24 hours)
-            cursor.execute("""
-                SELECT COUNT(*) FROM jobs 
-                WHERE created_at >= NOW() - INTERVAL '24 hours'
-            """)
-            recent_jobs = cursor.fetchone()[0]
+                # Get recent jobs (last 24 hours)
+                cursor.execute("""
+                    SELECT COUNT(*) FROM jobs 
+                    WHERE created_at >= NOW() - INTERVAL '24 hours'
+                """)
+                recent_jobs = cursor.fetchone()[0]
             
-            # Get top categories
-            cursor.execute("""
-                SELECT category, COUNT(*) as count
-                FROM jobs
-                GROUP BY category
-                ORDER BY count DESC
-                LIMIT 5
-            """)
-            top_categories = cursor.fetchall()
+                # Get top categories
+                cursor.execute("""
+                    SELECT category, COUNT(*) as count
+                    FROM jobs
+                    GROUP BY category
+                    ORDER BY count DESC
+                    LIMIT 5
+                """)
+                top_categories = cursor.fetchall()
             
-            safe_print(f"\n📊 CURRENT DATABASE STATISTICS")
-            print("=" * 60)
-            safe_print(f"🏢 Total Companies: {company_count}")
-            safe_print(f"💼 Total Jobs: {job_count}")
-            safe_print(f"🆕 Jobs Added (Last 24h): {recent_jobs}")
-            safe_print(f"\n🏷️ Top Job Categories:")
-            for category, count in top_categories:
-                print(f"  {category}: {count} jobs")
-            print("=" * 60)
-        
-        db_pipeline.close()
+                safe_print(f"\n📊 CURRENT DATABASE STATISTICS")
+                print("=" * 60)
+                safe_print(f"🏢 Total Companies: {company_count}")
+                safe_print(f"💼 Total Jobs: {job_count}")
+                safe_print(f"🆕 Jobs Added (Last 24h): {recent_jobs}")
+                safe_print(f"\n🏷️ Top Job Categories:")
+                for category, count in top_categories:
+                    print(f"  {category}: {count} jobs")
+                print("=" * 60)
         
     except Exception as e:
         safe_print(f"❌ Error getting database stats: {e}")
@@ -0,0 +1,203 @@
+"""
+Scraping Session Checkpoints
+Crash-safe journal of finished companies, pages and enriched jobs
+
+Every event is appended as one JSON line and flushed, so a killed process
+loses at most the job it was writing; session, page and company records
+are also fsync'ed. Replaying the journal with CheckpointJournal.load()
+rebuilds which companies are finished, which jobs were already enriched
+(and paid for), and how far each company got, which is what
+Final_Scraper --resume <session_id> needs to pick up mid-company.
+
+When jobs are streamed to a JSONL results file, that file already holds
+their bodies: the journal then records only each job's apply_link and
+whether it failed (store_jobs=False). Job bodies are journaled only for
+the single-document JSON format, and even then they are read back into
+memory only when a session is resumed, never during a live run.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+DEFAULT_CHECKPOINT_DIR = "checkpoints"
+
+
+class CheckpointJournal:
+    """Append-only JSONL journal for one scraping session"""
+
+    def __init__(self, session_id, directory=DEFAULT_CHECKPOINT_DIR, store_jobs=True):
+        self.session_id = session_id
+        self.directory = directory
+        self.path = os.path.join(directory, f"{session_id}.jsonl")
+        self.store_jobs = store_jobs
+        self.lock = threading.Lock()
+        self.file = None
+
+        # Replayed state
+        self.session = {}
+        self.completed_companies = {}  # company -> result metadata (without jobs)
+        self.jobs = {}                 # company -> [enriched jobs], filled only by load()
+        self.job_counts = {}           # company -> [jobs recorded, of which failed]
+        self.enriched_links = set()
+        self.pages_queued = {}         # company -> {page: jobs queued}
+        self.jobs_per_page = {}        # company -> {page: jobs persisted}
+
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def load(cls, session_id, directory=DEFAULT_CHECKPOINT_DIR):
+        """Replay an existing journal; raises FileNotFoundError if there is none"""
+        journal = cls(session_id, directory)
+        if not os.path.exists(journal.path):
+            raise FileNotFoundError(f"No checkpoint journal found: {journal.path}")
+
+        with open(journal.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    journal._apply(json.loads(line), replay=True)
+                except json.JSONDecodeError:
+                    # A torn last line from a crash mid-write; everything before it is intact
+                    continue
+        return journal
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _append(self, record):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.path, 'a', encoding='utf-8')
+            self.file.write(line + "\n")
+            self.file.flush()
+            if record['type'] != 'job':
+                os.fsync(self.file.fileno())
+            self._apply(record)
+
+    def close(self):
+        """Close the journal file (it is reopened by the next append)"""
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def record_session(self, start_time, companies_file, shard=None):
+        """Record how the session was started (written once)"""
+        if self.session:
+            return
+        self._append({
+            'type': 'session',
+            'session_id': self.session_id,
+            'start_time': start_time.isoformat(),
+            'companies_file': companies_file,
+            'shard': list(shard) if shard else None,
+            'store_jobs': self.store_jobs
+        })
+
+    def record_page(self, company, page_number, jobs_queued):
+        """Record that a listing page was read and how many of its jobs were queued"""
+        self._append({'type': 'page', 'company': company, 'page': page_number, 'queued': jobs_queued})
+
+    def record_job(self, company, page_number, job):
+        """Record one enriched job as soon as it leaves the pipeline"""
+        record = {'type': 'job', 'company': company, 'page': page_number,
+                  'apply_link': job.get('apply_link'), 'failed': 'gemini_error' in job}
+        if self.store_jobs:
+            record['job'] = job
+        self._append(record)
+
+    def record_company(self, result):
+        """Record a finished company (its jobs are already in the journal)"""
+        meta = {key: value for key, value in result.items() if key != 'jobs'}
+        for key in ('start_time', 'end_time'):
+            if isinstance(meta.get(key), datetime):
+                meta[key] = meta[key].isoformat()
+        self._append({'type': 'company', 'company': result['company_name'], 'result': meta})
+
+    def remove(self):
+        """Delete the journal once the session's results are safely saved"""
+        self.close()
+        with self.lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    # ------------------------------------------------------------------
+    # Replay and queries
+    # ------------------------------------------------------------------
+
+    def _apply(self, record, replay=False):
+        record_type = record.get('type')
+        company = record.get('company')
+
+        if record_type == 'session':
+            self.session = record
+            self.store_jobs = record.get('store_jobs', True)
+        elif record_type == 'page':
+            self.pages_queued.setdefault(company, {})[record['page']] = record['queued']
+        elif record_type == 'job':
+            job = record.get('job')
+            if replay and job is not None:
+                self.jobs.setdefault(company, []).append(job)
+            # Journals written before job records carried these read them from the body
+            apply_link = record['apply_link'] if 'apply_link' in record else (job or {}).get('apply_link')
+            failed = record['failed'] if 'failed' in record else 'gemini_error' in (job or {})
+            counts = self.job_counts.setdefault(company, [0, 0])
+            counts[0] += 1
+            counts[1] += 1 if failed else 0
+            page_counts = self.jobs_per_page.setdefault(company, {})
+            page_counts[record['page']] = page_counts.get(record['page'], 0) + 1
+            if apply_link and apply_link != 'N/A':
+                self.enriched_links.add(apply_link)
+        elif record_type == 'company':
+            self.completed_companies[company] = record['result']
+
+    def start_time(self):
+        """Original session start time, if recorded"""
+        if self.session.get('start_time'):
+            return datetime.fromisoformat(self.session['start_time'])
+        return None
+
+    def is_company_done(self, company):
+        return company in self.completed_companies
+
+    def is_job_enriched(self, apply_link):
+        return apply_link in self.enriched_links
+
+    def restored_jobs(self, company):
+        """
+        Jobs already enriched for a company in an earlier run; empty when
+        their bodies live in the streamed results file instead
+        """
+        return list(self.jobs.get(company, []))
+
+    def restored_counts(self, company):
+        """(jobs, failed jobs) recorded for a company before the interruption"""
+        jobs, failed = self.job_counts.get(company, (0, 0))
+        return jobs, failed
+
+    def restored_result(self, company):
+        """Rebuild the result dict of a finished company"""
+        result = dict(self.completed_companies[company])
+        for key in ('start_time', 'end_time'):
+            if isinstance(result.get(key), str):
+                result[key] = datetime.fromisoformat(result[key])
+        result['jobs'] = self.restored_jobs(company)
+        return result
+
+    def last_completed_page(self, company):
+        """
+        Highest page p such that every page up to p had all of its queued jobs
+        persisted. Pages are 1-based; 0 means the company must start over.
+        """
+        queued = self.pages_queued.get(company, {})
+        persisted = self.jobs_per_page.get(company, {})
+        completed = 0
+        while (completed + 1) in queued and persisted.get(completed + 1, 0) >= queued[completed + 1]:
+            completed += 1
+        return completed
@@ -1,11 +1,29 @@
 import asyncio
-from playwright.async_api import async_playwright
 import time
 import json
 from urllib.parse import urljoin, urlparse
+from detail_cache import get_shared_detail_cache, revalidate
+from resource_blocker import ResourceBlockingPolicy, install_resource_blocking_async
+from async_browser_pool import get_shared_browser_pool, close_shared_browser_pool
+
+DEFAULT_DETAIL_TABS = 4  # Job detail pages open at once in "tabs" detail mode
+MAX_LOAD_MORE_CLICKS = 50
+DEFAULT_COMPANY_CONCURRENCY = 3  # Companies scraped at once by scrape_multiple_companies
+
+# Detail URL of every job card: a link around/inside the click target or title, else on the card itself
+CARD_LINK_SCRIPT = """(cards, selectors) => cards.map(card => {
+    for (const selector of selectors) {
+        const target = selector ? card.querySelector(selector) : null;
+        const anchor = target && (target.closest('a[href]') || target.querySelector('a[href]'));
+        if (anchor) return anchor.href;
+    }
+    const anchor = card.closest('a[href]') || card.querySelector('a[href]');
+    return anchor ? anchor.href : (card.getAttribute('data-href') || card.getAttribute('data-url'));
+})"""
 
 class UniversalJobScraper:
-    def __init__(self, company_config=None, company_name=None, selectors_file=None, browser_config=None, cookie_handler=None):
+    def __init__(self, company_config=None, company_name=None, selectors_file=None, browser_config=None, cookie_handler=None, detail_cache=None,
+                 browser_pool=None):
         """
         Initialize the scraper with company configuration and advanced browser options
         
@@ -15,9 +33,17 @@ class UniversalJobScraper:
             selectors_file: Path to JSON file containing multi-company selectors
             browser_config: Advanced browser configuration dict with extension_path, context_options, etc.
             cookie_handler: Cookie banner handler instance for advanced cookie management
+            detail_cache: DetailCache for job detail pages (defaults to the shared on-disk cache)
+            browser_pool: AsyncBrowserPool to borrow browsers from (defaults to the session pool of the running loop)
+        
+        Load_more listings open job details in parallel tabs ("detail_mode": "tabs",
+        "detail_tabs": N in the company config); "detail_mode": "click" keeps the
+        click -> go_back navigation for sites whose cards carry no links.
         """
         self.browser_config = browser_config
         self.cookie_handler = cookie_handler
+        self.detail_cache = detail_cache
+        self.browser_pool = browser_pool
         
         if company_config:
             self.config = company_config
@@ -52,6 +78,8 @@ class UniversalJobScraper:
         
         self.base_url = self.get_base_url(self.config["url"])
         self.careers_url = self.config["url"]
+        self.detail_mode = self.config.get("detail_mode", "tabs")
+        self.detail_tabs = max(1, int(self.config.get("detail_tabs", DEFAULT_DETAIL_TABS)))
         self.job_data = []
     
     def load_company_from_selectors(self, company_name, selectors_file):
@@ -125,50 +153,31 @@ class UniversalJobScraper:
         parsed = urlparse(url)
         return f"{parsed.scheme}://{parsed.netloc}"
         
+    async def apply_resource_blocking(self, context):
+        """Abort images, media, fonts and trackers in a new browser context"""
+        try:
+            global_setting = (self.browser_config or {}).get('resource_blocking', True)
+            policy = ResourceBlockingPolicy.from_config(global_setting, self.config.get('resource_blocking'))
+            await install_resource_blocking_async(context, policy)
+        except Exception as e:
+            print(f"⚠️ Could not enable resource blocking: {e}")
+
+    def get_browser_pool(self):
+        """The pool this scraper borrows browsers from (the session pool of the running loop by default)"""
+        return self.browser_pool or get_shared_browser_pool(self.browser_config)
+    
     async def scrape_jobs(self):
-        """Scrape job data from careers page with pagination support using advanced browser configuration"""
-        async with async_playwright() as p:
-            # Use advanced browser configuration if provided, otherwise fallback to basic setup
-            if self.browser_config:
-                print(f"🔧 Using advanced browser configuration for crawl_ex method")
-                
-                try:
-                    if self.browser_config.get('use_extension') and not self.browser_config.get('headless'):
-                        # Use extension-based browser setup with persistent context
-                        context = await p.chromium.launch_persistent_context(**self.browser_config['context_options'])
-                        page = await context.new_page()
-                        browser = None  # Not used in persistent context mode
-                    else:
-                        # Use module-based browser setup with separate browser and context
-                        browser = await p.chromium.launch(**self.browser_config['context_options'])
-                        context = await browser.new_context()
-                        page = await context.new_page()
-                        
-                    print(f"✅ Advanced browser setup completed for crawl_ex")
-                    
-                except Exception as e:
-                    print(f"⚠️ Advanced browser setup failed, falling back to basic: {e}")
-                    # Fallback to basic browser setup
-                    browser = await p.chromium.launch(
-                        headless=False,
-                        slow_mo=200
-                    )
-                    context = await browser.new_context()
-                    page = await context.new_page()
-            else:
-                # Original basic browser setup for backward compatibility
-                print(f"🔧 Using basic browser configuration for crawl_ex method")
-                browser = await p.chromium.launch(
-                    headless=False,  # Set to True for headless mode
-                    slow_mo=200      # Reduced from 1000ms to 200ms for faster operations
-                )
-                context = await browser.new_context()
-                page = await context.new_page()
+        """Scrape job data from careers page with pagination support, in a context leased from the browser pool"""
+        if self.browser_config:
+            print(f"🔧 Using advanced browser configuration for crawl_ex method")
+        else:
+            print(f"🔧 Using basic browser configuration for crawl_ex method")
+        
+        async with self.get_browser_pool().context() as context:
+            await self.apply_resource_blocking(context)
+            page = await context.new_page()
             
             try:
-                # Create new page
-                page = await browser.new_page()
-                
                 # Set viewport and user agent
                 await page.set_viewport_size({"width": 1920, "height": 1080})
                 await page.set_extra_http_headers({
@@ -384,9 +393,6 @@ class UniversalJobScraper:
             except Exception as e:
                 print(f"❌ Error during scraping: {str(e)}")
                 return []
-                
-            finally:
-                await browser.close()
     
     async def load_all_jobs(self, page):
         """Load all jobs by clicking 'Load More' button until no more jobs to load"""
@@ -465,6 +471,117 @@ class UniversalJobScraper:
         print("=" * 50)
     
     async def process_jobs_with_progressive_loading(self, page):
+        """
+        Process jobs while Load More reveals them.
+        
+        In "tabs" detail mode the detail URLs are read from the loaded cards and
+        opened in a bounded pool of tabs of the same context, while the listing
+        page stays put and keeps loading more. Sites whose cards carry no links
+        fall back to clicking each card and navigating back.
+        """
+        if self.detail_mode != "tabs":
+            return await self.process_jobs_by_clicking(page)
+        
+        print(f"\n🔄 PROGRESSIVE LOADING WITH {self.detail_tabs} PARALLEL DETAIL TABS")
+        print("=" * 60)
+        
+        semaphore = asyncio.Semaphore(self.detail_tabs)
+        tasks = []
+        queued = 0
+        load_count = 0
+        
+        while True:
+            # One evaluate_all per round instead of re-querying every card after each job
+            links = await self.collect_card_links(page)
+            if queued == 0 and links and not all(links):
+                print("⚠️ Job cards carry no detail links, falling back to click navigation")
+                return await self.process_jobs_by_clicking(page)
+            
+            for index in range(queued, len(links)):
+                if links[index] is None:
+                    print(f"⚠️ No detail link for job {index + 1}, skipping")
+                    continue
+                tasks.append(asyncio.create_task(
+                    self.extract_job_in_tab(page.context, semaphore, links[index], load_count + 1)))
+            queued = max(queued, len(links))
+            print(f"📊 Jobs loaded: {queued}, detail pages queued: {len(tasks)}")
+            
+            # The listing keeps loading while the tabs work through the queue
+            if load_count >= MAX_LOAD_MORE_CLICKS or not await self.click_load_more(page, queued):
+                break
+            load_count += 1
+        
+        for job_info in await asyncio.gather(*tasks):
+            self.job_data.append(job_info)
+        
+        print(f"\n🎉 PROGRESSIVE PROCESSING COMPLETED")
+        print(f"📊 Total jobs processed: {len(tasks)}")
+        print(f"🔄 Load More clicks: {load_count}")
+        print("=" * 60)
+    
+    async def collect_card_links(self, page):
+        """Detail URLs of all loaded job cards (None for cards without a usable link)"""
+        selectors = [self.config.get("click_target", ""), self.config["title"]]
+        links = await page.locator(self.config["job_card"]).evaluate_all(CARD_LINK_SCRIPT, selectors)
+        listing_url = page.url.split('#')[0]
+        return [link if link and link.startswith('http') and link.split('#')[0] != listing_url else None
+                for link in links]
+    
+    async def click_load_more(self, page, current_jobs):
+        """Click Load More once; returns True if new job cards appeared"""
+        load_more_button = page.locator(self.config["pagination_selector"]).first
+        if await load_more_button.count() == 0:
+            print("🛑 Load More button not found")
+            return False
+        if not await load_more_button.is_visible() or await load_more_button.get_attribute("disabled") == "true":
+            print("🛑 Load More button is not available or disabled")
+            return False
+        
+        print("🔍 Clicking Load More button...")
+        await load_more_button.scroll_into_view_if_needed()
+        await load_more_button.click()
+        await page.wait_for_timeout(1500)
+        
+        new_job_count = await page.locator(self.config["job_card"]).count()
+        if new_job_count <= current_jobs:
+            print("🛑 No new jobs loaded, stopping")
+            return False
+        print(f"✅ Loaded {new_job_count - current_jobs} more jobs (Total: {new_job_count})")
+        return True
+    
+    async def extract_job_in_tab(self, context, semaphore, job_url, batch_number):
+        """Open one job detail URL in its own tab and extract it"""
+        job_info = {
+            'title': "N/A",
+            'location': "N/A",
+            'posted_date': "N/A",
+            'description': "N/A",
+            'requirements': "N/A",
+            'employment_type': "N/A",
+            'full_job_details': "N/A",
+            'apply_link': job_url
+        }
+        async with semaphore:
+            tab = None
+            try:
+                tab = await context.new_page()
+                await tab.goto(job_url, wait_until="domcontentloaded", timeout=20000)
+                job_info.update(await self.extract_job_details(tab))
+                print(f"✅ Completed: {job_info['title']} - {job_info['location']}")
+            except Exception as e:
+                print(f"❌ Error loading job details from {job_url}: {str(e)}")
+                job_info.update(self._get_default_job_details(f"Error: {str(e)}"))
+            finally:
+                if tab is not None:
+                    await tab.close()
+        
+        job_info['company'] = self.config["company"]
+        job_info['scraped_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        job_info['batch_number'] = batch_number
+        job_info['source_url'] = self.careers_url
+        return job_info
+    
+    async def process_jobs_by_clicking(self, page):
         """Process jobs in batches of 10, clicking Load More when needed"""
         print("\n🔄 PROGRESSIVE LOADING & PROCESSING (10 jobs at a time)")
         print("=" * 60)
@@ -777,20 +894,53 @@ class UniversalJobScraper:
                 continue
         return "N/A"
     
+    async def load_cached_job_details(self, job_url):
+        """Return cached details for job_url if they are fresh or still valid upstream, else None"""
+        try:
+            cache = self.detail_cache or get_shared_detail_cache()
+            cached = cache.get(job_url)
+            if cached is None or cached.kind != 'job_details':
+                return None
+            if not cached.fresh:
+                if not cached.conditional_headers():
+                    return None
+                import aiohttp
+                async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=20)) as session:
+                    if not await revalidate(cache, session, job_url, cached):
+                        return None
+            return json.loads(cached.content)
+        except Exception as e:
+            print(f"⚠️ Detail cache lookup failed: {str(e)}")
+            return None
+
+    def store_job_details(self, job_url, job_data, response=None):
+        """Cache scraped details together with the page's validators"""
+        try:
+            headers = response.headers if response else {}
+            (self.detail_cache or get_shared_detail_cache()).put(
+                job_url, json.dumps(job_data, ensure_ascii=False),
+                etag=headers.get('etag'), last_modified=headers.get('last-modified'), kind='job_details')
+        except Exception as e:
+            print(f"⚠️ Could not cache job details: {str(e)}")
+
     async def scrape_job_details(self, job_url):
         """Scrape detailed information from a specific job URL"""
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=False)
-            
+        cached_job = await self.load_cached_job_details(job_url)
+        if cached_job is not None:
+            print(f"📦 Using cached job details for: {job_url}")
+            return cached_job
+
+        async with self.get_browser_pool().context() as context:
             try:
-                page = await browser.new_page()
+                await self.apply_resource_blocking(context)
+                page = await context.new_page()
                 await page.set_viewport_size({"width": 1920, "height": 1080})
                 
                 print(f"Scraping job details from: {job_url}")
                 
                 # Add timeout and better error handling
                 try:
-                    await page.goto(job_url, wait_until="domcontentloaded", timeout=20000)  # Fixed timeout from 2000 to 20000
+                    response = await page.goto(job_url, wait_until="domcontentloaded", timeout=20000)  # Fixed timeout from 2000 to 20000
                     print("✅ Page loaded successfully")
                 except Exception as e:
                     print(f"⚠️ Page load error: {str(e)}")
@@ -887,14 +1037,13 @@ class UniversalJobScraper:
                 job_data['scraped_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
                 
                 print(f"✅ Extracted detailed job data: {job_data['title']}")
+                if job_data['description'] != "N/A":
+                    self.store_job_details(job_url, job_data, response)
                 return job_data
                 
             except Exception as e:
                 print(f"❌ Error scraping job details from {job_url}: {str(e)}")
                 return {'url': job_url, 'error': str(e)}
-                
-            finally:
-                await browser.close()
     
     def save_results(self, filename=None):
         """Save scraped job data to a JSON file"""
@@ -1016,25 +1165,12 @@ async def main():
             
     except Exception as e:
         print(f"❌ Error initializing scraper: {str(e)}")
+    finally:
+        await close_shared_browser_pool()
 
-async def scrape_multiple_companies():
-    """Function to scrape jobs from multiple companies"""
-    selectors_file = "multi_company_selectors.json"
-    
-    # Get list of available companies
-    available_companies = UniversalJobScraper.list_available_companies(selectors_file)
-    
-    if not available_companies:
-        print("❌ No companies found in selectors file")
-        return
-    
-    print(f"\n🚀 MULTI-COMPANY SCRAPING SESSION")
-    print("=" * 50)
-    
-    all_results = {}
-    
-    # Scrape jobs from each company
-    for company_name in available_companies:
+async def scrape_company(company_name, selectors_file, semaphore):
+    """Scrape one company of a multi-company session; returns its summary entry"""
+    async with semaphore:
         print(f"\n🎯 Scraping {company_name.upper()}...")
         print("=" * 30)
         
@@ -1048,27 +1184,49 @@ async def scrape_multiple_companies():
             
             if job_data:
                 filename = scraper.save_results()
-                all_results[company_name] = {
+                print(f"✅ {company_name}: {len(job_data)} jobs scraped")
+                return {
                     'jobs_count': len(job_data),
                     'filename': filename,
                     'jobs': job_data
                 }
-                print(f"✅ {company_name}: {len(job_data)} jobs scraped")
-            else:
-                print(f"⚠️ {company_name}: No jobs found")
-                all_results[company_name] = {
-                    'jobs_count': 0,
-                    'filename': None,
-                    'jobs': []
-                }
+            print(f"⚠️ {company_name}: No jobs found")
+            return {
+                'jobs_count': 0,
+                'filename': None,
+                'jobs': []
+            }
                 
         except Exception as e:
             print(f"❌ Error scraping {company_name}: {str(e)}")
-            all_results[company_name] = {
+            return {
                 'jobs_count': 0,
                 'filename': None,
                 'error': str(e)
             }
+
+async def scrape_multiple_companies(concurrency=DEFAULT_COMPANY_CONCURRENCY):
+    """Function to scrape jobs from multiple companies, several at once on the shared browser pool"""
+    selectors_file = "multi_company_selectors.json"
+    
+    # Get list of available companies
+    available_companies = UniversalJobScraper.list_available_companies(selectors_file)
+    
+    if not available_companies:
+        print("❌ No companies found in selectors file")
+        return
+    
+    print(f"\n🚀 MULTI-COMPANY SCRAPING SESSION ({concurrency} companies at once)")
+    print("=" * 50)
+    
+    # Scrape jobs from each company
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    try:
+        results = await asyncio.gather(*(scrape_company(company_name, selectors_file, semaphore)
+                                         for company_name in available_companies))
+    finally:
+        await close_shared_browser_pool()
+    all_results = dict(zip(available_companies, results))
     
     # Display final summary
     print(f"\n📊 MULTI-COMPANY SCRAPING SUMMARY")
@@ -26,9 +26,15 @@ if sys.platform == 'win32':
         sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
 import psycopg2
+from contextlib import contextmanager
 from datetime import datetime
 from dotenv import load_dotenv
 import json
+from result_sink import is_jsonl_results_file, iter_result_jobs
+from db_pool import get_pool
+
+# Jobs saved per save_jobs_batch() call when streaming a JSONL results file
+STREAM_BATCH_SIZE = 200
 
 # Load environment variables
 load_dotenv()
@@ -66,28 +72,50 @@ def safe_print(text):
             print(safe_text.encode('ascii', 'replace').decode('ascii'))
 
 class DatabasePipeline:
-    def __init__(self):
+    def __init__(self, connect=True):
         self.connection = None
-        self.connect()
+        if connect:
+            self.connect()
     
     def connect(self):
-        """Establish connection to PostgreSQL database"""
+        """Check a connection out of the shared pool"""
         try:
-            database_url = os.getenv('DATABASE_URL')
-            if not database_url:
-                raise Exception("DATABASE_URL not found in environment variables")
-            
-            self.connection = psycopg2.connect(database_url)
+            self.connection = get_pool().getconn()
             print("✅ Database connection established")
             return True
         except Exception as e:
             print(f"❌ Database connection failed: {e}")
             return False
     
+    def ensure_connection(self):
+        """Replace the connection if the server dropped it (reconnect-on-failure)"""
+        if self.connection is not None and not self.connection.closed:
+            return True
+        if self.connection is not None:
+            get_pool().putconn(self.connection, close=True)
+            self.connection = None
+        print("🔄 Database connection lost, reconnecting...")
+        return self.connect()
+    
+    @contextmanager
+    def checked_out(self):
+        """
+        Hold a pooled connection only for the calls inside the block, for
+        long-lived users that would otherwise keep one checked out while idle
+        (DatabasePipeline(connect=False) starts without one)
+        """
+        self.connection = get_pool().getconn()
+        try:
+            yield self
+        finally:
+            connection, self.connection = self.connection, None
+            get_pool().putconn(connection, close=connection.closed)
+
     def close(self):
-        """Close database connection"""
+        """Return the connection to the shared pool"""
         if self.connection:
-            self.connection.close()
+            get_pool().putconn(self.connection)
+            self.connection = None
             print("🔒 Database connection closed")
     
     def ensure_company_exists(self, company_name, source_url=None):
@@ -159,11 +187,11 @@ class DatabasePipeline:
                         department, remote_work, salary, deadline, posted_date,
                         requirements, preferred_qualifications, responsibilities,
                         benefits, skills, tags, source_url,
-                        scraped_at, job_details_info, created_at
+                        scraped_at, job_details_info, enrichment_status, raw_job, created_at
                     ) VALUES (
                         %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
                         %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s
+                        %s, %s, %s, %s, %s, %s, %s, %s
                     )
                     RETURNING apply_link
                 """, (
@@ -192,6 +220,9 @@ class DatabasePipeline:
                     source_url,
                     job_data.get('scraped_at', datetime.now().isoformat()),
                     job_data.get('job_details_info'),
+                    # Deferred jobs carry what enrichment_worker.py needs to enrich them later
+                    job_data.get('enrichment_status', 'enriched'),
+                    json.dumps(job_data['enrichment_input'], default=str) if job_data.get('enrichment_input') else None,
                     datetime.now()
                 ))
                 
@@ -220,6 +251,10 @@ class DatabasePipeline:
         for i, job_data in enumerate(jobs_list, 1):
             print(f"Processing job {i}/{len(jobs_list)}: {job_data.get('title', 'Unknown')}")
             
+            if not self.ensure_connection():
+                stats['errors'] += 1
+                continue
+            
             # Skip jobs with Gemini errors (fallback jobs)
             if 'gemini_error' in job_data:
                 print(f"⚠️ Skipping job with Gemini error: {job_data.get('title', 'Unknown')}")
@@ -253,6 +288,103 @@ class DatabasePipeline:
         
         return stats
     
+    def claim_pending_jobs(self, limit, claim_timeout):
+        """
+        Claim up to limit jobs awaiting enrichment and mark them processing.
+        Pending rows still backing off after a failed attempt are skipped.
+        Rows claimed by a worker that died more than claim_timeout seconds
+        ago are claimed again; SKIP LOCKED keeps concurrent workers apart.
+        Returns (apply_link, raw_job, job_details_info, attempts) tuples.
+        """
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE jobs
+                    SET enrichment_status = 'processing', enrichment_claimed_at = NOW(),
+                        enrichment_attempts = enrichment_attempts + 1
+                    WHERE apply_link IN (
+                        SELECT apply_link FROM jobs
+                        WHERE (enrichment_status = 'pending'
+                               AND (enrichment_not_before IS NULL OR enrichment_not_before <= NOW()))
+                           OR (enrichment_status = 'processing'
+                               AND enrichment_claimed_at < NOW() - %s * INTERVAL '1 second')
+                        ORDER BY created_at
+                        FOR UPDATE SKIP LOCKED
+                        LIMIT %s
+                    )
+                    RETURNING apply_link, raw_job, job_details_info, enrichment_attempts
+                """, (claim_timeout, limit))
+                rows = cursor.fetchall()
+                self.connection.commit()
+                return rows
+        except Exception as e:
+            print(f"❌ Error claiming pending jobs: {e}")
+            self.connection.rollback()
+            return []
+    
+    def update_enriched_job(self, apply_link, job_data):
+        """Write the structured fields of an enriched job back to its pending row"""
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE jobs SET
+                        title = %s, location = %s, employment_type = %s, experience_level = %s,
+                        work_mode = %s, category = %s, is_technical = %s, description = %s, job_id = %s,
+                        department = %s, remote_work = %s, salary = %s, deadline = %s, posted_date = %s,
+                        requirements = %s, preferred_qualifications = %s, responsibilities = %s,
+                        benefits = %s, skills = %s, tags = %s,
+                        enrichment_status = 'enriched', enrichment_error = NULL,
+                        enrichment_claimed_at = NULL, enrichment_not_before = NULL, raw_job = NULL
+                    WHERE apply_link = %s AND enrichment_status = 'processing'
+                """, (
+                    job_data.get('title', 'N/A'),
+                    job_data.get('location', 'N/A'),
+                    job_data.get('employment_type'),
+                    job_data.get('experience_level'),
+                    job_data.get('remote_work'),  # work_mode
+                    self.categorize_job(job_data.get('title', ''), job_data.get('description', '')),
+                    self.is_technical_job(job_data.get('title', ''), job_data.get('description', '')),
+                    job_data.get('description', 'N/A'),
+                    job_data.get('job_id'),
+                    job_data.get('department'),
+                    job_data.get('remote_work'),
+                    job_data.get('salary'),
+                    job_data.get('deadline'),
+                    job_data.get('posted_date'),
+                    json.dumps(job_data.get('requirements', [])) if job_data.get('requirements') else None,
+                    json.dumps(job_data.get('preferred_qualifications', [])) if job_data.get('preferred_qualifications') else None,
+                    json.dumps(job_data.get('responsibilities', [])) if job_data.get('responsibilities') else None,
+                    json.dumps(job_data.get('benefits', [])) if job_data.get('benefits') else None,
+                    json.dumps(job_data.get('skills', [])) if job_data.get('skills') else None,
+                    json.dumps(job_data.get('tags', [])) if job_data.get('tags') else None,
+                    apply_link
+                ))
+                updated = cursor.rowcount
+                self.connection.commit()
+                return updated > 0
+        except Exception as e:
+            print(f"❌ Error updating enriched job: {e}")
+            self.connection.rollback()
+            return False
+    
+    def release_pending_job(self, apply_link, error, failed=False, retry_delay=0):
+        """
+        Put a job whose enrichment failed back in the queue, not to be claimed
+        again for retry_delay seconds, or mark it failed for good
+        """
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE jobs
+                    SET enrichment_status = %s, enrichment_error = %s, enrichment_claimed_at = NULL,
+                        enrichment_not_before = NOW() + %s * INTERVAL '1 second'
+                    WHERE apply_link = %s AND enrichment_status = 'processing'
+                """, ('failed' if failed else 'pending', error, retry_delay, apply_link))
+                self.connection.commit()
+        except Exception as e:
+            print(f"❌ Error releasing pending job: {e}")
+            self.connection.rollback()
+    
     def update_company_job_counts(self):
         """Update job_count for all companies"""
         try:
@@ -315,13 +447,36 @@ class DatabasePipeline:
         return any(keyword in title_lower for keyword in technical_keywords) and 'Yes' or 'No'
 
 
+def save_streamed_results(db_pipeline, results_file, total_stats, batch_size=STREAM_BATCH_SIZE):
+    """Save the jobs of a JSONL results file in fixed-size batches without loading the whole file"""
+    companies = set()
+    jobs = []
+    
+    def flush():
+        company_stats = db_pipeline.save_jobs_batch(jobs)
+        for key in ('total_jobs', 'saved_jobs', 'skipped_duplicates', 'errors'):
+            total_stats[key] += company_stats[key]
+        jobs.clear()
+    
+    for company_name, job in iter_result_jobs(results_file):
+        companies.add(company_name)
+        jobs.append(job)
+        if len(jobs) >= batch_size:
+            flush()
+    if jobs:
+        flush()
+    
+    total_stats['total_companies'] = len(companies)
+
 def save_scraper_results_to_db(results_file, delete_file_after=False):
-    """Load scraper results from JSON file and save to database"""
+    """Load scraper results from a JSON (or streamed JSONL) file and save to database"""
     
     try:
-        # Load results from JSON file
-        with open(results_file, 'r', encoding='utf-8') as f:
-            results = json.load(f)
+        # Load results from JSON file; JSONL files are streamed below instead
+        results = {}
+        if not is_jsonl_results_file(results_file):
+            with open(results_file, 'r', encoding='utf-8') as f:
+                results = json.load(f)
         
         # Initialize database pipeline
         db_pipeline = DatabasePipeline()
@@ -339,7 +494,9 @@ def save_scraper_results_to_db(results_file, delete_file_after=False):
         print("=" * 80)
         
         # Process each company's results
-        if 'companies' in results:
+        if is_jsonl_results_file(results_file):
+            save_streamed_results(db_pipeline, results_file, total_stats)
+        elif 'companies' in results:
             companies_data = results['companies']
             total_stats['total_companies'] = len(companies_data)
             
@@ -392,7 +549,7 @@ if __name__ == "__main__":
     import sys
     
     if len(sys.argv) < 2:
-        print("Usage: python database_pipeline.py <results_file.json> [--delete]")
+        print("Usage: python database_pipeline.py <results_file.json|.jsonl|.jsonl.gz> [--delete]")
         print("Example: python database_pipeline.py multi_company_job_results.json")
         sys.exit(1)
     
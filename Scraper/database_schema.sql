@@ -44,10 +44,24 @@ CREATE TABLE IF NOT EXISTS jobs (
     source_url VARCHAR(1000), -- URL where job was scraped from
     scraped_at TIMESTAMP,
     job_details_info TEXT, -- Additional metadata
+    enrichment_status VARCHAR(20) NOT NULL DEFAULT 'enriched', -- pending, processing, enriched, failed
+    enrichment_attempts INTEGER NOT NULL DEFAULT 0,
+    enrichment_error TEXT,
+    enrichment_claimed_at TIMESTAMP, -- When a worker claimed the row; stale claims are picked up again
+    enrichment_not_before TIMESTAMP, -- A failed row is not claimed again before this (retry backoff)
+    raw_job JSONB, -- Scraped record and config the enrichment worker needs, cleared once enriched
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Deferred enrichment queue columns for databases created before they existed
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS enrichment_status VARCHAR(20) NOT NULL DEFAULT 'enriched';
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS enrichment_attempts INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS enrichment_error TEXT;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS enrichment_claimed_at TIMESTAMP;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS enrichment_not_before TIMESTAMP;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS raw_job JSONB;
+
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_jobs_company_id ON jobs(company_id);
 CREATE INDEX IF NOT EXISTS idx_jobs_apply_link ON jobs(apply_link);
@@ -56,6 +70,8 @@ CREATE INDEX IF NOT EXISTS idx_jobs_work_mode ON jobs(work_mode);
 CREATE INDEX IF NOT EXISTS idx_jobs_is_technical ON jobs(is_technical);
 CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at);
 CREATE INDEX IF NOT EXISTS idx_companies_name ON companies(name);
+CREATE INDEX IF NOT EXISTS idx_jobs_enrichment_queue ON jobs(enrichment_status, created_at)
+    WHERE enrichment_status IN ('pending', 'processing');
 
 -- Update trigger for companies.updated_at
 CREATE OR REPLACE FUNCTION update_company_timestamp()
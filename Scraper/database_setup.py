@@ -7,6 +7,7 @@ Initialize PostgreSQL database with required schema
 import psycopg2
 import os
 from dotenv import load_dotenv
+from db_pool import pooled_connection
 
 # Load environment variables
 load_dotenv()
@@ -29,85 +30,83 @@ def setup_database():
         print(f"🔗 Connecting to database...")
         
         # Connect to database
-        connection = psycopg2.connect(database_url)
-        connection.autocommit = True
+        with pooled_connection(autocommit=True) as connection:
         
-        print("✅ Database connection successful")
+            print("✅ Database connection successful")
         
-        # Read schema file
-        schema_file = os.path.join(os.path.dirname(__file__), 'database_schema.sql')
+            # Read schema file
+            schema_file = os.path.join(os.path.dirname(__file__), 'database_schema.sql')
         
-        if not os.path.exists(schema_file):
-            print(f"❌ Schema file not found: {schema_file}")
-            return False
+            if not os.path.exists(schema_file):
+                print(f"❌ Schema file not found: {schema_file}")
+                return False
         
-        print("📋 Reading database schema...")
+            print("📋 Reading database schema...")
         
-        with open(schema_file, 'r', encoding='utf-8') as f:
-            schema_sql = f.read()
+            with open(schema_file, 'r', encoding='utf-8') as f:
+                schema_sql = f.read()
         
-        # Execute schema
-        print("🔨 Creating database schema...")
+            # Execute schema
+            print("🔨 Creating database schema...")
         
-        with connection.cursor() as cursor:
-            cursor.execute(schema_sql)
+            with connection.cursor() as cursor:
+                cursor.execute(schema_sql)
         
-        print("✅ Database schema created successfully")
+            print("✅ Database schema created successfully")
         
-        # Verify tables were created
-        print("🔍 Verifying table creation...")
+            # Verify tables were created
+            print("🔍 Verifying table creation...")
         
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT table_name 
-                FROM information_schema.tables 
-                WHERE table_schema = 'public' 
-                AND table_type = 'BASE TABLE'
-                ORDER BY table_name
-            """)
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT table_name 
+                    FROM information_schema.tables 
+                    WHERE table_schema = 'public' 
+                    AND table_type = 'BASE TABLE'
+                    ORDER BY table_name
+                """)
             
-            tables = cursor.fetchall()
+                tables = cursor.fetchall()
             
-            print(f"📊 Created {len(tables)} tables:")
-            for table in tables:
-                print(f"  ✓ {table[0]}")
-        
-        # Verify views were created
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT table_name 
-                FROM information_schema.views 
-                WHERE table_schema = 'public'
-                ORDER BY table_name
-            """)
+                print(f"📊 Created {len(tables)} tables:")
+                for table in tables:
+                    print(f"  ✓ {table[0]}")
+        
+            # Verify views were created
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT table_name 
+                    FROM information_schema.views 
+                    WHERE table_schema = 'public'
+                    ORDER BY table_name
+                """)
             
-            views = cursor.fetchall()
+                views = cursor.fetchall()
             
-            print(f"👁️ Created {len(views)} views:")
-            for view in views:
-                print(f"  ✓ {view[0]}")
-        
-        # Test basic functionality
-        print("🧪 Testing basic functionality...")
-        
-        with connection.cursor() as cursor:
-            # Test company insertion
-            cursor.execute("""
-                INSERT INTO companies (name, website) 
-                VALUES ('Test Company', 'https://test.com')
-                ON CONFLICT (name) DO NOTHING
-            """)
+                print(f"👁️ Created {len(views)} views:")
+                for view in views:
+                    print(f"  ✓ {view[0]}")
+        
+            # Test basic functionality
+            print("🧪 Testing basic functionality...")
+        
+            with connection.cursor() as cursor:
+                # Test company insertion
+                cursor.execute("""
+                    INSERT INTO companies (name, website) 
+                    VALUES ('Test Company', 'https://test.com')
+                    ON CONFLICT (name) DO NOTHING
+                """)
             
-            # Test job count trigger
-            cursor.execute("SELECT job_count FROM companies WHERE name = 'Test Company'")
-            result = cursor.fetchone()
+                # Test job count trigger
+                cursor.execute("SELECT job_count FROM companies WHERE name = 'Test Company'")
+                result = cursor.fetchone()
             
-            if result and result[0] == 0:
-                print("✅ Database triggers working correctly")
-            else:
-                print("⚠️ Database triggers may not be working properly")
-        
-        connection.close()
+                if result and result[0] == 0:
+                    print("✅ Database triggers working correctly")
+                else:
+                    print("⚠️ Database triggers may not be working properly")
+
         
         print("\n🎉 DATABASE SETUP COMPLETED SUCCESSFULLY!")
         print("=" * 50)
@@ -136,27 +135,26 @@ def test_database_connection():
             print("❌ DATABASE_URL not found")
             return False
         
-        connection = psycopg2.connect(database_url)
+        with pooled_connection(autocommit=False) as connection:
         
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT version()")
-            version = cursor.fetchone()[0]
-            print(f"✅ Connected to: {version}")
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT version()")
+                version = cursor.fetchone()[0]
+                print(f"✅ Connected to: {version}")
             
-            # Test tables exist
-            cursor.execute("""
-                SELECT COUNT(*) FROM information_schema.tables 
-                WHERE table_schema = 'public' AND table_name IN ('companies', 'jobs')
-            """)
-            table_count = cursor.fetchone()[0]
+                # Test tables exist
+                cursor.execute("""
+                    SELECT COUNT(*) FROM information_schema.tables 
+                    WHERE table_schema = 'public' AND table_name IN ('companies', 'jobs')
+                """)
+                table_count = cursor.fetchone()[0]
             
-            if table_count == 2:
-                print("✅ Required tables exist")
-            else:
-                print("⚠️ Some required tables are missing")
-                return False
-        
-        connection.close()
+                if table_count == 2:
+                    print("✅ Required tables exist")
+                else:
+                    print("⚠️ Some required tables are missing")
+                    return False
+
         return True
         
     except Exception as e:
@@ -177,26 +175,24 @@ def reset_database():
     
     try:
         database_url = os.getenv('DATABASE_URL')
-        connection = psycopg2.connect(database_url)
-        connection.autocommit = True
+        with pooled_connection(autocommit=True) as connection:
         
-        with connection.cursor() as cursor:
-            # Drop tables in correct order (jobs first due to foreign key)
-            cursor.execute("DROP TABLE IF EXISTS jobs CASCADE")
-            cursor.execute("DROP TABLE IF EXISTS companies CASCADE")
+            with connection.cursor() as cursor:
+                # Drop tables in correct order (jobs first due to foreign key)
+                cursor.execute("DROP TABLE IF EXISTS jobs CASCADE")
+                cursor.execute("DROP TABLE IF EXISTS companies CASCADE")
             
-            # Drop views
-            cursor.execute("DROP VIEW IF EXISTS company_job_stats CASCADE")
-            cursor.execute("DROP VIEW IF EXISTS category_stats CASCADE")
-            cursor.execute("DROP VIEW IF EXISTS recent_jobs CASCADE")
+                # Drop views
+                cursor.execute("DROP VIEW IF EXISTS company_job_stats CASCADE")
+                cursor.execute("DROP VIEW IF EXISTS category_stats CASCADE")
+                cursor.execute("DROP VIEW IF EXISTS recent_jobs CASCADE")
             
-            # Drop functions
-            cursor.execute("DROP FUNCTION IF EXISTS update_company_timestamp() CASCADE")
-            cursor.execute("DROP FUNCTION IF EXISTS update_job_timestamp() CASCADE")
-            cursor.execute("DROP FUNCTION IF EXISTS update_company_job_count() CASCADE")
-            cursor.execute("DROP FUNCTION IF EXISTS find_duplicate_jobs() CASCADE")
-        
-        connection.close()
+                # Drop functions
+                cursor.execute("DROP FUNCTION IF EXISTS update_company_timestamp() CASCADE")
+                cursor.execute("DROP FUNCTION IF EXISTS update_job_timestamp() CASCADE")
+                cursor.execute("DROP FUNCTION IF EXISTS update_company_job_count() CASCADE")
+                cursor.execute("DROP FUNCTION IF EXISTS find_duplicate_jobs() CASCADE")
+
         
         print("✅ Database reset complete")
         print("💡 Run setup again to recreate schema:")
@@ -220,59 +216,58 @@ def show_database_info():
             print("❌ DATABASE_URL not found")
             return False
         
-        connection = psycopg2.connect(database_url)
+        with pooled_connection(autocommit=False) as connection:
         
-        with connection.cursor() as cursor:
-            # Database version
-            cursor.execute("SELECT version()")
-            version = cursor.fetchone()[0]
-            print(f"Database: {version.split()[0]} {version.split()[1]}")
+            with connection.cursor() as cursor:
+                # Database version
+                cursor.execute("SELECT version()")
+                version = cursor.fetchone()[0]
+                print(f"Database: {version.split()[0]} {version.split()[1]}")
             
-            # Table information
-            cursor.execute("""
-                SELECT 
-                    schemaname,
-                    tablename,
-                    pg_size_pretty(pg_total_relation_size(schemaname||'.'||tablename)) as size
-                FROM pg_tables 
-                WHERE schemaname = 'public'
-                ORDER BY pg_total_relation_size(schemaname||'.'||tablename) DESC
-            """)
+                # Table information
+                cursor.execute("""
+                    SELECT 
+                        schemaname,
+                        tablename,
+                        pg_size_pretty(pg_total_relation_size(schemaname||'.'||tablename)) as size
+                    FROM pg_tables 
+                    WHERE schemaname = 'public'
+                    ORDER BY pg_total_relation_size(schemaname||'.'||tablename) DESC
+                """)
             
-            tables = cursor.fetchall()
-            print(f"\n📋 Tables ({len(tables)}):")
-            for schema, table, size in tables:
-                print(f"  {table}: {size}")
+                tables = cursor.fetchall()
+                print(f"\n📋 Tables ({len(tables)}):")
+                for schema, table, size in tables:
+                    print(f"  {table}: {size}")
             
-            # Record counts
-            cursor.execute("SELECT COUNT(*) FROM companies")
-            company_count = cursor.fetchone()[0]
+                # Record counts
+                cursor.execute("SELECT COUNT(*) FROM companies")
+                company_count = cursor.fetchone()[0]
             
-            cursor.execute("SELECT COUNT(*) FROM jobs")
-            job_count = cursor.fetchone()[0]
+                cursor.execute("SELECT COUNT(*) FROM jobs")
+                job_count = cursor.fetchone()[0]
             
-            print(f"\n📈 Records:")
-            print(f"  Companies: {company_count:,}")
-            print(f"  Jobs: {job_count:,}")
+                print(f"\n📈 Records:")
+                print(f"  Companies: {company_count:,}")
+                print(f"  Jobs: {job_count:,}")
             
-            # Recent activity
-            cursor.execute("""
-                SELECT COUNT(*) FROM jobs 
-                WHERE created_at >= CURRENT_DATE
-            """)
-            today_jobs = cursor.fetchone()[0]
+                # Recent activity
+                cursor.execute("""
+                    SELECT COUNT(*) FROM jobs 
+                    WHERE created_at >= CURRENT_DATE
+                """)
+                today_jobs = cursor.fetchone()[0]
             
-            cursor.execute("""
-                SELECT COUNT(*) FROM jobs 
-                WHERE created_at >= CURRENT_DATE - INTERVAL '7 days'
-            """)
-            week_jobs = cursor.fetchone()[0]
+                cursor.execute("""
+                    SELECT COUNT(*) FROM jobs 
+                    WHERE created_at >= CURRENT_DATE - INTERVAL '7 days'
+                """)
+                week_jobs = cursor.fetchone()[0]
             
-            print(f"\n🕒 Recent Activity:")
-            print(f"  Jobs added today: {today_jobs:,}")
-            print(f"  Jobs added this week: {week_jobs:,}")
-        
-        connection.close()
+                print(f"\n🕒 Recent Activity:")
+                print(f"  Jobs added today: {today_jobs:,}")
+                print(f"  Jobs added this week: {week_jobs:,}")
+
         return True
         
     except Exception as e:
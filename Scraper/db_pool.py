@@ -0,0 +1,206 @@
+"""
+Shared PostgreSQL Connection Pool
+One pooled connection layer for the scrapers, the database pipeline and setup tools
+
+All database access goes through a single process-wide psycopg2
+ThreadedConnectionPool instead of a fresh psycopg2.connect() per call, so
+concurrent scraper workers share a bounded number of connections and skip
+the TCP + auth handshake on every lookup.
+
+Configuration (environment):
+    DATABASE_URL                     connection string (required)
+    DB_POOL_MIN                      connections opened up front (default 1)
+    DB_POOL_MAX                      upper bound on open connections (default 10)
+    DB_POOL_HEALTH_CHECK_INTERVAL    seconds a connection may sit idle before it is
+                                     pinged on checkout (default 30)
+
+Usage:
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import pool as psycopg2_pool
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_POOL_MIN = 1
+DEFAULT_POOL_MAX = 10
+DEFAULT_HEALTH_CHECK_INTERVAL = 30
+CHECKOUT_ATTEMPTS = 3
+
+
+class DatabaseConnectionPool:
+    """
+    Thread-safe pool with health checks and reconnect-on-failure.
+
+    getconn() blocks while all maxconn connections are checked out (plain
+    ThreadedConnectionPool raises PoolError instead). A connection that has
+    been idle longer than health_check_interval is pinged before it is
+    handed out; dead connections are discarded and replaced, and if the
+    server went away entirely the pool itself is rebuilt.
+    """
+
+    def __init__(self, dsn=None, minconn=None, maxconn=None, health_check_interval=None):
+        self.dsn = dsn or os.getenv('DATABASE_URL')
+        if not self.dsn:
+            raise RuntimeError("DATABASE_URL not found in environment variables")
+        self.minconn = minconn if minconn is not None else int(os.getenv('DB_POOL_MIN', DEFAULT_POOL_MIN))
+        self.maxconn = max(self.minconn, 1, maxconn if maxconn is not None else int(os.getenv('DB_POOL_MAX', DEFAULT_POOL_MAX)))
+        self.health_check_interval = (health_check_interval if health_check_interval is not None
+                                      else float(os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', DEFAULT_HEALTH_CHECK_INTERVAL)))
+
+        self.pool = None
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(self.maxconn)
+        self.last_used = {}  # id(conn) -> monotonic time it was returned
+        self.stats = {'checkouts': 0, 'reconnects': 0, 'failed_health_checks': 0}
+
+    def _get_pool(self):
+        with self.lock:
+            if self.pool is None or self.pool.closed:
+                self.pool = psycopg2_pool.ThreadedConnectionPool(self.minconn, self.maxconn, self.dsn)
+            return self.pool
+
+    def _reset_pool(self):
+        """Drop every pooled connection after the server went away"""
+        with self.lock:
+            if self.pool is not None and not self.pool.closed:
+                try:
+                    self.pool.closeall()
+                except Exception:
+                    pass
+            self.pool = None
+            self.last_used.clear()
+            self.stats['reconnects'] += 1
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        idle_since = self.last_used.get(id(conn))
+        if idle_since is not None and time.monotonic() - idle_since < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            self.stats['failed_health_checks'] += 1
+            return False
+
+    def getconn(self):
+        """Check out a healthy connection (blocks while the pool is exhausted)"""
+        self.slots.acquire()
+        try:
+            last_error = None
+            for attempt in range(CHECKOUT_ATTEMPTS):
+                try:
+                    pool = self._get_pool()
+                    conn = pool.getconn()
+                except psycopg2.OperationalError as e:
+                    # Server unreachable: rebuild the pool and retry with backoff
+                    last_error = e
+                    self._reset_pool()
+                    time.sleep(0.5 * (attempt + 1))
+                    continue
+
+                if self._is_healthy(conn):
+                    self.stats['checkouts'] += 1
+                    return conn
+
+                # Broken connection: discard it and let the pool open a new one
+                self.last_used.pop(id(conn), None)
+                try:
+                    pool.putconn(conn, close=True)
+                except Exception:
+                    pass
+                self.stats['reconnects'] += 1
+
+            raise last_error or psycopg2.OperationalError("Could not obtain a healthy database connection")
+        except Exception:
+            self.slots.release()
+            raise
+
+    def putconn(self, conn, close=False):
+        """Return a connection, resetting any open transaction and autocommit mode"""
+        try:
+            if not close and not conn.closed:
+                try:
+                    if not conn.autocommit:
+                        conn.rollback()
+                    else:
+                        conn.autocommit = False
+                except Exception:
+                    close = True
+            pool = self.pool
+            if pool is not None and not pool.closed:
+                try:
+                    pool.putconn(conn, close=close or conn.closed)
+                except psycopg2_pool.PoolError:
+                    # The connection belongs to a pool that was rebuilt in the meantime
+                    conn.close()
+            else:
+                conn.close()
+            if close or conn.closed:
+                self.last_used.pop(id(conn), None)
+            else:
+                self.last_used[id(conn)] = time.monotonic()
+        finally:
+            self.slots.release()
+
+    @contextmanager
+    def connection(self, autocommit=False):
+        """Context manager that checks a connection out and always returns it"""
+        conn = self.getconn()
+        broken = False
+        try:
+            if autocommit:
+                conn.autocommit = True
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, close=broken)
+
+    def closeall(self):
+        with self.lock:
+            if self.pool is not None and not self.pool.closed:
+                self.pool.closeall()
+            self.pool = None
+            self.last_used.clear()
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process-wide connection pool, created on first use"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = DatabaseConnectionPool()
+        return _shared_pool
+
+
+def pooled_connection(autocommit=False):
+    """Shortcut for get_pool().connection()"""
+    return get_pool().connection(autocommit)
+
+
+def close_pool():
+    """Close every pooled connection (e.g. at process exit)"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is not None:
+            _shared_pool.closeall()
+            _shared_pool = None
@@ -0,0 +1,239 @@
+"""
+Job Detail Cache
+Persistent, content-addressed cache of fetched job detail pages
+
+Detail pages used to be fetched again on every run, so a job that failed
+Gemini or the database insert was re-crawled in full next time. Fetched
+content is now kept on disk keyed by canonical URL:
+
+    detail_cache/
+        index.sqlite3          url -> content hash, fetch time, ETag, Last-Modified, last access
+        objects/ab/abcd....gz  gzip'ed content, named by its SHA-256 (shared by identical pages)
+
+Entries younger than the TTL are served without touching the network. Stale
+entries that carry an ETag or Last-Modified are revalidated with a
+conditional request, and a 304 refreshes them in place. Once the objects
+grow past max_bytes the least recently used entries are evicted.
+"""
+
+import os
+import gzip
+import time
+import sqlite3
+import hashlib
+import threading
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+DEFAULT_DETAIL_CACHE_DIR = "detail_cache"
+DEFAULT_CACHE_TTL = 7 * 24 * 3600        # Seconds an entry is served without revalidation
+DEFAULT_CACHE_MAX_BYTES = 500 * 1024 * 1024
+EVICTION_TARGET = 0.9                    # Evict down to this fraction of max_bytes
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', '_ga', 'mc_cid', 'mc_eid'}
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS entries (
+    url_key TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access);
+CREATE INDEX IF NOT EXISTS idx_entries_content_hash ON entries (content_hash);
+"""
+
+
+def canonical_url(url):
+    """Normalize a URL so trivially different links to the same page share one entry"""
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or '').lower()
+    if parsed.port and not ((scheme == 'http' and parsed.port == 80) or (scheme == 'https' and parsed.port == 443)):
+        host = f"{host}:{parsed.port}"
+    query = sorted((key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+                   if not key.lower().startswith('utm_') and key not in TRACKING_PARAMS)
+    return urlunparse((scheme, host, parsed.path or '/', parsed.params, urlencode(query), ''))
+
+
+class CacheEntry:
+    """One cached page as returned by DetailCache.get()"""
+
+    def __init__(self, url, content, kind, fetched_at, etag, last_modified, ttl):
+        self.url = url
+        self.content = content
+        self.kind = kind
+        self.fetched_at = fetched_at
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh = time.time() - fetched_at < ttl
+
+    def conditional_headers(self):
+        """Headers for a conditional GET revalidating this entry"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class DetailCache:
+    """
+    Thread-safe on-disk cache shared by the detail fetchers.
+
+    Several processes (e.g. the daemon and a one-off run) may use the same
+    directory; SQLite in WAL mode serializes their index updates.
+    """
+
+    def __init__(self, directory=DEFAULT_DETAIL_CACHE_DIR, ttl=DEFAULT_CACHE_TTL, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, 'objects')
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'stale': 0, 'misses': 0, 'revalidated': 0, 'stored': 0, 'evicted': 0}
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(directory, 'index.sqlite3'), timeout=30,
+                                  check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA_SQL)
+
+    def _object_path(self, content_hash):
+        return os.path.join(self.objects_dir, content_hash[:2], f"{content_hash}.gz")
+
+    def get(self, url):
+        """Return the CacheEntry for url (fresh or stale), or None"""
+        url_key = canonical_url(url)
+        with self.lock:
+            row = self.db.execute(
+                "SELECT content_hash, kind, fetched_at, etag, last_modified FROM entries WHERE url_key = ?",
+                (url_key,)).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            content_hash, kind, fetched_at, etag, last_modified = row
+            try:
+                with gzip.open(self._object_path(content_hash), 'rt', encoding='utf-8') as f:
+                    content = f.read()
+            except (OSError, EOFError):
+                # Object lost or truncated: forget the entry
+                self.db.execute("DELETE FROM entries WHERE url_key = ?", (url_key,))
+                self.stats['misses'] += 1
+                return None
+            self.db.execute("UPDATE entries SET last_access = ? WHERE url_key = ?", (time.time(), url_key))
+
+        entry = CacheEntry(url, content, kind, fetched_at, etag, last_modified, self.ttl)
+        self.stats['hits' if entry.fresh else 'stale'] += 1
+        return entry
+
+    def put(self, url, content, etag=None, last_modified=None, kind='markdown'):
+        """Store fetched content for url"""
+        if not content:
+            return
+        data = content.encode('utf-8')
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self._object_path(content_hash)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+
+        now = time.time()
+        with self.lock:
+            previous = self.db.execute("SELECT content_hash FROM entries WHERE url_key = ?",
+                                       (canonical_url(url),)).fetchone()
+            self.db.execute("""
+                INSERT OR REPLACE INTO entries (url_key, content_hash, kind, size, fetched_at, last_access, etag, last_modified)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (canonical_url(url), content_hash, kind, os.path.getsize(path), now, now, etag, last_modified))
+            if previous and previous[0] != content_hash:
+                self._drop_unreferenced(previous[0])
+            self.stats['stored'] += 1
+            self._evict()
+
+    def refresh(self, url, etag=None, last_modified=None):
+        """Mark a stale entry fresh again after a 304 Not Modified"""
+        with self.lock:
+            self.db.execute("""
+                UPDATE entries SET fetched_at = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                WHERE url_key = ?
+            """, (time.time(), etag, last_modified, canonical_url(url)))
+            self.stats['revalidated'] += 1
+
+    def _drop_unreferenced(self, content_hash):
+        """Delete an object file once no entry points at it"""
+        if self.db.execute("SELECT 1 FROM entries WHERE content_hash = ? LIMIT 1", (content_hash,)).fetchone():
+            return
+        try:
+            os.remove(self._object_path(content_hash))
+        except OSError:
+            pass
+
+    def total_bytes(self):
+        row = self.db.execute("SELECT SUM(size) FROM (SELECT DISTINCT content_hash, size FROM entries)").fetchone()
+        return row[0] or 0
+
+    def _evict(self):
+        """Drop least recently used entries while the objects exceed max_bytes"""
+        if not self.max_bytes:
+            return
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICTION_TARGET
+        rows = self.db.execute("SELECT url_key, content_hash FROM entries ORDER BY last_access").fetchall()
+        for url_key, content_hash in rows:
+            if total <= target:
+                break
+            self.db.execute("DELETE FROM entries WHERE url_key = ?", (url_key,))
+            if not self.db.execute("SELECT 1 FROM entries WHERE content_hash = ? LIMIT 1", (content_hash,)).fetchone():
+                path = self._object_path(content_hash)
+                try:
+                    total -= os.path.getsize(path)
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.stats['evicted'] += 1
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+async def revalidate(cache, session, url, entry):
+    """
+    Send a conditional GET for a stale entry; on 304 refresh it and return
+    True. Returns False when the page changed, has no validators or the
+    request failed.
+    """
+    headers = entry.conditional_headers()
+    if not headers:
+        return False
+    try:
+        async with session.get(url, headers=headers, allow_redirects=True) as response:
+            if response.status != 304:
+                return False
+            cache.refresh(url, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            return True
+    except Exception:
+        return False
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_detail_cache():
+    """Process-wide cache in the default directory, opened on first use"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = DetailCache()
+        return _shared_cache
@@ -0,0 +1,319 @@
+"""
+Job Detail Fetcher
+One long-lived crawl4ai browser for every job details page of a session
+
+Launching a headless browser per job dominated detail latency. The fetcher
+starts a single AsyncWebCrawler on first use, keeps it open for the rest of
+the session and lets up to `concurrency` detail pages load in it at once
+(each arun() gets its own tab). The BM25 filter, markdown generator and run
+config are built once and shared by every request.
+
+Many detail pages are server-rendered and need no browser at all, so each
+URL is first fetched with a pooled aiohttp session and the HTML is run
+through the same markdown generator. The browser is only used when that
+text is too short or the page asks for JavaScript. How a company's pages are
+fetched can be pinned with "detail_fetch" in its selectors entry:
+    auto      HTTP first, browser fallback (default)
+    http      HTTP only
+    browser   browser only (single-page apps such as Workday)
+
+With a DetailCache attached, fresh cached pages skip the network entirely
+and stale ones are revalidated with a conditional HTTP request.
+
+DetailFetcher lives on an asyncio loop (the job pipeline's). Synchronous
+callers that have no loop of their own use SyncDetailFetcher, which runs a
+DetailFetcher on a private background loop thread.
+"""
+
+import re
+import asyncio
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from host_scheduler import registrable_domain
+
+DETAIL_QUERY = "Job Description, Responsibilities, Skills, Requirements"
+DEFAULT_PAGE_TIMEOUT = 50000  # Milliseconds
+DETAIL_FETCH_MODES = ('auto', 'http', 'browser')
+DEFAULT_MIN_DETAIL_CHARS = 400  # Shorter HTTP results are treated as script-gated
+HTTP_FALLBACK_LIMIT = 3  # Consecutive fallbacks before a host skips the HTTP attempt
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+SCRIPT_GATED_PATTERN = re.compile(
+    r'enable javascript|javascript is (?:required|disabled)|requires javascript|turn on javascript',
+    re.IGNORECASE)
+
+HttpPage = namedtuple('HttpPage', ['markdown', 'etag', 'last_modified', 'not_modified'])
+
+
+def build_run_config(page_timeout=DEFAULT_PAGE_TIMEOUT):
+    """Crawler run config with the BM25-filtered markdown generator used for job details"""
+    from crawl4ai.content_filter_strategy import BM25ContentFilter
+    from crawl4ai.async_configs import CrawlerRunConfig
+    from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
+
+    bm25_filter = BM25ContentFilter(
+        user_query=DETAIL_QUERY,
+        bm25_threshold=1.2,
+        language="english")
+
+    markdowngen = DefaultMarkdownGenerator(content_filter=bm25_filter, options={"ignore_links": True, "images": True, "code_blocks": True})
+    return CrawlerRunConfig(markdown_generator=markdowngen, magic=True, page_timeout=page_timeout, simulate_user=True, override_navigator=True)
+
+
+def markdown_text(markdown):
+    """Plain markdown string of a crawl4ai markdown result (or the string itself)"""
+    if isinstance(markdown, str):
+        return markdown
+    return getattr(markdown, 'raw_markdown', None) or ''
+
+
+class DetailFetcher:
+    """
+    Async callable(url, config=None) -> BM25-filtered markdown of the page.
+
+    Args:
+        concurrency: detail pages loading in the shared browser at once
+        host_scheduler: optional HostRateLimiter awaited once per fetch (a browser fallback reuses the slot)
+        page_timeout: crawl4ai page timeout in milliseconds
+        default_mode: fetch mode for companies without "detail_fetch"
+        min_chars: HTTP results shorter than this fall back to the browser
+        http_connections: connection limit of the pooled HTTP session
+        cache: optional DetailCache consulted before every fetch
+        text_mode: start the browser in crawl4ai's text mode (no images or heavy media)
+    """
+
+    def __init__(self, concurrency=4, host_scheduler=None, page_timeout=DEFAULT_PAGE_TIMEOUT,
+                 default_mode='auto', min_chars=DEFAULT_MIN_DETAIL_CHARS, http_connections=20, cache=None,
+                 text_mode=True):
+        self.concurrency = max(1, concurrency)
+        self.host_scheduler = host_scheduler
+        self.page_timeout = page_timeout
+        self.default_mode = default_mode if default_mode in DETAIL_FETCH_MODES else 'auto'
+        self.min_chars = min_chars
+        self.http_connections = max(1, http_connections)
+        self.cache = cache
+        self.text_mode = text_mode
+
+        self.crawler = None
+        self.run_config = None
+        self.semaphore = None
+        self.start_lock = None
+        self.http_session = None
+        self.markdown_executor = None
+        self.markdown_local = threading.local()  # One markdown generator per conversion thread
+        self.http_fallbacks = {}  # registrable domain -> consecutive browser fallbacks
+        self.stats = {'fetched': 0, 'failed': 0, 'browser_starts': 0,
+                      'http_pages': 0, 'browser_pages': 0, 'browser_fallbacks': 0,
+                      'cache_hits': 0, 'cache_revalidated': 0}
+
+    async def start(self):
+        """Launch the shared browser (called automatically by the first fetch)"""
+        if self.start_lock is None:
+            self.start_lock = asyncio.Lock()
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with self.start_lock:
+            if self.crawler is not None:
+                return
+            from crawl4ai import AsyncWebCrawler, BrowserConfig
+
+            self.run_config = self.run_config or build_run_config(self.page_timeout)
+            crawler = AsyncWebCrawler(config=BrowserConfig(headless=True, text_mode=self.text_mode))
+            await crawler.start()
+            self.crawler = crawler
+            self.stats['browser_starts'] += 1
+            print(f"🌐 Detail browser started ({self.concurrency} concurrent pages)")
+
+    def fetch_mode(self, url, config=None):
+        """Resolve the fetch mode for a URL from the company config and past fallbacks"""
+        mode = (config or {}).get('detail_fetch') or self.default_mode
+        if mode not in DETAIL_FETCH_MODES:
+            mode = self.default_mode
+        if mode == 'auto' and self.http_fallbacks.get(registrable_domain(url), 0) >= HTTP_FALLBACK_LIMIT:
+            # This host has been script-gated every time lately, go straight to the browser
+            return 'browser'
+        return mode
+
+    async def fetch(self, url, config=None):
+        """Fetch one job details page (from the cache when it is still fresh)"""
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached is not None and cached.kind != 'markdown':
+            # crawl_ex keeps extracted job_details JSON under the same URL; that is not page markdown
+            cached = None
+        if cached is not None and cached.fresh:
+            self.stats['cache_hits'] += 1
+            return cached.content
+
+        mode = self.fetch_mode(url, config)
+        min_chars = (config or {}).get('detail_min_chars', self.min_chars)
+
+        # One politeness slot per fetch, even when HTTP falls back to the browser
+        if self.host_scheduler is not None:
+            await self.host_scheduler.acquire_async(url)
+
+        if mode != 'browser':
+            # A stale entry with validators turns this into a conditional request
+            validators = cached.conditional_headers() if cached is not None else None
+            try:
+                page = await self.fetch_http(url, validators)
+            except Exception as e:
+                if mode == 'http':
+                    self.stats['failed'] += 1
+                    raise
+                page = None
+                print(f"   🌐 HTTP detail fetch failed for {url} ({e}), using browser")
+
+            if page is not None and page.not_modified:
+                self.cache.refresh(url, page.etag, page.last_modified)
+                self.stats['cache_revalidated'] += 1
+                return cached.content
+
+            markdown = page.markdown if page is not None else None
+            if mode == 'http' and markdown is None:
+                self.stats['failed'] += 1
+                raise RuntimeError(f"HTTP fetch returned no usable HTML for {url}")
+            if mode == 'http' or (markdown is not None and not self.is_script_gated(markdown, min_chars)):
+                self.http_fallbacks.pop(registrable_domain(url), None)
+                self.stats['http_pages'] += 1
+                self.stats['fetched'] += 1
+                if self.cache is not None:
+                    self.cache.put(url, markdown, page.etag, page.last_modified)
+                return markdown
+
+            domain = registrable_domain(url)
+            self.http_fallbacks[domain] = self.http_fallbacks.get(domain, 0) + 1
+            self.stats['browser_fallbacks'] += 1
+
+        markdown = await self.fetch_browser(url)
+        if self.cache is not None:
+            # Rendered pages carry no validators worth trusting; they simply expire after the TTL
+            self.cache.put(url, markdown_text(markdown))
+        return markdown
+
+    __call__ = fetch
+
+    async def fetch_http(self, url, validators=None):
+        """
+        Fetch a page with the pooled HTTP session and convert it to markdown.
+        Returns None when the response is not a usable HTML page.
+        """
+        import aiohttp
+
+        if self.http_session is None:
+            self.http_session = aiohttp.ClientSession(
+                headers=HTTP_HEADERS,
+                connector=aiohttp.TCPConnector(limit=self.http_connections, limit_per_host=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.page_timeout / 1000))
+        async with self.http_session.get(url, headers=validators or None, allow_redirects=True) as response:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if response.status == 304 and validators:
+                return HttpPage(None, etag, last_modified, True)
+            if response.status != 200 or 'html' not in response.headers.get('Content-Type', 'text/html'):
+                return None
+            html = await response.text(errors='replace')
+
+        # BM25 and HTML-to-markdown are CPU-bound; keep them off the pipeline's event loop
+        if self.markdown_executor is None:
+            self.markdown_executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='detail-markdown')
+        markdown = await asyncio.get_running_loop().run_in_executor(
+            self.markdown_executor, self.html_to_markdown, html, str(response.url))
+        return HttpPage(markdown, etag, last_modified, False)
+
+    def html_to_markdown(self, html, base_url):
+        """
+        Same generator settings (and BM25 filter) as the browser route, so both
+        produce identical output; each conversion thread builds its own copy.
+        """
+        generator = getattr(self.markdown_local, 'generator', None)
+        if generator is None:
+            generator = self.markdown_local.generator = build_run_config(self.page_timeout).markdown_generator
+        return markdown_text(generator.generate_markdown(html, base_url=base_url))
+
+    @staticmethod
+    def is_script_gated(markdown, min_chars):
+        """True if HTTP-extracted text is too thin to be the rendered page"""
+        text = markdown.strip()
+        if len(text) < min_chars:
+            return True
+        # A "please enable JavaScript" notice only matters when little else came through
+        return len(text) < min_chars * 3 and bool(SCRIPT_GATED_PATTERN.search(text))
+
+    async def fetch_browser(self, url):
+        """Fetch a page in the shared crawl4ai browser"""
+        if self.crawler is None:
+            await self.start()
+
+        async with self.semaphore:
+            try:
+                result = await self.crawler.arun(url=url, config=self.run_config)
+            except Exception:
+                self.stats['failed'] += 1
+                raise
+
+        if not result.success:
+            self.stats['failed'] += 1
+            raise RuntimeError(result.error_message or f"crawl4ai could not load {url}")
+        self.stats['browser_pages'] += 1
+        self.stats['fetched'] += 1
+        return result.markdown
+
+    async def close(self):
+        """Shut the shared browser and HTTP session down"""
+        session, self.http_session = self.http_session, None
+        if session is not None:
+            await session.close()
+        executor, self.markdown_executor = self.markdown_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        crawler, self.crawler = self.crawler, None
+        if crawler is not None:
+            try:
+                await crawler.close()
+            except Exception as e:
+                print(f"⚠️ Error closing detail browser: {e}")
+
+
+class SyncDetailFetcher:
+    """
+    Blocking front end for code without an event loop (e.g. a sync Playwright
+    scraper). The DetailFetcher and its browser live on a background loop
+    thread that is started on the first fetch and reused until close().
+    """
+
+    def __init__(self, concurrency=1, host_scheduler=None, page_timeout=DEFAULT_PAGE_TIMEOUT, **options):
+        self.fetcher = DetailFetcher(concurrency, host_scheduler, page_timeout, **options)
+        self.loop = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(target=self.loop.run_forever, name='detail-fetcher', daemon=True)
+                self.thread.start()
+            return self.loop
+
+    def fetch(self, url, config=None):
+        """Fetch one job details page, blocking the calling thread"""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self.fetcher.fetch(url, config), loop).result()
+
+    __call__ = fetch
+
+    def close(self):
+        """Close the browser and stop the background loop"""
+        with self.lock:
+            loop, self.loop = self.loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.fetcher.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self.thread.join()
+        loop.close()
@@ -0,0 +1,132 @@
+"""
+Job Detail Trimmer
+Token-budgeted reduction of job detail markdown before Gemini enrichment
+
+Detail pages arrive as markdown that still carries navigation text, EEO and
+privacy boilerplate, and headings repeated by the page template. Prompt size
+drives both Gemini latency and cost per job, so the markdown is split into
+sections and each one is scored by how much enrichment can get out of it:
+responsibilities, requirements, qualifications, skills, benefits and salary
+score high, while boilerplate scores below zero and is always dropped. The
+best sections are kept, in their original order, until the token budget is
+spent.
+
+Tokens are estimated at ~4 characters each; exact counts are not worth a
+tokenizer dependency here.
+"""
+
+import re
+
+DEFAULT_DETAIL_TOKEN_BUDGET = 1500  # Tokens of job_details_info sent to Gemini
+CHARS_PER_TOKEN = 4
+MIN_SECTION_TOKENS = 20             # A truncated section must keep at least this much to be worth including
+
+# Heading / body keywords per category and the score they add
+SECTION_KEYWORDS = {
+    'responsibilities': (r"responsibilit|what you(?:'ll| will) do|your role|duties|day to day", 5),
+    'requirements': (r"requirement|must have|what you(?:'ll)? need|what we(?:'re| are) looking for|you have|minimum|basic qualification", 5),
+    'qualifications': (r"qualification|experience|education|degree|preferred|nice to have|bonus", 4),
+    'skills': (r"skills|technolog|tech stack|tools|proficien|knowledge of", 3),
+    'salary': (r"salary|compensation|pay range|\bctc\b|\bpay\b|per annum|\$\s?\d|₹|€|£", 4),
+    'benefits': (r"benefit|perks|what we offer|why join|insurance|paid time off|\bpto\b|leave policy", 3),
+    'summary': (r"about the (?:job|role|position|team)|job description|overview|summary|position", 2),
+}
+BOILERPLATE_PATTERN = re.compile(
+    r"equal opportunity|equal employment|\beeo\b|affirmative action|without regard to|protected veteran|"
+    r"reasonable accommodation|accommodation request|privacy (?:policy|notice)|cookie|terms of use|"
+    r"all rights reserved|recruitment fraud|scam|follow us|share this job|similar jobs|sign in|log in|"
+    r"create (?:a )?job alert|talent community|e-verify|pay transparency",
+    re.IGNORECASE)
+# Single lines that never carry job content (buttons, breadcrumbs, share widgets)
+NAV_LINE_PATTERN = re.compile(
+    r"^\s*(?:[*\-]\s*)?(?:apply(?: now| for this job)?|save(?: job)?|share|back to (?:jobs|search|results)|"
+    r"view all jobs|search jobs|home|careers|menu|skip to (?:main )?content|print|email|linkedin|twitter|facebook)\s*$",
+    re.IGNORECASE)
+HEADING_PATTERN = re.compile(r"^\s*(?:#{1,6}\s+.+|\*\*[^*]{2,80}\*\*:?|__[^_]{2,80}__:?|[A-Z][^.!?]{2,60}:)\s*$")
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def split_sections(markdown):
+    """Split markdown into [heading, body lines] sections at heading-like lines"""
+    sections = [['', []]]
+    for line in markdown.splitlines():
+        if not line.strip() or NAV_LINE_PATTERN.match(line):
+            continue
+        if HEADING_PATTERN.match(line):
+            sections.append([line.strip(), []])
+        else:
+            sections[-1][1].append(line.rstrip())
+    return [(heading, body) for heading, body in sections if heading or body]
+
+
+def score_section(heading, body):
+    """Relevance of a section for enrichment; negative means boilerplate"""
+    body_text = ' '.join(body)
+    if BOILERPLATE_PATTERN.search(heading) or len(BOILERPLATE_PATTERN.findall(body_text)) >= 2:
+        return -1
+    score = 0
+    for pattern, weight in SECTION_KEYWORDS.values():
+        if re.search(pattern, heading, re.IGNORECASE):
+            score += weight * 2
+        elif re.search(pattern, body_text, re.IGNORECASE):
+            score += weight
+    # Bulleted sections are usually the requirement / responsibility lists
+    if sum(1 for line in body if line.lstrip().startswith(('-', '*', '•'))) >= 2:
+        score += 2
+    return score
+
+
+def truncate_lines(lines, max_tokens):
+    """Leading lines of a section that fit into max_tokens"""
+    kept, used = [], 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    return kept
+
+
+def trim_job_details(markdown, token_budget=DEFAULT_DETAIL_TOKEN_BUDGET):
+    """
+    Return the highest-value sections of a job detail page within token_budget.
+    Boilerplate and repeated sections are dropped even when everything fits.
+    """
+    if not markdown or markdown == 'N/A' or not token_budget:
+        return markdown
+
+    candidates = []
+    seen = set()
+    for position, (heading, body) in enumerate(split_sections(str(markdown))):
+        fingerprint = ' '.join(' '.join(body).lower().split())
+        if fingerprint and fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        score = score_section(heading, body)
+        if score < 0 or not (body or score):
+            continue
+        candidates.append((score, position, heading, body))
+
+    # Greedy by score; the first section breaks ties because it usually introduces the role
+    chosen = {}
+    remaining = token_budget
+    for score, position, heading, body in sorted(candidates, key=lambda item: (-item[0], item[1])):
+        lines = ([heading] if heading else []) + body
+        cost = sum(estimate_tokens(line) + 1 for line in lines)
+        if cost > remaining:
+            if remaining < MIN_SECTION_TOKENS:
+                continue
+            lines = truncate_lines(lines, remaining)
+            cost = sum(estimate_tokens(line) + 1 for line in lines)
+            if len(lines) <= (1 if heading else 0):
+                continue
+        chosen[position] = lines
+        remaining -= cost
+
+    if not chosen:
+        return 'N/A'
+    return '\n'.join('\n'.join(chosen[position]) for position in sorted(chosen))
@@ -0,0 +1,242 @@
+"""
+Enrichment Backends
+Interchangeable sources of enrichment answers: Gemini, a local stub server, or the local rules alone
+
+job_enrichment.py builds the prompts and parses the answers; a backend
+only turns a prompt into response text. The backend is chosen with
+GLOBAL_CONFIG['enrichment_backend'] (or --backend on enrichment_worker.py):
+
+    gemini   the shared Gemini client (gemini_client.py); needs GEMINI_KEY(S)
+    stub     the same client, pointed at a local HTTP server that answers like
+             generateContent, with seeded latency, 429s and 503s; no key, no spend
+    rules    no LLM at all: every field comes from local_extractor.py
+
+The stub goes through the real client, so rate budgets, retries and
+backoff are exercised exactly as in production. Its failures and
+latencies are drawn from a hash of (seed, prompt, attempt) rather than
+from the request order, so the same jobs meet the same errors on every run.
+
+Results of the stub and rules backends are cached under their own version
+(see job_enrichment.result_version()), so a benchmark never stands in for
+a Gemini answer later on.
+
+enrichment_benchmark.py drives the pipeline through these backends.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+from detail_trimmer import estimate_tokens
+from gemini_client import (GeminiClientThread, StubGeminiHandler, get_shared_gemini_client,
+                           close_shared_gemini_client, shared_gemini_client_options)
+from local_extractor import LLM_FIELDS
+
+DEFAULT_STUB_LATENCY = 0.8          # Seconds per stub answer, roughly a Gemini flash call
+DEFAULT_STUB_LATENCY_JITTER = 0.4   # Latency varies uniformly by up to this much either way
+DEFAULT_STUB_ERROR_RATE = 0.02      # Share of stub requests answered with a 503
+DEFAULT_STUB_THROTTLE_RATE = 0.05   # Share of stub requests answered with a 429
+DEFAULT_STUB_RETRY_AFTER = 0.5      # Retry-After seconds sent with a stub 429
+DEFAULT_STUB_SEED = 1234           # Seeds stub outcomes and the benchmark's synthetic jobs
+
+STUB_LIST_FIELDS = {'requirements', 'preferred_qualifications', 'responsibilities', 'benefits', 'skills', 'tags'}
+RAW_JOBS_MARKER = re.compile(r"^RAW JOBS? ", re.MULTILINE)
+ONLY_FIELDS_PATTERN = re.compile(r"containing only these fields: ([a-z_]+(?:, [a-z_]+)*),")
+
+
+class EnrichmentBackend:
+    """
+    Turns an enrichment prompt into response text.
+
+    uses_llm is False for backends that never answer prompts; job_enrichment
+    then takes every field from local extraction instead of asking.
+    """
+
+    name = None
+    uses_llm = True
+
+    def generate(self, prompt, max_output_tokens=None):
+        """Blocking call from an enrichment thread; returns the raw response text"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release the backend; returns its request stats ({} if it keeps none)"""
+        return {}
+
+
+class GeminiBackend(EnrichmentBackend):
+    """The shared, rate-limited Gemini client"""
+
+    name = 'gemini'
+
+    def generate(self, prompt, max_output_tokens=None):
+        return get_shared_gemini_client().generate(prompt, max_output_tokens)
+
+    def close(self):
+        return close_shared_gemini_client()
+
+
+class StubBackend(EnrichmentBackend):
+    """
+    The Gemini client against a stub server. Without url, a stub is started
+    in this process with the given latency and error rates; with url, an
+    already running stub (enrichment_benchmark.py --serve) is used and the
+    other options are ignored. Rate budgets and retries follow the shared
+    Gemini client's options.
+    """
+
+    name = 'stub'
+
+    def __init__(self, url=None, latency=DEFAULT_STUB_LATENCY, latency_jitter=DEFAULT_STUB_LATENCY_JITTER,
+                 error_rate=DEFAULT_STUB_ERROR_RATE, throttle_rate=DEFAULT_STUB_THROTTLE_RATE,
+                 retry_after=DEFAULT_STUB_RETRY_AFTER, seed=DEFAULT_STUB_SEED):
+        self.server = None
+        if not url:
+            self.server, url = start_enrichment_stub(latency=latency, latency_jitter=latency_jitter,
+                                                     error_rate=error_rate, throttle_rate=throttle_rate,
+                                                     retry_after=retry_after, seed=seed)
+        self.client = GeminiClientThread(**dict(shared_gemini_client_options(), api_keys=['stub-key'], base_url=url))
+
+    def generate(self, prompt, max_output_tokens=None):
+        return self.client.generate(prompt, max_output_tokens)
+
+    def close(self):
+        stats = dict(self.client.stats)
+        self.client.close()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        return stats
+
+
+class RuleBasedBackend(EnrichmentBackend):
+    """No LLM: enrichment is local extraction only, fully deterministic and offline"""
+
+    name = 'rules'
+    uses_llm = False
+
+    def generate(self, prompt, max_output_tokens=None):
+        raise RuntimeError("The rules enrichment backend does not send prompts")
+
+
+ENRICHMENT_BACKENDS = {backend.name: backend for backend in (GeminiBackend, StubBackend, RuleBasedBackend)}
+
+
+def stub_draw(seed, salt, prompt, attempt):
+    """Deterministic number in [0, 1) for one attempt at one prompt"""
+    digest = hashlib.sha256(f"{seed}:{salt}:{attempt}:{prompt}".encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') / 2 ** 64
+
+
+def stub_answer(job, fields=None):
+    """Plausible enrichment object for one raw job: card values kept, lists left empty"""
+    details = job.get('job_details_info') or 'N/A'
+    answer = {}
+    for field in fields or LLM_FIELDS:
+        if field in STUB_LIST_FIELDS:
+            answer[field] = []
+        elif field == 'description':
+            answer[field] = ' '.join(details.split())[:300] if details != 'N/A' else 'N/A'
+        else:
+            answer[field] = job.get(field, 'N/A')
+    return answer
+
+
+def stub_response_text(prompt):
+    """Answer a single-job or batch prompt from job_enrichment the way Gemini would"""
+    marker = RAW_JOBS_MARKER.search(prompt)
+    if not marker:
+        return '{}'
+    payload_line = prompt[marker.end():].split('\n', 2)[1]
+    try:
+        payload = json.loads(payload_line)
+    except ValueError:
+        return '{}'
+    if isinstance(payload, list):
+        return json.dumps([dict(stub_answer(job, job.get('fields_needed')), index=job.get('index'),
+                                title=job.get('title'), apply_link=job.get('apply_link'))
+                           for job in payload], ensure_ascii=False)
+    only_fields = ONLY_FIELDS_PATTERN.search(prompt)
+    return json.dumps(stub_answer(payload, only_fields.group(1).split(', ') if only_fields else None),
+                      ensure_ascii=False)
+
+
+class EnrichmentStubHandler(StubGeminiHandler):
+    """
+    generateContent stand-in for benchmarks. Outcome and latency of every
+    request depend only on the server's seed, the prompt and how often that
+    prompt was sent before.
+    """
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        prompt = body['contents'][0]['parts'][0]['text']
+        options = self.server.stub_options
+        prompt_key = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        with self.server.attempts_lock:
+            attempt = self.server.attempts.get(prompt_key, 0)
+            self.server.attempts[prompt_key] = attempt + 1
+
+        latency = options['latency'] + options['latency_jitter'] * (2 * stub_draw(options['seed'], 'latency', prompt, attempt) - 1)
+        time.sleep(max(0.0, latency))
+        outcome = stub_draw(options['seed'], 'outcome', prompt, attempt)
+        if outcome < options['throttle_rate']:
+            return self._reply(429, {'error': {'code': 429, 'status': 'RESOURCE_EXHAUSTED'}},
+                               {'Retry-After': str(options['retry_after'])})
+        if outcome < options['throttle_rate'] + options['error_rate']:
+            return self._reply(503, {'error': {'code': 503, 'status': 'UNAVAILABLE'}})
+
+        answer = stub_response_text(prompt)
+        self._reply(200, {'candidates': [{'content': {'parts': [{'text': answer}]}, 'finishReason': 'STOP'}],
+                          'usageMetadata': {'totalTokenCount': estimate_tokens(prompt) + estimate_tokens(answer)}})
+
+
+def start_enrichment_stub(port=0, latency=DEFAULT_STUB_LATENCY, latency_jitter=DEFAULT_STUB_LATENCY_JITTER,
+                          error_rate=DEFAULT_STUB_ERROR_RATE, throttle_rate=DEFAULT_STUB_THROTTLE_RATE,
+                          retry_after=DEFAULT_STUB_RETRY_AFTER, seed=DEFAULT_STUB_SEED):
+    """Run the benchmark stub on a daemon thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), EnrichmentStubHandler)
+    server.daemon_threads = True
+    server.stub_options = {'latency': latency, 'latency_jitter': latency_jitter, 'error_rate': error_rate,
+                           'throttle_rate': throttle_rate, 'retry_after': retry_after, 'seed': seed}
+    server.attempts = {}
+    server.attempts_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, name='enrichment-stub', daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1beta"
+
+
+_shared_backend = None
+_shared_backend_name = 'gemini'
+_shared_backend_options = {}
+_shared_backend_lock = threading.Lock()
+
+
+def configure_shared_enrichment_backend(name='gemini', **backend_options):
+    """Choose the backend (and its options) used by every enrichment thread"""
+    global _shared_backend_name, _shared_backend_options
+    if name not in ENRICHMENT_BACKENDS:
+        raise ValueError(f"Unknown enrichment backend '{name}' (choose from {', '.join(ENRICHMENT_BACKENDS)})")
+    _shared_backend_name = name
+    _shared_backend_options = backend_options
+
+
+def get_shared_enrichment_backend():
+    """Process-wide backend, created on first use"""
+    global _shared_backend
+    with _shared_backend_lock:
+        if _shared_backend is None:
+            _shared_backend = ENRICHMENT_BACKENDS[_shared_backend_name](**_shared_backend_options)
+        return _shared_backend
+
+
+def close_shared_enrichment_backend():
+    """Close the shared backend, if one was created, and return its request stats"""
+    global _shared_backend
+    with _shared_backend_lock:
+        backend, _shared_backend = _shared_backend, None
+    if backend is None:
+        return {}
+    return backend.close()
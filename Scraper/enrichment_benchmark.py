@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Enrichment Benchmark
+Offline, reproducible throughput runs of the enrichment pipeline
+
+Seeded synthetic jobs (cards with their detail pages already attached) go
+through JobPipeline with one of the enrichment backends from
+enrichment_backends.py, so no browser, API key or database is involved:
+
+    rules   local extraction only; the results digest is identical on every run
+    stub    the real Gemini client against a local stub with seeded latency,
+            429s and 503s; measures batching, concurrency and retry behaviour
+
+The enrichment cache is turned off so every run does the same work.
+
+Usage:
+    python enrichment_benchmark.py --jobs 500 --backend rules
+    python enrichment_benchmark.py --jobs 500 --backend stub --batch-size 8 --error-rate 0.05
+    python enrichment_benchmark.py --serve 8765      # stub for other processes (stub_backend url)
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import time
+from functools import partial
+
+from enrichment_backends import (ENRICHMENT_BACKENDS, DEFAULT_STUB_SEED, DEFAULT_STUB_LATENCY,
+                                 DEFAULT_STUB_LATENCY_JITTER, DEFAULT_STUB_ERROR_RATE, DEFAULT_STUB_THROTTLE_RATE,
+                                 configure_shared_enrichment_backend, close_shared_enrichment_backend,
+                                 start_enrichment_stub)
+from enrichment_cache import configure_shared_enrichment_cache
+from gemini_client import configure_shared_gemini_client
+from job_enrichment import enrich_job_with_gemini, enrich_jobs_with_gemini
+from job_pipeline import JobPipeline
+from local_extractor import EXTRACTION_STATS
+
+SYNTHETIC_TITLES = ['Senior Software Engineer', 'Data Analyst', 'DevOps Engineer', 'Product Designer',
+                    'Machine Learning Engineer', 'QA Automation Engineer', 'Backend Developer', 'Sales Manager']
+SYNTHETIC_SKILLS = ['Python', 'Java', 'SQL', 'AWS', 'Docker', 'Kubernetes', 'React', 'Spark', 'Tableau', 'Figma']
+SYNTHETIC_LOCATIONS = ['Bangalore, India', 'Pune, India', 'Hyderabad, India', 'Remote', 'Chennai, India']
+
+
+def synthetic_jobs(count, seed=DEFAULT_STUB_SEED):
+    """Seeded (job_data, config) items shaped like scraped cards with their detail pages"""
+    rng = random.Random(seed)
+    config = {'url': 'https://benchmark.invalid/jobs', 'company_name': 'Benchmark Corp'}
+    items = []
+    for number in range(count):
+        title = rng.choice(SYNTHETIC_TITLES)
+        skills = rng.sample(SYNTHETIC_SKILLS, 3)
+        years = rng.randint(1, 10)
+        details = '\n'.join([
+            "## About the job",
+            f"Benchmark Corp is hiring a {title} to work on platform number {number}.",
+            "## Responsibilities",
+            *[f"- Build and maintain services using {skill}" for skill in skills],
+            "## Requirements",
+            f"- {years}+ years of experience with {skills[0]}",
+            f"- Working knowledge of {skills[1]} and {skills[2]}",
+            "## Benefits",
+            "- Health insurance",
+            "- Learning budget",
+            f"Employment type: {rng.choice(['Full time', 'Contract', 'Part time'])}",
+        ])
+        job_data = {'title': title, 'company': 'Benchmark Corp', 'location': rng.choice(SYNTHETIC_LOCATIONS),
+                    'apply_link': f"https://benchmark.invalid/jobs/{100000 + number}",
+                    'metadata_raw': f"{years}-{years + 3} years", 'job_details_info': details}
+        items.append((job_data, dict(config)))
+    return items
+
+
+def results_digest(jobs):
+    """SHA-256 of the enriched jobs without their timestamps, for comparing runs"""
+    stable = [{field: value for field, value in job.items() if field != 'scraped_at'} for job in jobs]
+    payload = json.dumps(stable, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def run_benchmark(backend, job_count, batch_size=1, concurrency=8, seed=DEFAULT_STUB_SEED, **stub_options):
+    """
+    Push synthetic jobs through JobPipeline with the chosen backend and
+    report throughput. The enrichment cache is off so every run does the
+    same work. The digest is reproducible for the rules backend, and for
+    the stub with batch_size=1 (batch composition depends on timing).
+    """
+    async def no_detail_fetch(url, config):
+        return 'N/A'
+
+    configure_shared_enrichment_cache(None)
+    configure_shared_gemini_client(rpm=0, tpm=0, max_in_flight=concurrency, base_delay=0.2, max_delay=2.0)
+    configure_shared_enrichment_backend(backend, **(dict(stub_options, seed=seed) if backend == 'stub' else {}))
+
+    items = synthetic_jobs(job_count, seed)
+    pipeline = JobPipeline(detail_fetcher=no_detail_fetch, enricher=enrich_job_with_gemini,
+                           enrichment_concurrency=concurrency, queue_size=max(20, concurrency * 2),
+                           batch_enricher=partial(enrich_jobs_with_gemini, max_batch_size=batch_size)
+                           if batch_size > 1 else None,
+                           enrichment_batch_size=batch_size, batch_linger=0.2)
+    pipeline.start()
+    started = time.monotonic()
+    try:
+        batch = pipeline.open_batch('benchmark')
+        for job_data, config in items:
+            batch.submit(job_data, config)
+        jobs, stats = batch.wait()
+        elapsed = time.monotonic() - started
+    finally:
+        pipeline.close()
+        client_stats = close_shared_enrichment_backend()
+
+    print(f"📊 Benchmark ({backend}, batch size {batch_size}, concurrency {concurrency}, seed {seed}):")
+    print(f"  Jobs: {len(jobs)} in {elapsed:.2f}s ({len(jobs) / elapsed if elapsed else 0:.1f} jobs/s)")
+    print(f"  Enrichment errors: {stats['gemini_processing_errors']}")
+    print(f"  Local extraction: {EXTRACTION_STATS.summary()}")
+    if client_stats:
+        print(f"  Requests: {client_stats['succeeded']} succeeded, {client_stats['retries']} retried "
+              f"({client_stats['throttled']} throttled, {client_stats['server_errors']} server errors), "
+              f"{client_stats['failed']} failed")
+    print(f"  Results digest: {results_digest(jobs)}")
+    return stats['gemini_processing_errors']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline enrichment benchmark and stub server")
+    parser.add_argument('--jobs', type=int, metavar='COUNT', help="enrich this many synthetic jobs and report throughput")
+    parser.add_argument('--serve', type=int, metavar='PORT', help="serve the stub until interrupted")
+    parser.add_argument('--backend', choices=sorted(ENRICHMENT_BACKENDS), default='stub', help="enrichment backend")
+    parser.add_argument('--batch-size', type=int, default=1, help="most jobs per request")
+    parser.add_argument('--concurrency', type=int, default=8, help="enrichment workers")
+    parser.add_argument('--seed', type=int, default=DEFAULT_STUB_SEED, help="seed for synthetic jobs and stub outcomes")
+    parser.add_argument('--latency', type=float, default=DEFAULT_STUB_LATENCY, help="stub seconds per answer")
+    parser.add_argument('--latency-jitter', type=float, default=DEFAULT_STUB_LATENCY_JITTER, help="stub latency spread")
+    parser.add_argument('--error-rate', type=float, default=DEFAULT_STUB_ERROR_RATE, help="share of stub 503 answers")
+    parser.add_argument('--throttle-rate', type=float, default=DEFAULT_STUB_THROTTLE_RATE, help="share of stub 429 answers")
+    args = parser.parse_args()
+
+    stub_options = {'latency': args.latency, 'latency_jitter': args.latency_jitter,
+                    'error_rate': args.error_rate, 'throttle_rate': args.throttle_rate}
+    if args.jobs:
+        run_benchmark(args.backend, args.jobs, args.batch_size, args.concurrency, args.seed, **stub_options)
+    elif args.serve:
+        server, base_url = start_enrichment_stub(args.serve, seed=args.seed, **stub_options)
+        print(f"🧪 Enrichment stub at {base_url} (stub_backend url)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
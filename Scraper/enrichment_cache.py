@@ -0,0 +1,217 @@
+"""
+Enrichment Result Cache
+Persistent cache of Gemini enrichment results, keyed by what was sent to Gemini
+
+Re-enriching an unchanged posting produces the same structured job, yet a
+job scraped again (after a failed database insert, under a new apply link,
+or listed under two search URLs) used to go through Gemini once more. The
+parsed Gemini answer is now stored in SQLite under a SHA-256 of the
+normalized extract_and_clean_job_details() payload plus the prompt version:
+
+    enrichment_cache.sqlite3    key -> result JSON, created, last access, hits
+
+Fields that identify where a job was found rather than what it says
+(source_url, apply_link) are left out of the key, so moved or duplicated
+postings still hit. A job without description or detail text is the
+exception: its title, company and location are shared by many postings
+(several "Software Engineer II, Bangalore" reqs), so its key includes the
+apply link, and a job with neither text, link nor job id is not cached. A hit skips the LLM entirely; the caller re-attaches
+the current apply link and scrape metadata. Changing the prompt means
+bumping PROMPT_VERSION in job_enrichment.py, which retires every old entry.
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+DEFAULT_ENRICHMENT_CACHE_PATH = "enrichment_cache.sqlite3"
+DEFAULT_ENRICHMENT_CACHE_TTL = 30 * 24 * 3600   # Seconds a result is reused before the job is enriched again
+DEFAULT_ENRICHMENT_CACHE_MAX_ENTRIES = 200000   # Least recently used results beyond this are evicted
+EVICTION_TARGET = 0.9                           # Evict down to this fraction of max_entries
+LOCATION_FIELDS = {'source_url', 'apply_link'}  # Where the job was found, not what it says
+CONTENT_FIELDS = ('description', 'job_details_info')  # Text that tells two postings with the same title apart
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS results (
+    cache_key TEXT PRIMARY KEY,
+    prompt_version TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_results_last_access ON results (last_access);
+"""
+
+
+def normalize_payload(cleaned_job_data):
+    """Cleaned job without location fields, whitespace collapsed, for hashing"""
+    normalized = {}
+    for field, value in cleaned_job_data.items():
+        if field in LOCATION_FIELDS or value in (None, '', 'N/A'):
+            continue
+        if isinstance(value, str):
+            value = ' '.join(value.split())
+        normalized[field] = value
+    return normalized
+
+
+def enrichment_cache_key(cleaned_job_data, prompt_version):
+    """
+    SHA-256 of the normalized payload and the prompt version, or None when
+    the job carries too little to be told apart from other postings
+    """
+    normalized = normalize_payload(cleaned_job_data)
+    if not any(field in normalized for field in CONTENT_FIELDS):
+        apply_link = cleaned_job_data.get('apply_link')
+        if apply_link not in (None, '', 'N/A'):
+            normalized['apply_link'] = apply_link
+        elif 'job_id' not in normalized:
+            return None
+    payload = json.dumps({'prompt_version': prompt_version, 'job': normalized},
+                         ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class EnrichmentCache:
+    """
+    Thread-safe SQLite cache of parsed Gemini results.
+
+    Like DetailCache it uses WAL mode, so the daemon and a one-off run may
+    share the same file.
+    """
+
+    def __init__(self, path=DEFAULT_ENRICHMENT_CACHE_PATH, ttl=DEFAULT_ENRICHMENT_CACHE_TTL,
+                 max_entries=DEFAULT_ENRICHMENT_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.stats = {'lookups': 0, 'hits': 0, 'misses': 0, 'expired': 0, 'stored': 0, 'evicted': 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA_SQL)
+
+    def get(self, cache_key):
+        """Return a copy of the cached result dict, or None"""
+        with self.lock:
+            self.stats['lookups'] += 1
+            row = self.db.execute("SELECT result, created_at FROM results WHERE cache_key = ?",
+                                  (cache_key,)).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            result, created_at = row
+            if self.ttl and time.time() - created_at > self.ttl:
+                self.db.execute("DELETE FROM results WHERE cache_key = ?", (cache_key,))
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            self.db.execute("UPDATE results SET last_access = ?, hits = hits + 1 WHERE cache_key = ?",
+                            (time.time(), cache_key))
+            self.stats['hits'] += 1
+        return json.loads(result)
+
+    def put(self, cache_key, result, prompt_version):
+        """Store a parsed Gemini result"""
+        data = json.dumps(result, ensure_ascii=False, default=str)
+        now = time.time()
+        with self.lock:
+            self.db.execute("""
+                INSERT OR REPLACE INTO results (cache_key, prompt_version, result, created_at, last_access, hits)
+                VALUES (?, ?, ?, ?, ?, 0)
+            """, (cache_key, prompt_version, data, now, now))
+            self.stats['stored'] += 1
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used results past max_entries"""
+        if not self.max_entries:
+            return
+        count = self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        excess = count - int(self.max_entries * EVICTION_TARGET)
+        self.db.execute("""
+            DELETE FROM results WHERE cache_key IN (
+                SELECT cache_key FROM results ORDER BY last_access LIMIT ?)
+        """, (excess,))
+        self.stats['evicted'] += excess
+
+    def hit_rate(self):
+        return self.stats['hits'] / self.stats['lookups'] if self.stats['lookups'] else 0.0
+
+    def summary(self):
+        return (f"{self.stats['hits']}/{self.stats['lookups']} jobs served from cache "
+                f"({self.hit_rate():.0%} hit rate), {self.stats['stored']} results stored")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+_shared_cache = None
+_shared_cache_options = {'path': DEFAULT_ENRICHMENT_CACHE_PATH}
+_shared_cache_lock = threading.Lock()
+
+
+def configure_shared_enrichment_cache(path=DEFAULT_ENRICHMENT_CACHE_PATH, **cache_options):
+    """Set the shared cache's file and options; a falsy path disables caching"""
+    global _shared_cache_options
+    _shared_cache_options = dict(cache_options, path=path)
+
+
+def get_shared_enrichment_cache():
+    """Process-wide cache, opened on first use; None when disabled or unavailable"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None and _shared_cache_options.get('path'):
+            try:
+                _shared_cache = EnrichmentCache(**_shared_cache_options)
+            except Exception as e:
+                print(f"⚠️ Could not open enrichment cache, enriching every job: {e}")
+                _shared_cache_options['path'] = None
+        return _shared_cache
+
+
+def run_self_test():
+    """Detail-less postings that share a title must not share a cache entry"""
+    import tempfile
+    failures = 0
+    first = {'title': 'Software Engineer II', 'company': 'Acme', 'location': 'Bangalore', 'posted_date': 'N/A',
+             'description': 'N/A', 'job_details_info': 'N/A', 'source_url': 'https://acme.example/jobs',
+             'apply_link': 'https://acme.example/jobs/101'}
+    second = dict(first, apply_link='https://acme.example/jobs/202')
+    with tempfile.TemporaryDirectory() as directory:
+        cache = EnrichmentCache(os.path.join(directory, 'cache.sqlite3'))
+        first_key, second_key = enrichment_cache_key(first, 'test'), enrichment_cache_key(second, 'test')
+        cache.put(first_key, {'title': first['title'], 'job_id': '101', 'salary': '30 LPA'}, 'test')
+        checks = [
+            ("detail-less postings get different keys", first_key != second_key),
+            ("second posting misses the first one's result", cache.get(second_key) is None),
+            ("first posting hits its own result", (cache.get(first_key) or {}).get('job_id') == '101'),
+            ("no text, link or job id is not cacheable",
+             enrichment_cache_key(dict(first, apply_link='N/A'), 'test') is None),
+            ("postings with text still ignore the apply link",
+             enrichment_cache_key(dict(first, description='Build payment APIs'), 'test')
+             == enrichment_cache_key(dict(second, description='Build payment APIs'), 'test')),
+        ]
+        cache.close()
+    for name, passed in checks:
+        print(f"{'✅' if passed else '❌'} {name}")
+        failures += not passed
+    return failures
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ['--self-test']:
+        sys.exit(1 if run_self_test() else 0)
+    print("usage: python enrichment_cache.py --self-test")
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Deferred Enrichment Worker
+Enriches jobs the scraper stored with enrichment_status = 'pending'
+
+With GLOBAL_CONFIG['enrichment_mode'] = 'deferred', Final_Scraper no longer
+waits for Gemini: every job is written out right away with its raw fields
+and the input enrichment needs, and the database pipeline stores it as a
+pending row. Any number of these workers, on this machine or others, drain
+the queue independently of the scrapers:
+
+    pending -> processing (claimed with FOR UPDATE SKIP LOCKED)
+            -> enriched   (structured fields written back, raw_job cleared)
+            -> pending    (enrichment failed, retried after a backoff)
+            -> failed     (max_attempts reached)
+
+A claim is committed before Gemini is called, so no row lock is held
+during the request. A worker that dies leaves its rows in processing; they
+are claimed again once claim_timeout has passed.
+
+Usage:
+    python enrichment_worker.py                      # run until interrupted
+    python enrichment_worker.py --once               # drain the queue and exit
+    python enrichment_worker.py --threads 4 --claim-size 32
+    python enrichment_worker.py --backend stub --once   # drain a test queue without Gemini
+"""
+
+import os
+import json
+import time
+import random
+import threading
+
+from dotenv import load_dotenv
+
+from database_pipeline import DatabasePipeline, safe_print
+from job_enrichment import enrich_jobs_with_gemini, DEFAULT_BATCH_SIZE, DEFAULT_BATCH_TOKEN_BUDGET
+from gemini_client import configure_shared_gemini_client
+from enrichment_backends import configure_shared_enrichment_backend, close_shared_enrichment_backend, ENRICHMENT_BACKENDS
+
+load_dotenv()
+
+DEFAULT_CLAIM_SIZE = 16        # Rows claimed per round; enrich_jobs_with_gemini splits them into requests
+DEFAULT_MAX_ATTEMPTS = 3       # Claims of one row before it is marked failed
+DEFAULT_CLAIM_TIMEOUT = 900    # Seconds before a row left in processing by a dead worker is claimed again
+DEFAULT_POLL_INTERVAL = 10     # Seconds between polls when the queue is empty
+DEFAULT_RETRY_DELAY = 60       # Seconds before a failed row is claimed again; doubles per attempt
+DEFAULT_MAX_RETRY_DELAY = 3600
+
+
+def retry_delay(attempt, base_delay=DEFAULT_RETRY_DELAY, max_delay=DEFAULT_MAX_RETRY_DELAY):
+    """
+    Backoff before the next claim of a row that failed its attempt-th try.
+    At least half the exponential step, so an outage cannot burn through
+    max_attempts within seconds, plus jitter to spread the retries out.
+    """
+    delay = min(max_delay, base_delay * (2 ** max(0, attempt - 1)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def claimed_row_to_item(apply_link, raw_job, job_details_info):
+    """Rebuild the (job_data, config) pair the scraper would have enriched inline"""
+    if isinstance(raw_job, str):
+        raw_job = json.loads(raw_job)
+    raw_job = raw_job or {}
+    job_data = dict(raw_job.get('job_data') or {}, apply_link=apply_link)
+    job_data['job_details_info'] = job_details_info or 'N/A'
+    config = dict(raw_job.get('config') or {})
+    config.setdefault('url', 'N/A')
+    return job_data, config
+
+
+class EnrichmentWorker:
+    """
+    Claims pending jobs in rounds and enriches each round with batched
+    Gemini requests. A pooled database connection is held only while
+    claiming and while writing results back, never during enrichment, so
+    any number of workers can share a pool of DB_POOL_MAX connections.
+    """
+
+    def __init__(self, claim_size=DEFAULT_CLAIM_SIZE, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 claim_timeout=DEFAULT_CLAIM_TIMEOUT, batch_size=DEFAULT_BATCH_SIZE,
+                 batch_token_budget=DEFAULT_BATCH_TOKEN_BUDGET, retry_delay=DEFAULT_RETRY_DELAY,
+                 name='enrichment-worker'):
+        self.claim_size = claim_size
+        self.max_attempts = max_attempts
+        self.claim_timeout = claim_timeout
+        self.batch_size = batch_size
+        self.batch_token_budget = batch_token_budget
+        self.retry_delay = retry_delay
+        self.name = name
+        self.db = DatabasePipeline(connect=False)
+        self.stats = {'claimed': 0, 'enriched': 0, 'retried': 0, 'failed': 0}
+
+    def process_round(self):
+        """Claim and enrich one round of pending jobs; returns the number claimed"""
+        try:
+            with self.db.checked_out():
+                rows = self.db.claim_pending_jobs(self.claim_size, self.claim_timeout)
+        except Exception as e:
+            safe_print(f"❌ {self.name}: database connection failed: {e}")
+            return 0
+        if not rows:
+            return 0
+        self.stats['claimed'] += len(rows)
+        safe_print(f"📥 {self.name}: claimed {len(rows)} pending jobs")
+
+        items, attempts, apply_links = [], [], []
+        for apply_link, raw_job, job_details_info, attempt in rows:
+            items.append(claimed_row_to_item(apply_link, raw_job, job_details_info))
+            attempts.append(attempt)
+            apply_links.append(apply_link)
+
+        try:
+            results = enrich_jobs_with_gemini(items, self.batch_token_budget, self.batch_size)
+        except Exception as e:
+            results = [(None, f"Enrichment failed: {e}")] * len(items)
+
+        try:
+            with self.db.checked_out():
+                self.write_back(apply_links, attempts, results)
+        except Exception as e:
+            # Rows stay 'processing' and are claimed again after claim_timeout
+            safe_print(f"❌ {self.name}: could not write back {len(rows)} jobs: {e}")
+
+        safe_print(f"✅ {self.name}: {self.stats['enriched']} enriched, {self.stats['retried']} retried, "
+                   f"{self.stats['failed']} failed so far")
+        return len(rows)
+
+    def write_back(self, apply_links, attempts, results):
+        """Store enriched jobs, and put failed ones back in the queue or mark them failed"""
+        for apply_link, attempt, (job, error) in zip(apply_links, attempts, results):
+            if error is None and self.db.update_enriched_job(apply_link, job):
+                self.stats['enriched'] += 1
+                continue
+            error = error or "Enriched job could not be written back"
+            give_up = attempt >= self.max_attempts
+            self.db.release_pending_job(apply_link, error, failed=give_up,
+                                        retry_delay=0 if give_up else retry_delay(attempt, self.retry_delay))
+            self.stats['failed' if give_up else 'retried'] += 1
+
+    def run(self, poll_interval=DEFAULT_POLL_INTERVAL, stop_event=None, once=False):
+        """Process rounds until stopped (or, with once=True, until the queue is empty)"""
+        try:
+            while not (stop_event and stop_event.is_set()):
+                if self.process_round():
+                    continue
+                if once:
+                    break
+                if stop_event:
+                    stop_event.wait(poll_interval)
+                else:
+                    time.sleep(poll_interval)
+        finally:
+            self.db.close()
+
+
+def run_workers(thread_count, poll_interval=DEFAULT_POLL_INTERVAL, once=False, **worker_options):
+    """Run thread_count workers sharing the process' Gemini client; returns their combined stats"""
+    stop_event = threading.Event()
+    workers = [EnrichmentWorker(name=f"enrichment-worker-{number + 1}", **worker_options)
+               for number in range(thread_count)]
+    threads = [threading.Thread(target=worker.run, args=(poll_interval, stop_event, once), name=worker.name)
+               for worker in workers]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(1)
+    except KeyboardInterrupt:
+        safe_print("\n🛑 Stopping enrichment workers after their current round")
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+
+    totals = {key: sum(worker.stats[key] for worker in workers) for key in workers[0].stats}
+    return totals
+
+
+def main():
+    """Main function with command line interface"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Enrich pending jobs from the database with Gemini')
+    parser.add_argument('--threads', type=int, default=1, help='Workers in this process (each claims its own rounds)')
+    parser.add_argument('--claim-size', type=int, default=DEFAULT_CLAIM_SIZE, help='Rows claimed per round')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Most jobs per Gemini request')
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS, help='Claims before a job is marked failed')
+    parser.add_argument('--claim-timeout', type=int, default=DEFAULT_CLAIM_TIMEOUT,
+                        help='Seconds before rows of a dead worker are claimed again')
+    parser.add_argument('--retry-delay', type=float, default=DEFAULT_RETRY_DELAY,
+                        help='Seconds before a failed job is retried (doubles per attempt)')
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL, help='Seconds between polls of an empty queue')
+    parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+    parser.add_argument('--rpm', type=int, help='Gemini requests per minute for this process')
+    parser.add_argument('--tpm', type=int, help='Gemini tokens per minute for this process')
+    parser.add_argument('--backend', choices=sorted(ENRICHMENT_BACKENDS), default='gemini',
+                        help='Enrichment backend (stub and rules need no API key)')
+    args = parser.parse_args()
+
+    if not os.getenv('DATABASE_URL'):
+        safe_print("❌ DATABASE_URL not found in environment variables")
+        raise SystemExit(1)
+
+    client_options = {'max_in_flight': max(4, args.threads * 2)}
+    if args.rpm:
+        client_options['rpm'] = args.rpm
+    if args.tpm:
+        client_options['tpm'] = args.tpm
+    configure_shared_gemini_client(**client_options)
+    configure_shared_enrichment_backend(args.backend)
+
+    safe_print(f"🚀 Enrichment workers started ({args.threads} thread{'s' if args.threads != 1 else ''})")
+    try:
+        totals = run_workers(args.threads, args.poll_interval, args.once, claim_size=args.claim_size,
+                             max_attempts=args.max_attempts, claim_timeout=args.claim_timeout,
+                             batch_size=args.batch_size, retry_delay=args.retry_delay)
+    finally:
+        gemini_stats = close_shared_enrichment_backend()
+
+    safe_print(f"📊 Enrichment summary: {totals['claimed']} claimed, {totals['enriched']} enriched, "
+               f"{totals['retried']} returned to the queue, {totals['failed']} failed")
+    if gemini_stats:
+        print(f"  LLM requests ({args.backend}): {gemini_stats['succeeded']} succeeded, {gemini_stats['retries']} retried, "
+              f"{gemini_stats['failed']} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+"""
+Shared Gemini Client
+Rate-limit-aware async client for Gemini generateContent, shared by all enrichment workers
+
+The enrichment step used to configure the SDK and build a GenerativeModel
+for every job, and any 429/5xx turned the job into a fallback record. This
+client talks to the REST endpoint over one pooled aiohttp session and keeps
+many requests in flight. Two token buckets keep it inside the project quota:
+one for requests per minute, one for tokens per minute. Throttling and
+server errors are retried with jittered exponential backoff, so a transient
+limit no longer throws away a job whose detail page was already fetched.
+
+Several API keys can be given (GEMINI_KEYS="key1,key2"); requests rotate
+over them and a key that gets a 429 cools down while the others carry on.
+
+The client lives on its own event loop thread because enrichment runs in
+the pipeline's thread pool; GeminiClientThread.generate() is the blocking
+entry point for those threads. `python gemini_client.py --stub-test` runs
+the client against a local stub server that throttles and fails on purpose.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from detail_trimmer import estimate_tokens
+
+DEFAULT_BASE_URL = 'https://generativelanguage.googleapis.com/v1beta'
+DEFAULT_MODEL = 'gemini-2.0-flash'
+DEFAULT_RPM = 1000            # Requests per minute across all keys
+DEFAULT_TPM = 1000000         # Input + output tokens per minute across all keys
+DEFAULT_MAX_IN_FLIGHT = 16    # Requests waiting on Gemini at once
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 1.0      # First backoff step in seconds; doubles per attempt
+DEFAULT_MAX_DELAY = 60.0
+DEFAULT_TIMEOUT = 120         # Seconds per request
+EXPECTED_OUTPUT_TOKENS = 700  # Reserved per request until usageMetadata reports the real count
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class GeminiAPIError(Exception):
+    """A Gemini request that failed; retryable tells whether trying again can help"""
+
+    def __init__(self, message, status=None, retryable=False, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Per-minute budget refilled continuously, for one event loop.
+
+    Like HostRateLimiter, callers reserve first and sleep afterwards; the
+    balance may go negative, which is the queue of callers already waiting.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def reserve(self, amount=1):
+        """Take amount from the bucket and return the seconds to wait before using it"""
+        if not self.capacity:
+            return 0.0
+        # A single request larger than the whole budget waits for one full refill, not forever
+        amount = min(amount, self.capacity)
+        self._refill()
+        self.tokens -= amount
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def adjust(self, amount):
+        """Give back (negative amount) or charge extra once the real usage is known"""
+        if self.capacity:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class ApiKeyPool:
+    """Round-robin over API keys; a throttled or rejected key sits out for a while"""
+
+    def __init__(self, keys):
+        self.keys = [key for key in dict.fromkeys(keys) if key]
+        if not self.keys:
+            raise ValueError("no Gemini API key configured (set GEMINI_KEY or GEMINI_KEYS)")
+        self.cooldown_until = {key: 0.0 for key in self.keys}
+        self.disabled = set()
+        self.position = 0
+
+    def next_key(self):
+        """Return (key, seconds until it may be used), preferring keys that are not cooling down"""
+        usable = [key for key in self.keys if key not in self.disabled]
+        if not usable:
+            raise GeminiAPIError("every Gemini API key was rejected")
+        now = time.monotonic()
+        for offset in range(len(usable)):
+            key = usable[(self.position + offset) % len(usable)]
+            if self.cooldown_until[key] <= now:
+                self.position = (self.position + offset + 1) % len(usable)
+                return key, 0.0
+        key = min(usable, key=lambda item: self.cooldown_until[item])
+        return key, self.cooldown_until[key] - now
+
+    def cool_down(self, key, seconds):
+        self.cooldown_until[key] = max(self.cooldown_until[key], time.monotonic() + seconds)
+
+    def disable(self, key):
+        self.disabled.add(key)
+
+
+def keys_from_environment():
+    """GEMINI_KEYS (comma-separated) if set, else the single GEMINI_KEY"""
+    keys = os.getenv('GEMINI_KEYS') or os.getenv('GEMINI_KEY') or ''
+    return [key.strip() for key in keys.split(',') if key.strip()]
+
+
+def backoff_delay(attempt, base_delay, max_delay, retry_after=None):
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After"""
+    delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+    if retry_after:
+        delay = max(delay, min(max_delay, retry_after))
+    return delay
+
+
+def response_text(payload):
+    """Text of the first candidate of a generateContent response"""
+    candidates = payload.get('candidates') or []
+    if not candidates:
+        reason = (payload.get('promptFeedback') or {}).get('blockReason', 'no candidates')
+        raise GeminiAPIError(f"Gemini returned no answer ({reason})")
+    parts = (candidates[0].get('content') or {}).get('parts') or []
+    text = ''.join(part.get('text', '') for part in parts)
+    if not text:
+        raise GeminiAPIError(f"Gemini returned an empty answer ({candidates[0].get('finishReason', 'unknown')})")
+    return text
+
+
+class AsyncGeminiClient:
+    """
+    Async Gemini generateContent client with RPM/TPM budgets, retries and key rotation.
+
+    Args:
+        api_keys: keys to rotate over (defaults to GEMINI_KEYS / GEMINI_KEY)
+        model: model name used in the request path
+        rpm / tpm: requests and tokens per minute across all keys (0 disables the bucket)
+        max_in_flight: requests waiting on Gemini at once
+        max_retries: retries after the first attempt for 429, 5xx and network errors
+        base_url: API root; point it at a stub server for local testing
+    """
+
+    def __init__(self, api_keys=None, model=DEFAULT_MODEL, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM,
+                 max_in_flight=DEFAULT_MAX_IN_FLIGHT, max_retries=DEFAULT_MAX_RETRIES,
+                 base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY, timeout=DEFAULT_TIMEOUT,
+                 base_url=None):
+        self.key_pool = ApiKeyPool(api_keys if api_keys is not None else keys_from_environment())
+        self.model = model
+        self.request_bucket = TokenBucket(rpm)
+        self.token_bucket = TokenBucket(tpm)
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.base_url = (base_url or os.getenv('GEMINI_BASE_URL') or DEFAULT_BASE_URL).rstrip('/')
+        self.session = None
+        self.semaphore = None
+        self.stats = {'requests': 0, 'succeeded': 0, 'failed': 0, 'retries': 0, 'throttled': 0,
+                      'server_errors': 0, 'rate_wait_seconds': 0.0, 'tokens': 0}
+
+    async def start(self):
+        if self.session is None:
+            import aiohttp
+
+            self.semaphore = asyncio.Semaphore(self.max_in_flight)
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_in_flight),
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+    async def _wait_for_budget(self, tokens):
+        wait = max(self.request_bucket.reserve(1), self.token_bucket.reserve(tokens))
+        if wait > 0:
+            self.stats['rate_wait_seconds'] += wait
+            await asyncio.sleep(wait)
+
+    async def _post(self, key, body):
+        """One generateContent call; returns the parsed JSON or raises GeminiAPIError"""
+        import aiohttp
+
+        url = f"{self.base_url}/models/{self.model}:generateContent"
+        try:
+            async with self.session.post(url, json=body, headers={'x-goog-api-key': key}) as response:
+                if response.status == 200:
+                    return await response.json(content_type=None)
+                detail = (await response.text())[:300]
+                retry_after = response.headers.get('Retry-After')
+                raise GeminiAPIError(
+                    f"HTTP {response.status}: {detail}", status=response.status,
+                    retryable=response.status in RETRYABLE_STATUSES,
+                    retry_after=float(retry_after) if retry_after and retry_after.replace('.', '', 1).isdigit() else None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise GeminiAPIError(f"{type(e).__name__}: {e}", retryable=True)
+
+    async def generate(self, prompt, max_output_tokens=None):
+        """Send one prompt and return the answer text, retrying transient failures"""
+        await self.start()
+        body = {'contents': [{'role': 'user', 'parts': [{'text': prompt}]}]}
+        if max_output_tokens:
+            body['generationConfig'] = {'maxOutputTokens': max_output_tokens}
+        reserved = estimate_tokens(prompt) + (max_output_tokens or EXPECTED_OUTPUT_TOKENS)
+
+        async with self.semaphore:
+            for attempt in range(self.max_retries + 1):
+                key, key_wait = self.key_pool.next_key()
+                if key_wait > 0:
+                    await asyncio.sleep(key_wait)
+                await self._wait_for_budget(reserved)
+                self.stats['requests'] += 1
+                try:
+                    payload = await self._post(key, body)
+                    text = response_text(payload)
+                except GeminiAPIError as e:
+                    if e.status == 429:
+                        self.stats['throttled'] += 1
+                    elif e.status and e.status >= 500:
+                        self.stats['server_errors'] += 1
+                    elif e.status in (401, 403) and len(self.key_pool.keys) - len(self.key_pool.disabled) > 1:
+                        # One bad key should not stop the others
+                        print(f"⚠️ Gemini key ...{key[-4:]} rejected (HTTP {e.status}), dropping it")
+                        self.key_pool.disable(key)
+                        e.retryable = True
+
+                    if not e.retryable or attempt == self.max_retries:
+                        self.stats['failed'] += 1
+                        raise
+                    delay = backoff_delay(attempt, self.base_delay, self.max_delay, e.retry_after)
+                    if e.status == 429:
+                        self.key_pool.cool_down(key, delay)
+                    self.stats['retries'] += 1
+                    print(f"⏳ Gemini {e.status or 'network error'}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    continue
+
+                used = (payload.get('usageMetadata') or {}).get('totalTokenCount')
+                if used:
+                    self.token_bucket.adjust(used - reserved)
+                    self.stats['tokens'] += used
+                self.stats['succeeded'] += 1
+                return text
+
+    async def close(self):
+        session, self.session = self.session, None
+        if session is not None:
+            await session.close()
+
+
+class GeminiClientThread:
+    """
+    Keeps an AsyncGeminiClient on a background event loop so the pipeline's
+    enrichment threads (and any other synchronous caller) share one client,
+    one connection pool and one set of rate budgets.
+    """
+
+    def __init__(self, **client_options):
+        self.client_options = client_options
+        self.client = None
+        self.loop = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self.lock:
+            if self.loop is None:
+                self.client = AsyncGeminiClient(**self.client_options)
+                self.loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(target=self.loop.run_forever, name='gemini-client', daemon=True)
+                self.thread.start()
+            return self.loop
+
+    def generate(self, prompt, max_output_tokens=None):
+        """Blocking generate() for threads; raises GeminiAPIError when retries run out"""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self.client.generate(prompt, max_output_tokens), loop).result()
+
+    @property
+    def stats(self):
+        return self.client.stats if self.client is not None else {}
+
+    def close(self):
+        """Close the HTTP session and stop the background loop"""
+        with self.lock:
+            loop, self.loop = self.loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.client.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self.thread.join()
+        loop.close()
+
+
+_shared_client = None
+_shared_client_options = {}
+_shared_client_lock = threading.Lock()
+
+
+def configure_shared_gemini_client(**client_options):
+    """Set AsyncGeminiClient options for the shared client (before its first request)"""
+    global _shared_client_options
+    _shared_client_options = client_options
+
+
+def shared_gemini_client_options():
+    """Copy of the options the shared client is created with"""
+    return dict(_shared_client_options)
+
+
+def get_shared_gemini_client():
+    """Process-wide GeminiClientThread, created on first use"""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = GeminiClientThread(**_shared_client_options)
+        return _shared_client
+
+
+def close_shared_gemini_client():
+    """Close the shared client, if one was created, and return its stats"""
+    global _shared_client
+    with _shared_client_lock:
+        client, _shared_client = _shared_client, None
+    if client is None:
+        return {}
+    stats = dict(client.stats)
+    client.close()
+    return stats
+
+
+class StubGeminiHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in for generateContent. Every throttle_every-th request gets a
+    429 and every fail_every-th a 503; the rest echo the prompt length back.
+    """
+
+    counter = 0
+    counter_lock = threading.Lock()
+    throttle_every = 3
+    fail_every = 7
+    keys_seen = {}
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        key = self.headers.get('x-goog-api-key', '')
+        with self.counter_lock:
+            StubGeminiHandler.counter += 1
+            number = StubGeminiHandler.counter
+            self.keys_seen[key] = self.keys_seen.get(key, 0) + 1
+
+        if key == 'bad-key':
+            return self._reply(403, {'error': {'code': 403, 'message': 'API key not valid'}})
+        if number % self.throttle_every == 0:
+            return self._reply(429, {'error': {'code': 429, 'status': 'RESOURCE_EXHAUSTED'}}, {'Retry-After': '0.2'})
+        if number % self.fail_every == 0:
+            return self._reply(503, {'error': {'code': 503, 'status': 'UNAVAILABLE'}})
+
+        prompt = body['contents'][0]['parts'][0]['text']
+        answer = json.dumps({'title': prompt, 'length': len(prompt)})
+        time.sleep(0.05)
+        self._reply(200, {'candidates': [{'content': {'parts': [{'text': answer}]}, 'finishReason': 'STOP'}],
+                          'usageMetadata': {'totalTokenCount': estimate_tokens(prompt) + 10}})
+
+    def _reply(self, status, payload, headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0):
+    """Run the stub server on a daemon thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubGeminiHandler)
+    threading.Thread(target=server.serve_forever, name='gemini-stub', daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1beta"
+
+
+def run_stub_test(requests=40):
+    """Fire concurrent requests at the stub and check that every one succeeds"""
+    server, base_url = start_stub_server()
+    client = GeminiClientThread(api_keys=['stub-key-1', 'stub-key-2', 'bad-key'], base_url=base_url,
+                                rpm=600, tpm=0, max_in_flight=8, base_delay=0.1, max_delay=1.0)
+    prompts = [f"job {number}" for number in range(requests)]
+    started = time.monotonic()
+    failures = 0
+    try:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            answers = list(executor.map(lambda prompt: _try_generate(client, prompt), prompts))
+        for prompt, answer in zip(prompts, answers):
+            if answer is None or json.loads(answer)['title'] != prompt:
+                failures += 1
+                print(f"❌ {prompt}: {answer}")
+    finally:
+        stats = dict(client.stats)
+        client.close()
+        server.shutdown()
+
+    elapsed = time.monotonic() - started
+    print(f"{'✅' if not failures else '❌'} Stub test: {requests - failures}/{requests} answers in {elapsed:.1f}s, "
+          f"{stats['throttled']} throttled, {stats['server_errors']} server errors, {stats['retries']} retries")
+    print(f"   requests per key: {dict(StubGeminiHandler.keys_seen)}")
+    return failures
+
+
+def _try_generate(client, prompt):
+    try:
+        return client.generate(prompt)
+    except GeminiAPIError as e:
+        print(f"❌ {prompt}: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gemini client self-check against a local stub server")
+    parser.add_argument('--stub-test', action='store_true', help="run concurrent requests against the stub and verify them")
+    parser.add_argument('--stub-server', type=int, metavar='PORT',
+                        help="serve the stub until interrupted (set GEMINI_BASE_URL=http://127.0.0.1:PORT/v1beta)")
+    parser.add_argument('--requests', type=int, default=40, help="requests sent by --stub-test")
+    args = parser.parse_args()
+
+    if args.stub_test:
+        sys.exit(1 if run_stub_test(args.requests) else 0)
+    elif args.stub_server:
+        server, base_url = start_stub_server(args.stub_server)
+        print(f"🧪 Stub Gemini server at {base_url}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
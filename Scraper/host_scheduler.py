@@ -0,0 +1,91 @@
+"""
+Per-Host Politeness Scheduler
+Keeps a request budget per registrable domain instead of sleeping between companies
+
+Every host gets its own token bucket. Requests to unrelated domains
+(amazon.jobs, careers.microsoft.com, eightfold.ai, ...) never wait on each
+other, while all hits against one ATS host (e.g. every *.myworkdayjobs.com
+tenant) share a single budget and stay throttled.
+"""
+
+import asyncio
+import threading
+import time
+from urllib.parse import urlparse
+
+# Public suffixes that span two labels; enough for the career sites we crawl
+MULTI_LABEL_SUFFIXES = {
+    'co.uk', 'org.uk', 'ac.uk', 'gov.uk',
+    'co.in', 'net.in', 'org.in', 'gov.in',
+    'com.au', 'net.au', 'org.au',
+    'co.jp', 'co.za', 'co.nz', 'co.kr',
+    'com.br', 'com.cn', 'com.sg', 'com.mx', 'com.tr', 'com.hk',
+}
+
+
+def registrable_domain(url):
+    """Return the registrable domain (eTLD+1) for a URL or bare host name"""
+    host = urlparse(url).hostname if '://' in url else url.split('/')[0].split(':')[0]
+    host = (host or '').lower().strip('.')
+
+    if not host or host == 'localhost' or host.replace('.', '').isdigit() or ':' in host:
+        return host
+
+    labels = host.split('.')
+    if len(labels) >= 3 and '.'.join(labels[-2:]) in MULTI_LABEL_SUFFIXES:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+class HostRateLimiter:
+    """
+    Thread-safe token bucket per registrable domain.
+
+    min_interval is the steady-state gap between requests to one host and
+    burst is how many requests may go out back-to-back after an idle period.
+    Callers reserve their slot under a short lock and then sleep outside of
+    it, so many threads (or coroutines) can wait on different hosts at once.
+    """
+
+    def __init__(self, min_interval=2.0, burst=1, overrides=None):
+        self.min_interval = min_interval
+        self.burst = max(1, burst)
+        self.overrides = overrides or {}  # domain -> min_interval
+        self.buckets = {}  # domain -> [tokens, last_refill]
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'throttled': 0, 'total_wait_seconds': 0.0}
+
+    def _reserve(self, url):
+        """Reserve the next slot for url's host and return seconds to wait"""
+        domain = registrable_domain(url)
+        interval = self.overrides.get(domain, self.min_interval)
+        if not interval or interval <= 0:
+            return 0.0
+
+        now = time.monotonic()
+        with self.lock:
+            tokens, last = self.buckets.get(domain, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) / interval)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) * interval
+            # Tokens may go negative: that is a queue of callers already waiting on this host
+            self.buckets[domain] = (tokens - 1, now)
+
+            self.stats['requests'] += 1
+            if wait > 0:
+                self.stats['throttled'] += 1
+                self.stats['total_wait_seconds'] += wait
+        return wait
+
+    def acquire(self, url):
+        """Block the calling thread until a request to url's host is allowed"""
+        wait = self._reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url):
+        """Coroutine version of acquire() for asyncio callers"""
+        wait = self._reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
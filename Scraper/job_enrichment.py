@@ -0,0 +1,607 @@
+"""
+Gemini Job Enrichment
+Turns a scraped job record into the structured job stored in the results file
+
+Split out of Final_Scraper.extract_job_data so the enrichment step can run as
+its own pipeline stage, independent of the listing page it came from.
+Requests go through the shared client in gemini_client.py, and results are
+kept in the enrichment cache so an unchanged posting is never sent twice.
+Fields the local rules (local_extractor.py) recover with enough confidence
+are not requested at all, and a job they fully cover never reaches Gemini.
+
+enrich_jobs_with_gemini() packs several jobs into one request so the
+instruction preamble and the request latency are paid once per batch.
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+from datetime import datetime
+
+from detail_trimmer import trim_job_details, estimate_tokens, DEFAULT_DETAIL_TOKEN_BUDGET
+from enrichment_backends import get_shared_enrichment_backend
+from enrichment_cache import get_shared_enrichment_cache, enrichment_cache_key
+from local_extractor import extract_local_fields, EXTRACTION_STATS, DEFAULT_MIN_CONFIDENCE
+
+PROMPT_VERSION = 'v4'                # Bump whenever the prompts change; cached results of older versions are ignored
+DEFAULT_BATCH_SIZE = 8               # Most jobs packed into one batched request
+DEFAULT_BATCH_TOKEN_BUDGET = 12000   # Estimated input tokens per batched request
+BATCH_MAX_OUTPUT_TOKENS = 8192       # Output limit of the model; caps K together with the estimate below
+OUTPUT_TOKENS_PER_JOB = 700          # Typical size of one enriched job in the answer
+
+NA_FIELDS = ['posted_date', 'experience']  # Missing values the prompt spells "N/A"; every other field uses null
+ARRAY_FIELDS = ['requirements', 'preferred_qualifications', 'responsibilities', 'benefits', 'skills', 'tags']
+REQUIRED_FIELDS = ['title', 'company', 'location', 'posted_date', 'apply_link']
+BATCH_ECHO_FIELDS = ['title', 'apply_link']  # Every batch element repeats these, so it can be matched to its job
+ENRICHMENT_CONFIG_KEYS = ['url', 'company_name', 'detail_token_budget', 'local_extraction', 'local_extraction_min_confidence']  # Company config fields enrichment reads
+
+
+def extract_and_clean_job_details(job_data, config):
+    """Extract and clean job details for better Gemini processing"""
+    cleaned_data = {
+        'title': job_data.get('title', 'N/A'),
+        'company': job_data.get('company', config.get('company_name', 'N/A')),
+        'location': job_data.get('location', 'N/A'),
+        'posted_date': job_data.get('posted_date', 'N/A'),
+        'apply_link': job_data.get('apply_link', 'N/A'),
+        'description': job_data.get('description', 'N/A'),
+        'job_details_info': job_data.get('job_details_info', 'N/A'),
+        'source_url': config.get('url', 'N/A')
+    }
+
+    # Clean up description and job details
+    if cleaned_data['description'] != 'N/A':
+        # Remove extra whitespace and normalize
+        cleaned_data['description'] = ' '.join(cleaned_data['description'].split())
+
+    if cleaned_data['job_details_info'] != 'N/A':
+        # Keep the most relevant sections within the token budget, one normalized line each
+        trimmed = trim_job_details(cleaned_data['job_details_info'],
+                                   config.get('detail_token_budget', DEFAULT_DETAIL_TOKEN_BUDGET))
+        cleaned_data['job_details_info'] = '\n'.join(' '.join(line.split()) for line in trimmed.splitlines() if line.strip()) or 'N/A'
+
+    # Extract additional fields if available
+    additional_fields = ['job_id', 'department', 'employment_type', 'experience_level',
+                        'remote_work', 'salary', 'deadline', 'requirements', 'benefits', 'skills']
+
+    for field in additional_fields:
+        if field in job_data and job_data[field] not in ['N/A', None, '']:
+            cleaned_data[field] = job_data[field]
+
+    return cleaned_data
+
+
+GEMINI_INSTRUCTIONS = """TASK: Extract and structure the following information into a clean JSON format:
+
+REQUIRED FIELDS:
+- title: Job title (string)
+- company: Company name (string)
+- location: Job location (string)
+- posted_date: When the job was posted (string, format: MM/DD/YYYY or "N/A")
+- apply_link: Application URL (string)
+- experience: Experience level required (string, e.g., "3-5 years", "N/A")
+- job_id: Job identifier if available either check from the job details info or check in the URL  (string or number or null)
+- department: Department/team (string or null)
+- employment_type: Full-time, Part-time, Contract, etc. (string or null)
+- experience_level: Entry, Mid, Senior, etc. (string or null)
+- remote_work: Remote, Hybrid, On-site (string or null)
+- salary: Salary information if available (string or null)
+- deadline: Application deadline if available (string or null)
+
+DETAILED FIELDS:
+- description: Clean and Short job description (string)
+- requirements: Array of required qualifications/skills
+- preferred_qualifications: Array of preferred qualifications/skills
+- responsibilities: Array of job responsibilities
+- benefits: Array of benefits/perks
+- skills: Array of technical skills mentioned
+- tags: Array of relevant tags/categories
+
+RULES:
+1. Clean and normalize all text data
+2. Convert lists to proper arrays
+3. Use null for missing data (not "N/A")
+4. Extract skills from requirements and description
+5. Identify experience level from title and requirements
+6. Determine employment type from description
+7. Extract salary if mentioned
+8. Parse dates into consistent format
+9. Remove HTML tags and extra whitespace
+10. Ensure all arrays are properly formatted
+
+"""
+
+
+def build_gemini_prompt(cleaned_job_data, fields_needed=None):
+    """Create a comprehensive prompt for better job detail extraction"""
+    only_fields = f" containing only these fields: {', '.join(fields_needed)}," if fields_needed else ""
+    return f"""
+You are a professional job data analyst. Analyze the following scraped job data and create a clean, structured JSON response.
+
+RAW JOB DATA:
+{json.dumps(cleaned_job_data, ensure_ascii=False, separators=(',', ':'))}
+
+{GEMINI_INSTRUCTIONS}OUTPUT: Return ONLY valid JSON{only_fields} without any markdown formatting, code blocks, or additional text.
+"""
+
+
+def build_batch_gemini_prompt(cleaned_jobs, fields_needed=None):
+    """
+    One prompt for several jobs: the instructions once, the jobs as an
+    indexed JSON array. fields_needed optionally lists, per job, the only
+    fields Gemini has to return for it (None for all fields).
+    """
+    fields_needed = fields_needed or [None] * len(cleaned_jobs)
+    indexed_jobs = [dict(job, index=index, **({'fields_needed': fields} if fields else {}))
+                    for index, (job, fields) in enumerate(zip(cleaned_jobs, fields_needed))]
+    return f"""
+You are a professional job data analyst. Analyze each of the following scraped jobs and create a clean, structured JSON response for every one of them.
+
+RAW JOBS (JSON array, every job has an "index"):
+{json.dumps(indexed_jobs, ensure_ascii=False, separators=(',', ':'))}
+
+{GEMINI_INSTRUCTIONS}OUTPUT: Return ONLY a valid JSON array with one object per job, each carrying the job's "index", "title" and "apply_link" unchanged, without any markdown formatting, code blocks, or additional text. When a job has "fields_needed", its object contains only those fields, the index, the title and the apply_link.
+"""
+
+
+def strip_code_fences(text):
+    """Remove markdown code blocks wrapped around a model response"""
+    text = text.strip()
+    if text.startswith('```json'):
+        text = text[7:]
+    elif text.startswith('```'):
+        text = text[3:]
+
+    if text.endswith('```'):
+        text = text[:-3]
+    return text
+
+
+def finalize_enriched_job(cleaned_job, job_data, config):
+    """Validate a parsed Gemini result and attach scraper metadata"""
+    # Validate and ensure required fields exist
+    for field in REQUIRED_FIELDS:
+        if field not in cleaned_job:
+            cleaned_job[field] = job_data.get(field, 'N/A')
+
+    # Add metadata
+    cleaned_job['scraped_at'] = datetime.now().isoformat()
+    cleaned_job['source_url'] = config['url']
+    cleaned_job['job_details_info'] = job_data.get('job_details_info', 'N/A')
+
+    # Ensure arrays are properly formatted
+    for field in ARRAY_FIELDS:
+        if field in cleaned_job:
+            if isinstance(cleaned_job[field], str):
+                # Convert string to array if it's a comma-separated list
+                if ',' in cleaned_job[field]:
+                    cleaned_job[field] = [item.strip() for item in cleaned_job[field].split(',') if item.strip()]
+                else:
+                    cleaned_job[field] = [cleaned_job[field]] if cleaned_job[field] != 'N/A' else []
+            elif not isinstance(cleaned_job[field], list):
+                cleaned_job[field] = []
+        else:
+            cleaned_job[field] = []
+
+    return cleaned_job
+
+
+def build_fallback_job(job_data, config, error, raw_response=None):
+    """Create a basic structured job from raw data when Gemini processing fails"""
+    fallback_job = {
+        'title': job_data.get('title', 'N/A'),
+        'company': job_data.get('company', 'N/A'),
+        'location': job_data.get('location', 'N/A'),
+        'posted_date': job_data.get('posted_date', 'N/A'),
+        'apply_link': job_data.get('apply_link', 'N/A'),
+        'description': job_data.get('description', 'N/A'),
+        'requirements': [],
+        'preferred_qualifications': [],
+        'responsibilities': [],
+        'benefits': [],
+        'skills': [],
+        'tags': [],
+        'job_id': job_data.get('job_id', None),
+        'department': job_data.get('department', None),
+        'employment_type': job_data.get('employment_type', None),
+        'experience_level': job_data.get('experience_level', None),
+        'remote_work': job_data.get('remote_work', None),
+        'salary': job_data.get('salary', None),
+        'deadline': job_data.get('deadline', None),
+        'scraped_at': datetime.now().isoformat(),
+        'source_url': config['url'],
+        'job_details_info': job_data.get('job_details_info', 'N/A'),
+        'gemini_error': error
+    }
+    if raw_response is not None:
+        fallback_job['raw_gemini_response'] = raw_response
+    return fallback_job
+
+
+def build_pending_job(job_data, config):
+    """
+    Deferred enrichment: the scraped job as stored before Gemini has seen it.
+
+    The record keeps the raw fields with enrichment_status 'pending' and the
+    job_data / config that enrichment_worker.py needs to enrich it later
+    (job_details_info is stored in its own column, so it is left out).
+    Same (job, error) shape as enrich_job_with_gemini(), so it can stand in
+    for it in the pipeline.
+    """
+    pending_job = build_fallback_job(job_data, config, None)
+    del pending_job['gemini_error']
+    pending_job['enrichment_status'] = 'pending'
+    pending_job['enrichment_input'] = {
+        'job_data': {key: value for key, value in job_data.items() if key != 'job_details_info'},
+        'config': {key: config[key] for key in ENRICHMENT_CONFIG_KEYS if key in config}
+    }
+    return pending_job, None
+
+
+def generate_gemini_text(prompt, max_output_tokens=None):
+    """
+    Send one prompt to the configured enrichment backend (Gemini unless a
+    benchmark picked the stub) and return the raw response text. The
+    Gemini client rate-limits and retries throttled or failed requests
+    before giving up.
+    """
+    response_text = get_shared_enrichment_backend().generate(prompt, max_output_tokens)
+
+    # Save raw Gemini responses for debugging, one file per prompt so concurrent requests don't collide
+    response_dir = os.getenv('GEMINI_RESPONSE_DIR')
+    if response_dir:
+        os.makedirs(response_dir, exist_ok=True)
+        name = f"gemini_response_{hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]}.json"
+        with open(os.path.join(response_dir, name), "w", encoding="utf-8") as f:
+            f.write(response_text)
+    return response_text
+
+
+def plan_enrichment_batches(cleaned_jobs, token_budget=DEFAULT_BATCH_TOKEN_BUDGET, max_batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Split jobs into batches of adaptive size K: a batch grows until its
+    prompt would exceed token_budget input tokens, it holds max_batch_size
+    jobs, or the expected answer would no longer fit the output limit.
+    Returns lists of indexes into cleaned_jobs.
+    """
+    overhead = estimate_tokens(build_batch_gemini_prompt([]))
+    max_jobs = max(1, min(max_batch_size, BATCH_MAX_OUTPUT_TOKENS // OUTPUT_TOKENS_PER_JOB))
+    batches, current, used = [], [], overhead
+    for index, job in enumerate(cleaned_jobs):
+        cost = estimate_tokens(json.dumps(job, ensure_ascii=False, separators=(',', ':'))) + 5
+        if current and (used + cost > token_budget or len(current) >= max_jobs):
+            batches.append(current)
+            current, used = [], overhead
+        current.append(index)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def comparable_text(value):
+    """Lowercase letters and digits only, for comparing an echoed value with the original"""
+    return re.sub(r'[^a-z0-9]+', '', value.lower()) if isinstance(value, str) else ''
+
+
+def batch_element_matches(element, cleaned_job):
+    """
+    True if a batch element echoes its job's title and apply link. An
+    element that names another job (the model swapped or shifted indexes)
+    or can't be matched at all is not trusted.
+    """
+    checked = False
+    for field in BATCH_ECHO_FIELDS:
+        expected = comparable_text(cleaned_job.get(field))
+        if not expected or cleaned_job.get(field) == 'N/A':
+            continue
+        answered = comparable_text(element.get(field))
+        if not answered:
+            continue
+        if field == 'apply_link':
+            matches = answered == expected
+        else:
+            # Gemini may tidy a title a little, e.g. drop a trailing req number
+            matches = expected in answered or answered in expected
+        if not matches:
+            return False
+        checked = True
+    return checked
+
+
+def parse_batch_response(text, cleaned_jobs):
+    """Map index -> parsed job object for every element that is usable and matches its job"""
+    try:
+        elements = json.loads(text)
+    except Exception as e:
+        print(f"❌ Batch JSON parsing error: {e}")
+        return {}
+    if isinstance(elements, dict):
+        # Some answers wrap the array, e.g. {"jobs": [...]}
+        elements = next((value for value in elements.values() if isinstance(value, list)), [])
+    if not isinstance(elements, list):
+        return {}
+
+    parsed = {}
+    for element in elements:
+        if not isinstance(element, dict):
+            continue
+        index = element.pop('index', None)
+        try:
+            index = int(index)
+        except (TypeError, ValueError):
+            continue
+        if not 0 <= index < len(cleaned_jobs) or index in parsed or not element:
+            continue
+        if not batch_element_matches(element, cleaned_jobs[index]):
+            print(f"⚠️ Batch element {index} does not match {cleaned_jobs[index].get('title', 'Unknown')}, retrying it alone")
+            continue
+        parsed[index] = element
+    return parsed
+
+
+def enrich_jobs_with_gemini(items, token_budget=DEFAULT_BATCH_TOKEN_BUDGET, max_batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Enrich several (job_data, config) items with batched Gemini requests.
+
+    Each batch asks for a JSON array keyed by job index; elements are
+    validated one by one against the title and apply link of their job, and
+    only the jobs whose element is missing, invalid or mismatched are
+    retried with their own request. Jobs found in the
+    enrichment cache or fully covered by local extraction are not sent at
+    all, and the rest are asked only for their missing fields. Returns
+    [(job, error)] in the order of items.
+    """
+    results = [None] * len(items)
+    cleaned_jobs = [None] * len(items)
+    local_fields = [{}] * len(items)
+    fields_needed = [None] * len(items)
+
+    pending = []
+    cached_count = local_only_count = 0
+    for index, (job_data, config) in enumerate(items):
+        try:
+            cleaned_jobs[index] = extract_and_clean_job_details(job_data, config)
+        except Exception:
+            # Unusable record: the single-job path turns it into a fallback job
+            results[index] = enrich_job_with_gemini(job_data, config)
+            continue
+        cached_job = cached_enrichment(cleaned_jobs[index], job_data, config)
+        if cached_job is not None:
+            results[index] = (cached_job, None)
+            cached_count += 1
+            continue
+        local_fields[index], fields_needed[index] = plan_local_extraction(job_data, config, cleaned_jobs[index])
+        if fields_needed[index] == []:
+            results[index] = (local_only_enrichment(job_data, config, cleaned_jobs[index], local_fields[index]), None)
+            local_only_count += 1
+        else:
+            pending.append(index)
+    if cached_count:
+        print(f"♻️ Enrichment cache: {cached_count}/{len(items)} jobs already enriched")
+    if local_only_count:
+        print(f"🧩 Local extraction: {local_only_count}/{len(items)} jobs need no Gemini call")
+
+    for planned in plan_enrichment_batches([cleaned_jobs[index] for index in pending], token_budget, max_batch_size):
+        batch = [pending[position] for position in planned]
+        if len(batch) == 1:
+            results[batch[0]] = request_enrichment(*items[batch[0]], cleaned_jobs[batch[0]],
+                                                   local_fields[batch[0]], fields_needed[batch[0]])
+            continue
+
+        try:
+            batch_jobs = [cleaned_jobs[index] for index in batch]
+            prompt = build_batch_gemini_prompt(batch_jobs, [fields_needed[index] for index in batch])
+            response_text = generate_gemini_text(prompt, BATCH_MAX_OUTPUT_TOKENS)
+            parsed = parse_batch_response(strip_code_fences(response_text), batch_jobs)
+        except Exception as e:
+            print(f"❌ Gemini batch API error: {e}")
+            parsed = {}
+
+        retries = []
+        for position, index in enumerate(batch):
+            job_data, config = items[index]
+            if position not in parsed:
+                retries.append(index)
+                continue
+            try:
+                result = dict(parsed[position], **local_fields[index])
+                results[index] = (finalize_enriched_job(dict(result), job_data, config), None)
+                store_enrichment(cleaned_jobs[index], result)
+            except Exception as e:
+                print(f"❌ Invalid batch element for {job_data.get('title', 'Unknown')}: {e}")
+                retries.append(index)
+
+        print(f"✅ Gemini batch: {len(batch) - len(retries)}/{len(batch)} jobs enriched in one request")
+        for index in retries:
+            results[index] = request_enrichment(*items[index], cleaned_jobs[index], local_fields[index], fields_needed[index])
+
+    return results
+
+
+def plan_local_extraction(job_data, config, cleaned_job_data):
+    """
+    Run the local rules over one cleaned job.
+
+    Returns (local_fields, fields_needed): the confidently extracted fields
+    and the fields Gemini still has to provide. fields_needed is [] when the
+    job needs no Gemini call, and None when local extraction is disabled.
+    With the rules backend every field is taken, however low its confidence.
+    """
+    if not get_shared_enrichment_backend().uses_llm:
+        min_confidence = 0
+    elif not config.get('local_extraction', True):
+        return {}, None
+    else:
+        min_confidence = config.get('local_extraction_min_confidence', DEFAULT_MIN_CONFIDENCE)
+    try:
+        extraction = extract_local_fields(job_data, cleaned_job_data)
+    except Exception as e:
+        print(f"⚠️ Local extraction failed, asking Gemini for every field: {e}")
+        return {}, None
+    fields_needed = extraction.missing_fields(min_confidence)
+    EXTRACTION_STATS.record(len(fields_needed))
+    # Same convention for a confidently missing value as the prompt gives Gemini
+    local_fields = {field: 'N/A' if value is None and field in NA_FIELDS else value
+                    for field, value in extraction.confident_fields(min_confidence).items()}
+    return local_fields, fields_needed
+
+
+def local_only_enrichment(job_data, config, cleaned_job_data, local_fields):
+    """Finished job built from local fields alone; stored like a Gemini result"""
+    store_enrichment(cleaned_job_data, local_fields)
+    return finalize_enriched_job(dict(local_fields), job_data, config)
+
+
+def result_version():
+    """Cache version of new results: the prompt version, plus the backend unless it is Gemini"""
+    backend = get_shared_enrichment_backend()
+    return PROMPT_VERSION if backend.name == 'gemini' else f"{PROMPT_VERSION}-{backend.name}"
+
+
+def cached_enrichment(cleaned_job_data, job_data, config):
+    """Finished job from the enrichment cache, or None on a miss"""
+    cache = get_shared_enrichment_cache()
+    if cache is None:
+        return None
+    try:
+        cache_key = enrichment_cache_key(cleaned_job_data, result_version())
+        cached_job = cache.get(cache_key) if cache_key else None
+    except Exception as e:
+        print(f"⚠️ Enrichment cache lookup failed: {e}")
+        return None
+    if cached_job is None:
+        return None
+    # The key ignores where the job was found; report where it was found this time
+    if job_data.get('apply_link') not in (None, '', 'N/A'):
+        cached_job['apply_link'] = job_data['apply_link']
+    return finalize_enriched_job(cached_job, job_data, config)
+
+
+def store_enrichment(cleaned_job_data, parsed_job):
+    """Remember a parsed Gemini result for this payload"""
+    cache = get_shared_enrichment_cache()
+    if cache is None:
+        return
+    try:
+        cache_key = enrichment_cache_key(cleaned_job_data, result_version())
+        if cache_key:
+            cache.put(cache_key, parsed_job, result_version())
+    except Exception as e:
+        print(f"⚠️ Could not store enrichment result: {e}")
+
+
+def enrich_job_with_gemini(job_data, config):
+    """
+    Run Gemini AI enrichment for one scraped job, unless the enrichment
+    cache already holds the result for the same content. Fields the local
+    rules extract confidently are not requested from Gemini.
+
+    Returns (job, error): the structured job and None on success, or a
+    fallback job built from the raw data and the error message on failure.
+    """
+    try:
+        # Clean and prepare job data for Gemini processing
+        cleaned_job_data = extract_and_clean_job_details(job_data, config)
+    except Exception as e:
+        print(f"❌ Gemini API error: {e}")
+        error = f"Gemini API failed: {e}"
+        return build_fallback_job(job_data, config, error), error
+
+    cached_job = cached_enrichment(cleaned_job_data, job_data, config)
+    if cached_job is not None:
+        print(f"♻️ Enrichment cache hit: {cached_job.get('title', 'Unknown')}")
+        return cached_job, None
+
+    local_fields, fields_needed = plan_local_extraction(job_data, config, cleaned_job_data)
+    if fields_needed == []:
+        cleaned_job = local_only_enrichment(job_data, config, cleaned_job_data, local_fields)
+        print(f"🧩 Extracted locally, no Gemini call: {cleaned_job.get('title', 'Unknown')}")
+        return cleaned_job, None
+    return request_enrichment(job_data, config, cleaned_job_data, local_fields, fields_needed)
+
+
+def request_enrichment(job_data, config, cleaned_job_data, local_fields=None, fields_needed=None):
+    """
+    Send one cleaned job to Gemini; returns (job, error) like enrich_job_with_gemini().
+    With fields_needed, Gemini is asked for those fields only and the answer
+    is merged with the locally extracted local_fields.
+    """
+    try:
+        gemini_prompt = build_gemini_prompt(cleaned_job_data, fields_needed)
+
+        cleaned_text = strip_code_fences(generate_gemini_text(gemini_prompt))
+
+        # Try to parse the JSON
+        try:
+            parsed_job = json.loads(cleaned_text)
+            parsed_job.update(local_fields or {})
+            result = dict(parsed_job)
+            cleaned_job = finalize_enriched_job(parsed_job, job_data, config)
+            store_enrichment(cleaned_job_data, result)
+            print(f"✅ Successfully processed job: {cleaned_job.get('title', 'Unknown')}")
+            return cleaned_job, None
+        except Exception as e:
+            print(f"❌ JSON parsing error: {e}")
+            error = f"JSON parsing failed: {e}"
+            return build_fallback_job(job_data, config, error, raw_response=cleaned_text), error
+
+    except Exception as e:
+        print(f"❌ Gemini API error: {e}")
+        error = f"Gemini API failed: {e}"
+        return build_fallback_job(job_data, config, error), error
+
+
+def run_self_test():
+    """A batch answer with swapped indexes must not cross-assign jobs"""
+    from enrichment_backends import (EnrichmentBackend, ENRICHMENT_BACKENDS, stub_response_text,
+                                     configure_shared_enrichment_backend, close_shared_enrichment_backend)
+    from enrichment_cache import configure_shared_enrichment_cache
+
+    class SwappedBatchBackend(EnrichmentBackend):
+        """Answers like the stub, but gives the first two jobs of a batch each other's index"""
+        name = 'swapped-batch'
+        prompts = []
+
+        def generate(self, prompt, max_output_tokens=None):
+            self.prompts.append(prompt)
+            answer = json.loads(stub_response_text(prompt))
+            if isinstance(answer, list) and len(answer) > 1:
+                answer[0]['index'], answer[1]['index'] = answer[1]['index'], answer[0]['index']
+            return json.dumps(answer)
+
+    ENRICHMENT_BACKENDS[SwappedBatchBackend.name] = SwappedBatchBackend
+    configure_shared_enrichment_backend(SwappedBatchBackend.name)
+    configure_shared_enrichment_cache(None)
+    config = {'url': 'https://acme.example/careers', 'company_name': 'Acme', 'local_extraction': False}
+    items = [({'title': title, 'company': 'Acme', 'location': 'Bangalore', 'apply_link': f"https://acme.example/jobs/{number}",
+               'job_details_info': f"# About the role\n{title} working on {topic}."}, config)
+             for number, (title, topic) in enumerate([('Backend Engineer', 'payments'), ('Data Analyst', 'reporting'),
+                                                      ('QA Engineer', 'test automation')])]
+    try:
+        results = enrich_jobs_with_gemini(items)
+    finally:
+        close_shared_enrichment_backend()
+
+    batch_prompts = [prompt for prompt in SwappedBatchBackend.prompts if 'RAW JOBS ' in prompt]
+    checks = [
+        ("every job kept its own title and link",
+         all(job['title'] == job_data['title'] and job['apply_link'] == job_data['apply_link']
+             for (job, _), (job_data, _) in zip(results, items))),
+        ("no fallback jobs", all(error is None for _, error in results)),
+        ("one batch request", len(batch_prompts) == 1),
+        ("only the two swapped jobs retried alone", len(SwappedBatchBackend.prompts) - len(batch_prompts) == 2),
+    ]
+    failures = 0
+    for name, passed in checks:
+        print(f"{'✅' if passed else '❌'} {name}")
+        failures += not passed
+    return failures
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ['--self-test']:
+        sys.exit(1 if run_self_test() else 0)
+    print("usage: python job_enrichment.py --self-test")
@@ -0,0 +1,374 @@
+"""
+Staged Job Pipeline
+listing -> detail crawl -> LLM enrichment -> persistence, with bounded queues
+
+The listing side (sync Playwright worker threads) only reads job cards and
+submits them. Detail crawling, enrichment and persistence run as separate
+asyncio stages on a dedicated event loop thread. Every stage has its own
+concurrency limit, and the bounded queues between them give backpressure:
+when enrichment falls behind, the detail queue fills up and submit() blocks
+the listing thread instead of buffering an unbounded number of jobs.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PipelineBatch:
+    """
+    Jobs submitted for one company.
+
+    The listing thread submits cards through the batch and calls wait() once
+    the company has no more pages; wait() returns the finished jobs in the
+    order their cards were submitted plus the stage statistics.
+
+    on_job, if given, is called as on_job(job, page_number) on the
+    pipeline's persistence thread as soon as each job is finished, one job
+    at a time and in the order jobs leave enrichment. With keep_jobs=False
+    the batch only counts finished jobs (on_job is expected to stream them
+    out) and wait() returns an empty job list.
+    """
+
+    def __init__(self, pipeline, name, on_job=None, keep_jobs=True):
+        self.pipeline = pipeline
+        self.name = name
+        self.on_job = on_job
+        self.keep_jobs = keep_jobs
+        self.submitted = 0
+        self.pending = 0
+        self.completed = []  # (sequence, job)
+        self.stats = {
+            'successful_extractions': 0,
+            'gemini_processing_errors': 0,
+            'crawl4ai_errors': 0
+        }
+        self.condition = threading.Condition()
+
+    def submit(self, job_data, config, page_number=None):
+        """Queue a job for detail crawl and enrichment (blocks when the pipeline is full)"""
+        with self.condition:
+            sequence = self.submitted
+            self.submitted += 1
+            self.pending += 1
+        try:
+            self.pipeline.submit({'batch': self, 'sequence': sequence, 'page_number': page_number,
+                                  'job_data': job_data, 'config': config})
+        except BaseException:
+            # The job never entered the pipeline, so wait() must not wait for it
+            self.discard()
+            raise
+
+    def record_error(self, stat_key):
+        """Count a stage error against this batch"""
+        with self.condition:
+            self.stats[stat_key] += 1
+
+    def complete(self, sequence, job):
+        """Store a finished job and wake up wait() when the batch is drained"""
+        with self.condition:
+            if self.keep_jobs:
+                self.completed.append((sequence, job))
+            self.stats['successful_extractions'] += 1
+            self.pending -= 1
+            self.condition.notify_all()
+
+    def discard(self):
+        """Drop a job that could not be processed at all"""
+        with self.condition:
+            self.pending -= 1
+            self.condition.notify_all()
+
+    def wait(self):
+        """Block until every submitted job has left the pipeline"""
+        with self.condition:
+            while self.pending > 0:
+                self.condition.wait()
+            jobs = [job for _, job in sorted(self.completed, key=lambda entry: entry[0])]
+            return jobs, dict(self.stats)
+
+
+class JobPipeline:
+    """
+    Session-wide asyncio pipeline shared by all scraper worker threads.
+
+    Args:
+        detail_fetcher: async callable(url, config) -> job details text; if it has an async
+            close() (e.g. a DetailFetcher holding a browser) it is awaited on shutdown
+        enricher: sync callable(job_data, config) -> (job, error); runs in a thread pool
+        detail_concurrency: detail pages fetched at once
+        enrichment_concurrency: enrichment calls in flight at once
+        queue_size: capacity of each inter-stage queue
+        batch_enricher: optional sync callable([(job_data, config)]) -> [(job, error)]; when
+            given, one collector fills batches of up to enrichment_batch_size jobs (waiting at
+            most batch_linger seconds for more to arrive) and up to enrichment_concurrency
+            batches are enriched at once
+    """
+
+    def __init__(self, detail_fetcher, enricher, detail_concurrency=4, enrichment_concurrency=4, queue_size=20,
+                 batch_enricher=None, enrichment_batch_size=8, batch_linger=2.0):
+        self.detail_fetcher = detail_fetcher
+        self.enricher = enricher
+        self.batch_enricher = batch_enricher
+        self.enrichment_batch_size = max(1, enrichment_batch_size)
+        self.batch_linger = batch_linger
+        self.detail_concurrency = max(1, detail_concurrency)
+        self.enrichment_concurrency = max(1, enrichment_concurrency)
+        self.queue_size = max(1, queue_size)
+
+        self.loop = None
+        self.thread = None
+        self.executor = None
+        self.persist_executor = None
+        self.detail_queue = None
+        self.enrich_queue = None
+        self.persist_queue = None
+        self.workers = []
+        self.batch_slots = None
+        self.batch_tasks = set()
+        self.ready = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Lifecycle (called from the main thread)
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the event loop thread and the stage workers"""
+        self.executor = ThreadPoolExecutor(max_workers=self.enrichment_concurrency, thread_name_prefix='enrichment')
+        # Sink writes (and their fsyncs) block, so they run off the event loop on a single writer thread
+        self.persist_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='persistence')
+        self.thread = threading.Thread(target=self._run_loop, name='job-pipeline', daemon=True)
+        self.thread.start()
+        self.ready.wait()
+
+    def open_batch(self, name, on_job=None, keep_jobs=True):
+        """Create a batch for one company"""
+        return PipelineBatch(self, name, on_job, keep_jobs)
+
+    def submit(self, item):
+        """Hand an item to the detail stage from a non-loop thread (blocks while the queue is full)"""
+        asyncio.run_coroutine_threadsafe(self.detail_queue.put(item), self.loop).result()
+
+    def close(self):
+        """Drain all stages and stop the event loop thread"""
+        if not self.loop:
+            return
+        asyncio.run_coroutine_threadsafe(self._drain_and_stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.executor.shutdown(wait=True)
+        self.persist_executor.shutdown(wait=True)
+        self.loop = None
+
+    # ------------------------------------------------------------------
+    # Event loop side
+    # ------------------------------------------------------------------
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._setup())
+        self.ready.set()
+        self.loop.run_forever()
+        self.loop.close()
+
+    async def _setup(self):
+        self.detail_queue = asyncio.Queue(maxsize=self.queue_size)
+        self.enrich_queue = asyncio.Queue(maxsize=self.queue_size)
+        self.persist_queue = asyncio.Queue(maxsize=self.queue_size)
+        self.batch_slots = asyncio.Semaphore(self.enrichment_concurrency)
+
+        if self.batch_enricher is not None:
+            # A single collector, so arriving jobs fill one batch instead of one per worker
+            enrich_workers = [asyncio.ensure_future(self._batch_collector())]
+        else:
+            enrich_workers = [asyncio.ensure_future(self._stage_worker(self.enrich_queue, self._enrich_stage, self.persist_queue))
+                              for _ in range(self.enrichment_concurrency)]
+        self.workers = (
+            [asyncio.ensure_future(self._stage_worker(self.detail_queue, self._detail_stage, self.enrich_queue))
+             for _ in range(self.detail_concurrency)]
+            + enrich_workers
+            + [asyncio.ensure_future(self._stage_worker(self.persist_queue, self._persist_stage, None))]
+        )
+
+    async def _drain_and_stop(self):
+        for stage_queue in (self.detail_queue, self.enrich_queue, self.persist_queue):
+            await stage_queue.join()
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        close_fetcher = getattr(self.detail_fetcher, 'close', None)
+        if close_fetcher is not None:
+            await close_fetcher()
+
+    async def _stage_worker(self, in_queue, handler, out_queue):
+        """Pull items from in_queue, process them and pass them downstream"""
+        while True:
+            item = await in_queue.get()
+            try:
+                try:
+                    passed_on = await handler(item)
+                except Exception as e:
+                    print(f"❌ Pipeline stage error for {item['job_data'].get('title', 'Unknown')}: {e}")
+                    item['batch'].discard()
+                    passed_on = False
+
+                if passed_on and out_queue is not None:
+                    await out_queue.put(item)
+            finally:
+                in_queue.task_done()
+
+    async def _detail_stage(self, item):
+        """Visit the job details page and attach its content"""
+        job_data = item['job_data']
+        job_details_info = 'N/A'
+        apply_link = job_data.get('apply_link')
+
+        if job_data.get('job_details_info', 'N/A') != 'N/A':
+            # The listing source (e.g. an ATS API) already delivered the full description
+            return True
+        if apply_link and apply_link != 'N/A':
+            try:
+                job_details_info = await self.detail_fetcher(apply_link, item['config'])
+            except Exception as e:
+                print(f"Error scraping job details with crawl4ai for {apply_link}: {e}")
+                item['batch'].record_error('crawl4ai_errors')
+                job_details_info = 'N/A'
+
+        job_data['job_details_info'] = job_details_info
+        return True
+
+    async def _enrich_stage(self, item):
+        """Run the (blocking) enricher in the thread pool"""
+        job, error = await self.loop.run_in_executor(self.executor, self.enricher, item['job_data'], item['config'])
+        if error:
+            item['batch'].record_error('gemini_processing_errors')
+        item['job'] = job
+        return True
+
+    async def _enrich_single(self, item):
+        """(job, error) for one job through the single-job enricher, which builds its own fallback job"""
+        try:
+            return await self.loop.run_in_executor(self.executor, self.enricher, item['job_data'], item['config'])
+        except Exception as e:
+            error = f"Enrichment failed: {e}"
+            return dict(item['job_data'], gemini_error=error), error
+
+    async def _batch_collector(self):
+        """
+        Fill batches from the enrich queue and hand each one to a free
+        enrichment slot. A slot is taken before collecting starts, so while
+        every slot is busy the queue keeps filling and the next batch leaves full.
+        """
+        while True:
+            await self.batch_slots.acquire()
+            try:
+                items = [await self.enrich_queue.get()]
+            except asyncio.CancelledError:
+                self.batch_slots.release()
+                raise
+            deadline = self.loop.time() + self.batch_linger
+            while len(items) < self.enrichment_batch_size:
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self.enrich_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            task = asyncio.ensure_future(self._enrich_batch(items))
+            self.batch_tasks.add(task)
+            task.add_done_callback(self.batch_tasks.discard)
+
+    async def _enrich_batch(self, items):
+        """Enrich one batch in a single call and pass its jobs downstream"""
+        try:
+            try:
+                results = await self.loop.run_in_executor(
+                    self.executor, self.batch_enricher, [(item['job_data'], item['config']) for item in items])
+                results = list(results or [])
+            except Exception as e:
+                print(f"❌ Pipeline batch enrichment error for {len(items)} jobs, enriching them one by one: {e}")
+                results = []
+
+            if len(results) != len(items):
+                # Never let a short answer drop jobs: their batch would wait for them forever
+                if results:
+                    print(f"⚠️ Batch enricher returned {len(results)} results for {len(items)} jobs, "
+                          f"enriching the missing jobs one by one")
+                results = results[:len(items)]
+                for item in items[len(results):]:
+                    results.append(await self._enrich_single(item))
+
+            for item, (job, error) in zip(items, results):
+                if error:
+                    item['batch'].record_error('gemini_processing_errors')
+                item['job'] = job
+                await self.persist_queue.put(item)
+        finally:
+            for _ in items:
+                self.enrich_queue.task_done()
+            self.batch_slots.release()
+
+    async def _persist_stage(self, item):
+        """Hand the finished job back to its batch"""
+        batch = item['batch']
+        if batch.on_job:
+            try:
+                await self.loop.run_in_executor(self.persist_executor, batch.on_job, item['job'], item['page_number'])
+            except Exception as e:
+                print(f"⚠️ Failed to persist job {item['job'].get('title', 'Unknown')}: {e}")
+        batch.complete(item['sequence'], item['job'])
+        return True
+
+
+def run_self_test(jobs=48, batch_size=8, concurrency=4):
+    """
+    Jobs that trickle in one at a time should still leave in full batches,
+    and a failing batch enricher must not lose jobs
+    """
+    async def fetch_details(url, config):
+        await asyncio.sleep(0.04)
+        return f"Details of {url}"
+
+    def enrich(job_data, config):
+        return dict(job_data, enriched='single'), None
+
+    batch_sizes = []
+
+    def enrich_batch(items):
+        batch_sizes.append(len(items))
+        time.sleep(0.05)
+        return [(dict(job_data, enriched='batch'), None) for job_data, _ in items]
+
+    def failing_enrich_batch(items):
+        raise RuntimeError("batch request failed")
+
+    failures = 0
+    for name, batch_enricher in (('batched', enrich_batch), ('failing batch', failing_enrich_batch)):
+        pipeline = JobPipeline(fetch_details, enrich, detail_concurrency=1, enrichment_concurrency=concurrency,
+                               batch_enricher=batch_enricher, enrichment_batch_size=batch_size, batch_linger=0.5)
+        pipeline.start()
+        batch = pipeline.open_batch(name)
+        for number in range(jobs):
+            batch.submit({'title': f"Job {number}", 'apply_link': f"https://example.com/jobs/{number}"}, {})
+        finished, _ = batch.wait()
+        pipeline.close()
+
+        kept = [job['title'] for job in finished] == [f"Job {number}" for number in range(jobs)]
+        print(f"{'✅' if kept else '❌'} {name}: {len(finished)}/{jobs} jobs came out, in order")
+        failures += not kept
+    mean = sum(batch_sizes) / len(batch_sizes) if batch_sizes else 0
+    full = mean >= batch_size * 0.75
+    print(f"{'✅' if full else '❌'} batch sizes {batch_sizes} (mean {mean:.1f}, limit {batch_size})")
+    failures += not full
+    return failures
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ['--self-test']:
+        sys.exit(1 if run_self_test() else 0)
+    print("usage: python job_pipeline.py --self-test")
@@ -0,0 +1,444 @@
+"""
+Local Field Extractor
+Deterministic, rule-based extraction of the enrichment fields before Gemini is asked
+
+Many of the fields in the Gemini prompt can be read straight from the job
+card and the detail page: the employment type and workplace ("Full time",
+"Hybrid"), experience ranges ("10-12 years", already matched by
+parse_metadata), the job id in the apply URL, salary ranges, deadlines,
+and the bullet lists under "Responsibilities" / "Requirements" headings.
+extract_local_fields() runs precompiled rules over the cleaned payload. It
+returns a value and a confidence in [0, 1] for every field Gemini would
+produce.
+
+Fields at or above the confidence threshold are taken as they are. Gemini
+is asked only for the rest, and is skipped entirely when nothing is left
+("local only"). A missing value can be confident too: a page with no
+currency amount and no pay wording has no salary, whoever reads it.
+"""
+
+import re
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import urlparse, parse_qs
+
+from detail_trimmer import split_sections
+
+DEFAULT_MIN_CONFIDENCE = 0.8   # Fields below this are left to the LLM
+
+# Every field the Gemini prompt asks for (see GEMINI_INSTRUCTIONS)
+LLM_FIELDS = [
+    'title', 'company', 'location', 'posted_date', 'apply_link', 'experience', 'job_id', 'department',
+    'employment_type', 'experience_level', 'remote_work', 'salary', 'deadline', 'description',
+    'requirements', 'preferred_qualifications', 'responsibilities', 'benefits', 'skills', 'tags'
+]
+
+EMPLOYMENT_TYPES = [
+    ('Internship', re.compile(r"\bintern(?:ship)?\b", re.IGNORECASE)),
+    ('Part-time', re.compile(r"\bpart[\s\-]?time\b", re.IGNORECASE)),
+    ('Contract', re.compile(r"\bcontract(?:or|ual)?\b|\bfixed[\s\-]term\b", re.IGNORECASE)),
+    ('Temporary', re.compile(r"\btemporary\b|\bseasonal\b", re.IGNORECASE)),
+    ('Full-time', re.compile(r"\bfull[\s\-]?time\b|\bpermanent\b", re.IGNORECASE)),
+]
+WORK_MODES = [
+    ('Hybrid', re.compile(r"\bhybrid\b", re.IGNORECASE)),
+    ('Remote', re.compile(r"\b(?:fully |100% )?remote\b|\bwork from home\b|\bwfh\b|\btelecommut", re.IGNORECASE)),
+    ('On-site', re.compile(r"\bon[\s\-]?site\b|\bin[\s\-]office\b|\bwork from office\b|\bin[\s\-]person\b", re.IGNORECASE)),
+]
+NOT_REMOTE_PATTERN = re.compile(r"\b(?:not|no|non)[\s\-](?:a )?remote\b|\bremote work is not\b", re.IGNORECASE)
+LABEL_PATTERN = r"(?:^|\n|\|)\s*(?:\*\*)?{label}(?:\*\*)?\s*[:\-]\s*(?:\*\*)?\s*([^\n|]{{1,80}})"
+EMPLOYMENT_LABEL = re.compile(LABEL_PATTERN.format(label=r"(?:employment|job|position|worker|time)\s*type"), re.IGNORECASE)
+WORKPLACE_LABEL = re.compile(LABEL_PATTERN.format(label=r"(?:workplace|work|location)\s*(?:type|mode|model|arrangement)"), re.IGNORECASE)
+DEPARTMENT_LABEL = re.compile(LABEL_PATTERN.format(label=r"(?:department|team|job (?:category|family|function)|business unit|function)"), re.IGNORECASE)
+JOB_ID_LABEL = re.compile(LABEL_PATTERN.format(label=r"(?:job|req(?:uisition)?|posting|reference|ref)\.?\s*(?:id|no\.?|number|#)"), re.IGNORECASE)
+
+EXPERIENCE_RANGE = re.compile(r"\b(\d{1,2})\s*(?:-|–|to)\s*(\d{1,2})\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+EXPERIENCE_MIN = re.compile(r"\b(?:minimum of |at least |min\.? )?(\d{1,2})\s*\+?\s*(?:years?|yrs?)(?:['’]s?)?\s+(?:of\s+)?(?:\w+\s+){0,4}?experience\b", re.IGNORECASE)
+LEVEL_KEYWORDS = [
+    ('Intern', re.compile(r"\bintern(?:ship)?\b|\btrainee\b", re.IGNORECASE)),
+    ('Executive', re.compile(r"\b(?:vice president|vp|chief|head of|cto|cfo|ceo)\b", re.IGNORECASE)),
+    ('Director', re.compile(r"\bdirector\b", re.IGNORECASE)),
+    ('Manager', re.compile(r"\bmanager\b", re.IGNORECASE)),
+    ('Lead', re.compile(r"\b(?:lead|principal|staff)\b", re.IGNORECASE)),
+    ('Senior', re.compile(r"\b(?:senior|sr\.?|iii|iv)\b", re.IGNORECASE)),
+    ('Entry', re.compile(r"\b(?:junior|jr\.?|entry[\s\-]level|graduate|fresher|associate|new grad|i)\b", re.IGNORECASE)),
+    ('Mid', re.compile(r"\b(?:mid[\s\-]level|intermediate|ii)\b", re.IGNORECASE)),
+]
+
+CURRENCY = r"(?:[$€£₹¥]|\b(?:usd|eur|gbp|inr|cad|aud|sgd|rs\.?))"
+AMOUNT = r"\d{1,3}(?:[,.\s]\d{3})*(?:\.\d+)?\s*[kKmM]?"
+SALARY_PATTERNS = [
+    re.compile(rf"{CURRENCY}\s?{AMOUNT}(?:\s*(?:-|–|to)\s*{CURRENCY}?\s?{AMOUNT})?"
+               rf"(?:\s*(?:per|/|a)\s*(?:year|annum|yr|hour|hr|month|mo))?", re.IGNORECASE),
+    re.compile(r"\b\d+(?:\.\d+)?\s*(?:-|–|to)\s*\d+(?:\.\d+)?\s*(?:lpa|lakhs?(?: per annum)?|crores?)\b", re.IGNORECASE),
+]
+PAY_WORDING = re.compile(r"\bsalary\b|\bcompensation\b|\bpay (?:range|rate|scale)\b|\bctc\b|\bper annum\b|\bhourly rate\b", re.IGNORECASE)
+DEADLINE_PATTERN = re.compile(
+    r"(?:apply by|application deadline|deadline|closing date|applications? close[sd]?(?: on)?|last date(?: to apply)?|"
+    r"posting end date|job posting end date)\s*[:\-]?\s*([A-Za-z0-9,/\-. ]{6,30})", re.IGNORECASE)
+DEADLINE_WORDING = re.compile(r"\bdeadline\b|\bclosing date\b|\bapply by\b|\blast date\b|\bposting end date\b", re.IGNORECASE)
+POSTED_PATTERN = re.compile(r"\bposted(?: on)?\s*[:\-]?\s*([A-Za-z0-9,/\-. ]{6,30})", re.IGNORECASE)
+RELATIVE_DATE = re.compile(r"\b(\d+)\+?\s*(day|hour|week|month)s?\s+ago\b|\b(today|yesterday|just posted)\b", re.IGNORECASE)
+DATE_IN_TEXT = re.compile(r"\d{1,2}/\d{1,2}/\d{2,4}|\d{4}[-/]\d{2}[-/]\d{2}|\d{1,2}[-.]\d{1,2}[-.]\d{4}|"
+                          r"[A-Za-z]{3,9}\.? \d{1,2},? \d{4}|\d{1,2} [A-Za-z]{3,9},? \d{4}")
+DATE_FORMATS = ['%m/%d/%Y', '%m/%d/%y', '%Y-%m-%d', '%Y/%m/%d', '%d-%m-%Y', '%d.%m.%Y',
+                '%b %d %Y', '%B %d %Y', '%d %b %Y', '%d %B %Y']
+
+URL_JOB_ID_PATTERNS = [
+    re.compile(r"[_/\-](R-?\d{4,}(?:-\d+)?)(?:[/?#_\-]|$)", re.IGNORECASE),      # Workday requisitions
+    re.compile(r"[_/\-](JR-?\d{4,})(?:[/?#_\-]|$)", re.IGNORECASE),
+    re.compile(r"/jobs?/(?:[a-z\-]+/)?(\d{5,})(?:[/?#\-]|$)", re.IGNORECASE),
+    re.compile(r"/(?:job|position|requisition)s?/([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})", re.IGNORECASE),
+]
+URL_JOB_ID_PARAMS = ['jobid', 'job_id', 'gh_jid', 'jid', 'reqid', 'req_id', 'requisitionid', 'pid', 'id']
+
+BULLET_PATTERN = re.compile(r"^\s*(?:[-*•·▪●◦]|\d{1,2}[.)])\s+(.+)$")
+# Checked in order, so "Compensation and Benefits" is benefits and "Preferred Qualifications" is not requirements
+LIST_HEADINGS = {
+    'benefits': re.compile(r"benefit|perks|what we offer|why join|why work", re.IGNORECASE),
+    'preferred_qualifications': re.compile(r"preferred|nice to have|bonus|desired|good to have|\bplus\b", re.IGNORECASE),
+    'requirements': re.compile(r"requirement|qualification|must have|what you(?:'ll)? need|what we(?:'re| are) looking for|"
+                               r"you have|you bring|skills and experience|who you are|minimum|basic", re.IGNORECASE),
+    'responsibilities': re.compile(r"responsibilit|what you(?:'ll| will) do|your role|duties|day to day|"
+                                   r"key tasks|what you'll be doing", re.IGNORECASE),
+}
+SUMMARY_HEADING = re.compile(r"about the (?:job|role|position|opportunity)|overview|summary|description|introduction", re.IGNORECASE)
+
+SKILL_TERMS = [
+    'Python', 'Java', 'JavaScript', 'TypeScript', 'C++', 'C#', 'Golang', 'Rust', 'Scala', 'Kotlin', 'Swift',
+    'Ruby', 'PHP', 'Perl', 'MATLAB', 'SQL', 'NoSQL', 'PostgreSQL', 'MySQL', 'Oracle', 'MongoDB', 'Redis',
+    'Cassandra', 'Elasticsearch', 'Snowflake', 'BigQuery', 'Databricks', 'Spark', 'Hadoop', 'Kafka', 'Airflow',
+    'AWS', 'Azure', 'GCP', 'Google Cloud', 'Docker', 'Kubernetes', 'Terraform', 'Ansible', 'Jenkins', 'CI/CD',
+    'Git', 'Linux', 'Unix', 'Bash', 'REST', 'GraphQL', 'gRPC', 'Microservices', 'React', 'Angular', 'Vue',
+    'Node.js', 'Django', 'Flask', 'FastAPI', 'Spring Boot', '.NET', 'HTML', 'CSS', 'TensorFlow',
+    'PyTorch', 'scikit-learn', 'Pandas', 'NumPy', 'Machine Learning', 'Deep Learning', 'NLP', 'Computer Vision',
+    'LLM', 'Generative AI', 'Data Analysis', 'Data Modeling', 'ETL', 'Tableau', 'Power BI', 'Looker',
+    'SAP', 'SAP ABAP', 'Salesforce', 'ServiceNow', 'Jira', 'Agile', 'Scrum', 'Selenium', 'Cypress', 'Embedded C',
+    'RTOS', 'FPGA', 'Verilog', 'VHDL', 'Android', 'iOS', 'Figma', 'Networking', 'TCP/IP', 'Cybersecurity',
+]
+# Short or ambiguous terms only count with their exact capitalization
+CASE_SENSITIVE_SKILLS = {'Swift', 'Oracle', 'REST', 'Git', 'NLP', 'LLM', 'SAP', 'iOS'}
+SKILL_PATTERNS = [
+    (term, re.compile(r"(?<![\w.+#])" + re.escape(term) + r"(?![\w+#])", 0 if term in CASE_SENSITIVE_SKILLS else re.IGNORECASE))
+    for term in SKILL_TERMS
+]
+CATEGORY_TAGS = [
+    ('Software Development', re.compile(r"software|developer|engineer|programm", re.IGNORECASE)),
+    ('Data & Analytics', re.compile(r"\bdata\b|analyst|analytics|scientist|\bml\b|\bai\b|machine learning", re.IGNORECASE)),
+    ('DevOps & Infrastructure', re.compile(r"devops|infrastructure|cloud|\bsre\b|platform", re.IGNORECASE)),
+    ('Product & Design', re.compile(r"product|design|\bux\b|\bui\b", re.IGNORECASE)),
+    ('Sales & Marketing', re.compile(r"sales|marketing|business development", re.IGNORECASE)),
+    ('Operations', re.compile(r"operations|support|customer", re.IGNORECASE)),
+]
+
+
+class LocalExtraction:
+    """Values and confidences of one job's locally extracted fields"""
+
+    def __init__(self):
+        self.values = {}
+        self.confidence = {}
+
+    def set(self, field, value, confidence):
+        self.values[field] = value
+        self.confidence[field] = confidence
+
+    def confident_fields(self, min_confidence=DEFAULT_MIN_CONFIDENCE):
+        return {field: self.values[field] for field in LLM_FIELDS
+                if self.confidence.get(field, 0) >= min_confidence}
+
+    def missing_fields(self, min_confidence=DEFAULT_MIN_CONFIDENCE):
+        """Fields the LLM still has to provide"""
+        return [field for field in LLM_FIELDS if self.confidence.get(field, 0) < min_confidence]
+
+
+def present(value):
+    return value not in (None, '', 'N/A', [])
+
+
+def parse_date(text, reference=None):
+    """Normalize a date (absolute or 'N days ago') to MM/DD/YYYY, or None"""
+    if not text:
+        return None
+    text = ' '.join(str(text).replace('Posted', '').split()).strip(' .,:-')
+    relative = RELATIVE_DATE.search(text)
+    if relative:
+        reference = reference or datetime.now()
+        if relative.group(3):
+            days = 1 if relative.group(3).lower() == 'yesterday' else 0
+            return (reference - timedelta(days=days)).strftime('%m/%d/%Y')
+        amount, unit = int(relative.group(1)), relative.group(2).lower()
+        delta = {'hour': timedelta(hours=amount), 'day': timedelta(days=amount),
+                 'week': timedelta(weeks=amount), 'month': timedelta(days=30 * amount)}[unit]
+        return (reference - delta).strftime('%m/%d/%Y')
+    match = DATE_IN_TEXT.search(text)
+    if not match:
+        return None
+    candidate = match.group(0).replace(',', '').replace('.', ' ' if ' ' in match.group(0) else '.').replace('Sept', 'Sep')
+    candidate = ' '.join(candidate.split())
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(candidate, date_format).strftime('%m/%d/%Y')
+        except ValueError:
+            continue
+    return None
+
+
+def first_label(pattern, *texts):
+    for text in texts:
+        match = pattern.search(text or '')
+        if match:
+            return match.group(1).strip(' *|.')
+    return None
+
+
+def classify(options, text):
+    """Names of the options whose pattern occurs in text"""
+    return [name for name, pattern in options if pattern.search(text or '')]
+
+
+def extract_employment_type(card_text, details):
+    label = first_label(EMPLOYMENT_LABEL, card_text, details)
+    if label:
+        found = classify(EMPLOYMENT_TYPES, label)
+        if found:
+            return found[0], 0.95
+    found = classify(EMPLOYMENT_TYPES, card_text)
+    if len(found) == 1:
+        return found[0], 0.9
+    found_details = classify(EMPLOYMENT_TYPES, details)
+    if len(found_details) == 1:
+        return found_details[0], 0.8
+    if found or found_details:
+        return (found or found_details)[0], 0.5
+    return None, 0.5
+
+
+def extract_remote_work(card_text, details, location):
+    label = first_label(WORKPLACE_LABEL, card_text, details)
+    if label:
+        found = classify(WORK_MODES, label)
+        if found:
+            return found[0], 0.95
+    found = classify(WORK_MODES, card_text)
+    if len(found) == 1:
+        return found[0], 0.9
+    if NOT_REMOTE_PATTERN.search(details):
+        return 'On-site', 0.8
+    found_details = classify(WORK_MODES, details)
+    if len(found_details) == 1:
+        return found_details[0], 0.8 if found_details[0] == 'Hybrid' else 0.75
+    if found_details:
+        # Several modes mentioned ("remote teams", "hybrid cloud"): leave it to the LLM
+        return found_details[0], 0.6
+    if location and details:
+        # A concrete location and no word about remote or hybrid work anywhere
+        return 'On-site', 0.8
+    return None, 0.5
+
+
+def extract_experience(job_data, text):
+    if present(job_data.get('experience')):
+        return job_data['experience'], 1.0
+    match = EXPERIENCE_RANGE.search(text)
+    if match:
+        return f"{match.group(1)}-{match.group(2)} years", 0.9
+    match = EXPERIENCE_MIN.search(text)
+    if match:
+        return f"{match.group(1)}+ years", 0.85
+    return None, 0.6
+
+
+def extract_experience_level(title, experience):
+    found = classify(LEVEL_KEYWORDS, title)
+    if found:
+        return found[0], 0.9
+    years = re.match(r"(\d+)", experience or '')
+    if years:
+        years = int(years.group(1))
+        return ('Entry' if years < 2 else 'Mid' if years < 5 else 'Senior'), 0.8
+    return None, 0.5
+
+
+def extract_job_id(job_data, apply_link, card_text, details):
+    if present(job_data.get('job_id')):
+        return str(job_data['job_id']), 1.0
+    label = first_label(JOB_ID_LABEL, card_text, details)
+    if label and re.fullmatch(r"[A-Za-z0-9_\-#./]{2,40}", label.split()[0]):
+        return label.split()[0].lstrip('#'), 0.9
+    if apply_link and apply_link != 'N/A':
+        params = {key.lower(): values for key, values in parse_qs(urlparse(apply_link).query).items()}
+        for name in URL_JOB_ID_PARAMS:
+            if params.get(name) and re.fullmatch(r"[A-Za-z0-9_\-]{3,40}", params[name][0]):
+                return params[name][0], 0.85 if name != 'id' else 0.8
+        for pattern in URL_JOB_ID_PATTERNS:
+            match = pattern.search(apply_link)
+            if match:
+                return match.group(1), 0.9
+    return None, 0.7
+
+
+def extract_department(job_data, card_text, details):
+    if present(job_data.get('department')):
+        return job_data['department'], 1.0
+    label = first_label(DEPARTMENT_LABEL, card_text, details)
+    if label:
+        return label, 0.85
+    return None, 0.8
+
+
+def extract_salary(job_data, text):
+    if present(job_data.get('salary')):
+        return job_data['salary'], 1.0
+    for pattern in SALARY_PATTERNS:
+        match = pattern.search(text)
+        if match and re.search(r"\d{2}", match.group(0)):
+            return ' '.join(match.group(0).split()), 0.9
+    # No amount: only confident that there is no salary if nothing talks about pay either
+    return None, 0.4 if PAY_WORDING.search(text) else 0.85
+
+
+def extract_deadline(job_data, text):
+    if present(job_data.get('deadline')):
+        return job_data['deadline'], 1.0
+    match = DEADLINE_PATTERN.search(text)
+    if match:
+        parsed = parse_date(match.group(1))
+        if parsed:
+            return parsed, 0.9
+    return None, 0.4 if DEADLINE_WORDING.search(text) else 0.85
+
+
+def extract_posted_date(job_data, details):
+    posted = job_data.get('posted_date')
+    if present(posted):
+        parsed = parse_date(posted)
+        return (parsed, 0.95) if parsed else (posted, 0.8)
+    match = POSTED_PATTERN.search(details)
+    if match:
+        parsed = parse_date(match.group(1))
+        if parsed:
+            return parsed, 0.85
+    return None, 0.8
+
+
+def extract_lists(details):
+    """Bullet lists under recognized headings, by field"""
+    lists = {field: [] for field in LIST_HEADINGS}
+    summary = []
+    for heading, body in split_sections(details or ''):
+        field = None
+        if heading and not SUMMARY_HEADING.search(heading):
+            field = next((name for name, pattern in LIST_HEADINGS.items() if pattern.search(heading)), None)
+        bullets = [BULLET_PATTERN.match(line).group(1).strip() for line in body if BULLET_PATTERN.match(line)]
+        if field:
+            lists[field].extend(bullets)
+        elif not summary and (not heading or SUMMARY_HEADING.search(heading)):
+            summary = [line.strip() for line in body if not BULLET_PATTERN.match(line)]
+    return lists, ' '.join(summary)
+
+
+def extract_description(job_data, summary_text):
+    description = job_data.get('description')
+    text = description if present(description) else summary_text
+    text = ' '.join((text or '').split())
+    if len(text) > 600:
+        # Cut at the last sentence end within the limit
+        cut = text[:600]
+        end = max(cut.rfind('. '), cut.rfind('! '), cut.rfind('? '))
+        text = cut[:end + 1] if end > 200 else cut.rstrip() + '...'
+    return (text, 0.8) if len(text) >= 80 else (text or None, 0.4)
+
+
+def extract_skills(job_data, text):
+    skills = []
+    if present(job_data.get('skills')):
+        metadata_skills = job_data['skills']
+        skills.extend(metadata_skills if isinstance(metadata_skills, list) else
+                      [skill.strip() for skill in str(metadata_skills).split(',') if skill.strip()])
+    for term, pattern in SKILL_PATTERNS:
+        if pattern.search(text) and term not in skills:
+            skills.append(term)
+    if len(skills) >= 3:
+        return skills, 0.85
+    return skills, 0.7 if skills else 0.4
+
+
+def build_tags(title, values):
+    tags = [name for name, pattern in CATEGORY_TAGS if pattern.search(title or '')][:1]
+    tags.extend(value for value in (values.get('employment_type'), values.get('remote_work'),
+                                    values.get('experience_level')) if value)
+    return tags
+
+
+def extract_local_fields(job_data, cleaned_job_data):
+    """
+    Run every rule over the card fields and the (trimmed) job details.
+    Returns a LocalExtraction with a value and a confidence per LLM field.
+    """
+    extraction = LocalExtraction()
+    details = cleaned_job_data.get('job_details_info') or ''
+    details = '' if details == 'N/A' else details
+    title = cleaned_job_data.get('title') or ''
+    card_text = ' | '.join(str(job_data.get(field)) for field in ('title', 'location', 'metadata_raw', 'description')
+                           if present(job_data.get(field)))
+    text = f"{card_text}\n{details}"
+
+    for field in ('title', 'company', 'location', 'apply_link'):
+        value = cleaned_job_data.get(field)
+        extraction.set(field, value if present(value) else None, 1.0 if present(value) else 0.5)
+    extraction.set('posted_date', *extract_posted_date(job_data, details))
+    extraction.set('employment_type', *extract_employment_type(card_text, details))
+    extraction.set('remote_work', *extract_remote_work(card_text, details, extraction.values['location']))
+    extraction.set('experience', *extract_experience(job_data, text))
+    extraction.set('experience_level', *extract_experience_level(title, extraction.values['experience']))
+    extraction.set('job_id', *extract_job_id(job_data, cleaned_job_data.get('apply_link'), card_text, details))
+    extraction.set('department', *extract_department(job_data, card_text, details))
+    extraction.set('salary', *extract_salary(job_data, text))
+    extraction.set('deadline', *extract_deadline(job_data, text))
+
+    lists, summary_text = extract_lists(details)
+    extraction.set('description', *extract_description(job_data, summary_text))
+    for field, items in lists.items():
+        if len(items) >= 2:
+            extraction.set(field, items, 0.9)
+        elif field in ('requirements', 'responsibilities'):
+            # Nearly every posting has these; without a headed list they are in prose only the LLM can split
+            extraction.set(field, items, 0.3)
+        else:
+            extraction.set(field, items, 0.8 if details else 0.5)
+    extraction.set('skills', *extract_skills(job_data, text))
+
+    tags = build_tags(title, extraction.values)
+    extraction.set('tags', tags, 0.8 if tags else 0.4)
+    return extraction
+
+
+class LocalExtractionStats:
+    """Thread-safe counters of how much enrichment the local rules covered"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.jobs = 0
+        self.local_only = 0
+        self.fields_local = 0
+        self.fields_requested = 0
+
+    def record(self, missing_count):
+        with self.lock:
+            self.jobs += 1
+            if not missing_count:
+                self.local_only += 1
+            self.fields_local += len(LLM_FIELDS) - missing_count
+            self.fields_requested += missing_count
+
+    def summary(self):
+        with self.lock:
+            share = self.local_only / self.jobs if self.jobs else 0.0
+            total_fields = self.fields_local + self.fields_requested
+            field_share = self.fields_local / total_fields if total_fields else 0.0
+            return (f"{self.local_only}/{self.jobs} jobs without any LLM call ({share:.0%}), "
+                    f"{field_share:.0%} of fields extracted locally")
+
+
+EXTRACTION_STATS = LocalExtractionStats()
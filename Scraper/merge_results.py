@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Shard Result Merger for Final_Scraper
+Combine per-shard multi_company_results_*.json files into one session file
+
+Usage:
+    python merge_results.py multi_company_results_*_shard*.json
+    python merge_results.py shard0.json shard1.json -o merged.json
+    python merge_results.py multi_company_results_*_shard*.jsonl.gz
+"""
+
+import json
+import glob
+from datetime import datetime
+
+from result_sink import is_jsonl_results_file, load_results_document
+
+# session_statistics key -> per-company statistics key it sums (see build_session_statistics)
+SESSION_STAT_SOURCES = {
+    'total_job_cards_found': 'total_job_cards_found',
+    'total_skipped_duplicates': 'skipped_duplicates',
+    'total_skipped_extraction_errors': 'skipped_extraction_errors',
+    'total_successful_extractions': 'successful_extractions',
+    'total_gemini_processing_errors': 'gemini_processing_errors',
+    'total_crawl4ai_errors': 'crawl4ai_errors'
+}
+
+
+def load_shard(filename):
+    """Load one shard results file (JSON document or streamed JSONL)"""
+    if is_jsonl_results_file(filename):
+        return load_results_document(filename)
+    with open(filename, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def company_session_statistics(companies):
+    """Session totals rebuilt from the per-company statistics of the kept company entries"""
+    session_statistics = {key: 0 for key in SESSION_STAT_SOURCES}
+    session_statistics['companies_with_browser_errors'] = 0
+    for company_data in companies.values():
+        stats = company_data.get('statistics') or {}
+        for key, company_key in SESSION_STAT_SOURCES.items():
+            session_statistics[key] += stats.get(company_key, 0)
+        if stats.get('browser_closed_early'):
+            session_statistics['companies_with_browser_errors'] += 1
+    return session_statistics
+
+
+def merge_shard_results(shards):
+    """
+    Merge loaded shard documents into one session document.
+
+    Company entries are carried over unchanged; the session block is rebuilt
+    from them so the totals are correct even if shards overlap or one of them
+    only finished partially.
+    """
+    companies = {}
+    start_times, end_times, source_sessions = [], [], []
+
+    for shard in shards:
+        session = shard.get('scraping_session', {})
+        if session.get('start_time'):
+            start_times.append(datetime.fromisoformat(session['start_time']))
+        if session.get('end_time'):
+            end_times.append(datetime.fromisoformat(session['end_time']))
+        if session.get('session_id'):
+            source_sessions.append(session['session_id'])
+
+        for company_name, company_data in shard.get('companies', {}).items():
+            if company_name in companies:
+                print(f"⚠️ {company_name} appears in more than one shard, keeping the later result")
+            companies[company_name] = company_data
+
+    start_time = min(start_times) if start_times else datetime.now()
+    end_time = max(end_times) if end_times else datetime.now()
+
+    return {
+        "scraping_session": {
+            "start_time": start_time.isoformat(),
+            "session_id": f"session_{start_time.strftime('%Y%m%d_%H%M%S')}_merged",
+            "status": "completed",
+            "total_companies": len(companies),
+            "completed_companies": len([c for c in companies.values() if c.get("status") in ["success", "partial_success"]]),
+            "successful_companies": len([c for c in companies.values() if c.get("status") == "success"]),
+            "total_jobs_scraped": sum(c.get("pagination_info", {}).get("total_jobs_found", len(c.get("jobs", []))) for c in companies.values()),
+            "end_time": end_time.isoformat(),
+            "total_duration_seconds": (end_time - start_time).total_seconds(),
+            "session_statistics": company_session_statistics(companies),
+            "merged_from": source_sessions
+        },
+        "companies": companies
+    }
+
+
+def merge_result_files(filenames, output_filename=None):
+    """Merge shard result files and write the combined session file"""
+    shards = [load_shard(filename) for filename in filenames]
+    merged = merge_shard_results(shards)
+
+    if not output_filename:
+        start_time = datetime.fromisoformat(merged['scraping_session']['start_time'])
+        output_filename = f"multi_company_results_{start_time.strftime('%Y%m%d_%H%M%S')}.json"
+
+    with open(output_filename, 'w', encoding='utf-8') as f:
+        json.dump(merged, f, indent=2, ensure_ascii=False)
+
+    session = merged['scraping_session']
+    print(f"✅ Merged {len(filenames)} shard files into: {output_filename}")
+    print(f"   Companies: {session['total_companies']}")
+    print(f"   Jobs: {session['total_jobs_scraped']}")
+    return output_filename
+
+
+def main():
+    """Main function with command line interface"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Merge sharded Final_Scraper results')
+    parser.add_argument('files', nargs='+', help='Shard result files (glob patterns allowed)')
+    parser.add_argument('-o', '--output', help='Merged output file (default: multi_company_results_<start>.json)')
+
+    args = parser.parse_args()
+
+    filenames = []
+    for pattern in args.files:
+        filenames.extend(sorted(glob.glob(pattern)) or [pattern])
+
+    merge_result_files(filenames, args.output)
+
+
+if __name__ == "__main__":
+    main()
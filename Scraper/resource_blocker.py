@@ -0,0 +1,153 @@
+"""
+Resource Blocking
+Request interception that keeps career pages from downloading what we never read
+
+Listing navigation only needs the DOM. Hero images, video, web fonts and
+analytics/ad scripts cost bandwidth and page-load time, so every browser
+context the scrapers create gets a page route that aborts them.
+
+Policy = global default (GLOBAL_CONFIG['resource_blocking']) overlaid with a
+per-company "resource_blocking" entry in the selectors file:
+
+    "resource_blocking": false                             # disable for this company
+    "resource_blocking": {"allow_types": ["image"],        # resource types to let through
+                          "allow_domains": ["cdn.example.com"],
+                          "block_types": ["stylesheet"],   # extra types to block
+                          "block_domains": ["widgets.example.com"]}
+
+Counters are kept per process. Aborted requests never transfer, so "bytes
+saved" is an estimate from typical sizes per resource type.
+"""
+
+import threading
+from urllib.parse import urlparse
+
+DEFAULT_BLOCKED_TYPES = ('image', 'media', 'font')
+DEFAULT_BLOCKED_DOMAINS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'googleadservices.com', 'connect.facebook.net', 'hotjar.com', 'clarity.ms', 'bat.bing.com',
+    'snap.licdn.com', 'px.ads.linkedin.com', 'segment.io', 'cdn.segment.com', 'fullstory.com',
+    'mouseflow.com', 'crazyegg.com', 'quantserve.com', 'scorecardresearch.com', 'demdex.net',
+    'omtrdc.net', 'adsrvr.org', 'criteo.com', 'taboola.com', 'nr-data.net', 'optimizely.com',
+)
+# Typical transfer sizes used to estimate the bytes a blocked request would have cost
+ESTIMATED_BYTES = {'image': 60000, 'media': 500000, 'font': 40000, 'script': 30000, 'stylesheet': 20000}
+DEFAULT_ESTIMATED_BYTES = 15000
+
+
+class ResourceBlockingPolicy:
+    """Decides which requests of a page are aborted"""
+
+    def __init__(self, blocked_types=DEFAULT_BLOCKED_TYPES, blocked_domains=DEFAULT_BLOCKED_DOMAINS,
+                 allow_types=(), allow_domains=(), enabled=True):
+        self.enabled = enabled
+        self.blocked_types = set(blocked_types) - set(allow_types)
+        self.blocked_domains = tuple(domain.lower() for domain in blocked_domains)
+        self.allow_domains = tuple(domain.lower() for domain in allow_domains)
+
+    @classmethod
+    def from_config(cls, global_setting=True, company_setting=None):
+        """Combine the global default with a company's "resource_blocking" entry"""
+        if global_setting is False or company_setting is False:
+            return cls(enabled=False)
+
+        settings = dict(global_setting) if isinstance(global_setting, dict) else {}
+        company = company_setting if isinstance(company_setting, dict) else {}
+
+        blocked_types = list(settings.get('block_types', DEFAULT_BLOCKED_TYPES)) + list(company.get('block_types', []))
+        blocked_domains = list(settings.get('block_domains', DEFAULT_BLOCKED_DOMAINS)) + list(company.get('block_domains', []))
+        allow_types = list(settings.get('allow_types', [])) + list(company.get('allow_types', []))
+        allow_domains = list(settings.get('allow_domains', [])) + list(company.get('allow_domains', []))
+        return cls(blocked_types, blocked_domains, allow_types, allow_domains)
+
+    @staticmethod
+    def _matches(host, domains):
+        return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+    def block_reason(self, resource_type, url):
+        """Return the reason to block a request ('tracker' or its resource type), or None"""
+        if not self.enabled:
+            return None
+        host = (urlparse(url).hostname or '').lower()
+        if self.allow_domains and self._matches(host, self.allow_domains):
+            return None
+        if self._matches(host, self.blocked_domains):
+            return 'tracker'
+        if resource_type in self.blocked_types:
+            return resource_type
+        return None
+
+
+class ResourceBlockingStats:
+    """Thread-safe counters of blocked requests across all contexts"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests_seen = 0
+        self.requests_blocked = 0
+        self.estimated_bytes_saved = 0
+        self.blocked_by_reason = {}
+
+    def record(self, resource_type, reason):
+        with self.lock:
+            self.requests_seen += 1
+            if reason is None:
+                return
+            self.requests_blocked += 1
+            self.estimated_bytes_saved += ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+            self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+
+    def summary(self):
+        with self.lock:
+            reasons = ", ".join(f"{reason}: {count}" for reason, count in sorted(self.blocked_by_reason.items()))
+            return (f"{self.requests_blocked}/{self.requests_seen} requests blocked, "
+                    f"~{self.estimated_bytes_saved / (1024 * 1024):.1f} MB saved" + (f" ({reasons})" if reasons else ""))
+
+
+BLOCKING_STATS = ResourceBlockingStats()
+
+
+def install_resource_blocking(context, policy, stats=BLOCKING_STATS):
+    """
+    Route every request of a sync Playwright context through the policy.
+    Returns the handler (pass it to remove_resource_blocking), or None if
+    the policy is disabled.
+    """
+    if not policy.enabled:
+        return None
+
+    def handle_route(route):
+        request = route.request
+        reason = policy.block_reason(request.resource_type, request.url)
+        stats.record(request.resource_type, reason)
+        if reason:
+            route.abort('blockedbyclient')
+        else:
+            route.continue_()
+
+    context.route("**/*", handle_route)
+    return handle_route
+
+
+def remove_resource_blocking(context, handler):
+    """Undo install_resource_blocking on a context that outlives one company"""
+    if handler is not None:
+        context.unroute("**/*", handler)
+
+
+async def install_resource_blocking_async(context, policy, stats=BLOCKING_STATS):
+    """Async Playwright counterpart of install_resource_blocking"""
+    if not policy.enabled:
+        return None
+
+    async def handle_route(route):
+        request = route.request
+        reason = policy.block_reason(request.resource_type, request.url)
+        stats.record(request.resource_type, reason)
+        if reason:
+            await route.abort('blockedbyclient')
+        else:
+            await route.continue_()
+
+    await context.route("**/*", handle_route)
+    return handle_route
@@ -0,0 +1,303 @@
+"""
+Search API Response Capture
+Build job records from a career site's own JSON search API instead of its DOM
+
+Single-page career sites (Eightfold, Microsoft careers, Oracle HCM, Workday)
+render their cards from a JSON search endpoint. ResponseCapture listens to
+page.on('response'), recognizes that endpoint by URL, reads jobs straight
+from its payload through a per-company JSON-path mapping and, once the
+request is known, pages through the API directly with the page's own
+cookies instead of clicking "next" and sleeping.
+
+Configured per company in the selectors file:
+
+    "api_capture": {
+        "url_pattern": "/api/apply/v2/jobs",       # regex searched in response URLs
+        "jobs_path": "positions",                  # dotted path to the list of jobs
+        "total_path": "count",                     # optional: total number of jobs
+        "fields": {                                # job field -> path (or list of fallback paths)
+            "title": "name",
+            "location": ["location", "locations.0"],
+            "apply_link": "canonicalPositionUrl"
+        },
+        "link_template": ".../job/{id}",           # optional: apply_link from top-level record keys
+        "pagination": {
+            "location": "query",                   # query | body (JSON post data) | url_regex
+            "param": "start",                      # query name, dotted body path, or regex with one group
+            "step": 10,                            # optional: offset increment (default: jobs per page)
+            "page_size_param": "num",              # optional: ask for bigger pages
+            "page_size": 100
+        }
+    }
+
+Paths are dot-separated keys; integer parts index into lists ("items.0.title").
+"""
+
+import re
+import sys
+import json
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+API_RESOURCE_TYPES = ('xhr', 'fetch')
+# Request headers that Playwright's APIRequestContext sets itself
+SKIPPED_REPLAY_HEADERS = {'content-length', 'host', 'cookie', 'accept-encoding', 'connection'}
+
+
+def get_json_path(data, path, default=None):
+    """Follow a dotted path (or the first matching of a list of paths) into parsed JSON"""
+    if isinstance(path, (list, tuple)):
+        for candidate in path:
+            value = get_json_path(data, candidate)
+            if value not in (None, '', []):
+                return value
+        return default
+
+    value = data
+    for part in str(path).split('.'):
+        if isinstance(value, list) and part.lstrip('-').isdigit():
+            index = int(part)
+            value = value[index] if -len(value) <= index < len(value) else None
+        elif isinstance(value, dict):
+            value = value.get(part)
+        else:
+            value = None
+        if value is None:
+            return default
+    return value
+
+
+def set_json_path(data, path, value):
+    """Set a dotted path inside a parsed JSON object, creating dicts on the way"""
+    parts = str(path).split('.')
+    target = data
+    for part in parts[:-1]:
+        target = target.setdefault(part, {})
+    target[parts[-1]] = value
+
+
+def replace_group(pattern, text, value):
+    """Put value in place of the first group of pattern's first match, leaving the rest of the match alone"""
+    def splice(match):
+        whole, start = match.group(0), match.start(0)
+        return whole[:match.start(1) - start] + value + whole[match.end(1) - start:]
+    return re.sub(pattern, splice, text, count=1)
+
+
+class _TemplateValues(dict):
+    """format_map() mapping that leaves unknown placeholders empty"""
+
+    def __missing__(self, key):
+        return ''
+
+
+def format_field(value):
+    """Flatten an API field value into the text the DOM scraper would have produced"""
+    if value is None or value == '':
+        return 'N/A'
+    if isinstance(value, list):
+        return ', '.join(format_field(item) for item in value if item not in (None, '')) or 'N/A'
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value).strip()
+
+
+class ResponseCapture:
+    """Captures and replays one company's search API on a sync Playwright page"""
+
+    def __init__(self, page, spec):
+        self.page = page
+        self.spec = spec
+        self.url_pattern = re.compile(spec['url_pattern'])
+        self.pagination = spec.get('pagination') or {}
+        self.responses = []   # candidate responses, parsed lazily by wait_for_payload()
+        self.request = None   # url, method, headers, post_data of the discovered API call
+        self.first_payload = None
+        self.stats = {'api_pages': 0, 'api_jobs': 0}
+
+    # ------------------------------------------------------------------
+    # Discovery
+    # ------------------------------------------------------------------
+
+    def attach(self):
+        """Start listening (call before navigating so the first search call is seen)"""
+        self.page.on('response', self._on_response)
+
+    def detach(self):
+        try:
+            self.page.remove_listener('response', self._on_response)
+        except Exception:
+            pass
+
+    def is_search_response(self, response):
+        return (response.request.resource_type in API_RESOURCE_TYPES
+                and response.ok and bool(self.url_pattern.search(response.url)))
+
+    def _on_response(self, response):
+        # Only remember it here; the body is read from the scraping thread's own flow
+        if self.is_search_response(response):
+            self.responses.append(response)
+
+    def wait_for_payload(self, timeout=15000):
+        """
+        Wait until a search API response with a job list has been captured.
+        Returns True once the API is discovered, False if it never showed up.
+        """
+        if self._parse_captured():
+            return True
+        try:
+            self.page.wait_for_event('response', predicate=self.is_search_response, timeout=timeout)
+        except Exception:
+            pass
+        return self._parse_captured()
+
+    def _parse_captured(self):
+        while self.responses and self.first_payload is None:
+            response = self.responses.pop(0)
+            try:
+                payload = response.json()
+            except Exception:
+                continue
+            if isinstance(get_json_path(payload, self.spec['jobs_path']), list):
+                request = response.request
+                self.request = {
+                    'url': request.url,
+                    'method': request.method,
+                    'headers': {key: value for key, value in request.headers.items()
+                                if key.lower() not in SKIPPED_REPLAY_HEADERS and not key.startswith(':')},
+                    'post_data': request.post_data
+                }
+                self.first_payload = payload
+        return self.first_payload is not None
+
+    # ------------------------------------------------------------------
+    # Direct paging
+    # ------------------------------------------------------------------
+
+    def _current_offset(self):
+        """Offset value of the discovered request (0 if it has none)"""
+        location = self.pagination.get('location', 'query')
+        param = self.pagination.get('param')
+        try:
+            if location == 'query':
+                return int(dict(parse_qsl(urlparse(self.request['url']).query)).get(param, 0))
+            if location == 'body':
+                return int(get_json_path(json.loads(self.request['post_data'] or '{}'), param, 0))
+            if location == 'url_regex':
+                match = re.search(param, self.request['url'])
+                return int(match.group(1)) if match else 0
+        except (TypeError, ValueError):
+            pass
+        return 0
+
+    def _build_request(self, offset, page_size=None):
+        """Copy of the discovered request asking for another offset (and page size)"""
+        location = self.pagination.get('location', 'query')
+        param = self.pagination.get('param')
+        size_param = self.pagination.get('page_size_param')
+        url, post_data = self.request['url'], self.request['post_data']
+
+        if location == 'query':
+            parsed = urlparse(url)
+            query = dict(parse_qsl(parsed.query, keep_blank_values=True))
+            query[param] = str(offset)
+            if size_param and page_size:
+                query[size_param] = str(page_size)
+            url = urlunparse(parsed._replace(query=urlencode(query)))
+        elif location == 'body':
+            body = json.loads(post_data or '{}')
+            set_json_path(body, param, offset)
+            if size_param and page_size:
+                set_json_path(body, size_param, page_size)
+            post_data = json.dumps(body)
+        elif location == 'url_regex':
+            url = replace_group(param, url, str(offset))
+            if size_param and page_size:
+                url = replace_group(size_param, url, str(page_size))
+        return url, post_data
+
+    def fetch_offset(self, offset, page_size=None):
+        """Request one page of the API directly, sharing the page's cookies"""
+        url, post_data = self._build_request(offset, page_size)
+        response = self.page.request.fetch(url, method=self.request['method'], headers=self.request['headers'],
+                                           data=post_data, timeout=30000)
+        if not response.ok:
+            raise RuntimeError(f"search API returned HTTP {response.status}")
+        return response.json()
+
+    def iter_pages(self, max_pages):
+        """
+        Yield (page_number, job records) for up to max_pages API pages: the
+        captured response first, then direct requests until a page comes back
+        empty or the reported total is reached.
+        """
+        if self.first_payload is None:
+            return
+        page_size = self.pagination.get('page_size') if self.pagination.get('page_size_param') else None
+        start = self._current_offset()
+        payload = self.first_payload
+
+        if page_size and self.pagination.get('param'):
+            # Re-read the first page at the larger page size
+            payload = self.fetch_offset(start, page_size)
+
+        records = get_json_path(payload, self.spec['jobs_path'], [])
+        total = get_json_path(payload, self.spec['total_path']) if self.spec.get('total_path') else None
+        step = self.pagination.get('step') or len(records) or 1
+        seen = 0
+
+        for page_number in range(1, max_pages + 1):
+            if not records:
+                return
+            self.stats['api_pages'] += 1
+            self.stats['api_jobs'] += len(records)
+            yield page_number, records
+            seen += len(records)
+
+            if not self.pagination.get('param') or (isinstance(total, int) and seen >= total):
+                return
+            payload = self.fetch_offset(start + page_number * step, page_size)
+            records = get_json_path(payload, self.spec['jobs_path'], [])
+
+    # ------------------------------------------------------------------
+    # Records
+    # ------------------------------------------------------------------
+
+    def build_job(self, record):
+        """Map one API record to the job fields the DOM scraper produces"""
+        job_data = {}
+        for field, path in (self.spec.get('fields') or {}).items():
+            job_data[field] = format_field(get_json_path(record, path))
+
+        link_template = self.spec.get('link_template')
+        if link_template and job_data.get('apply_link', 'N/A') == 'N/A' and isinstance(record, dict):
+            job_data['apply_link'] = link_template.format_map(_TemplateValues(record))
+
+        for field in ('title', 'location', 'posted_date', 'description', 'apply_link'):
+            job_data.setdefault(field, 'N/A')
+        return job_data
+
+
+def run_self_test():
+    """url_regex paging must only rewrite the captured digits"""
+    capture = ResponseCapture(None, {'url_pattern': 'search', 'jobs_path': 'jobs',
+                                     'pagination': {'location': 'url_regex', 'param': r'offset%3D(\d+)',
+                                                    'page_size_param': r'limit%3D(\d+)%3Blimit', 'page_size': 50}})
+    capture.request = {'url': 'https://jobs.example.com/search?q=offset%3D3%3Blimit%3D3%3Blimit', 'method': 'GET',
+                       'headers': {}, 'post_data': None}
+    url, _ = capture._build_request(1, 50)
+    checks = [
+        ("offset digits that also appear in the match", replace_group(r'offset%3D(\d+)', 'offset%3D3', '1') == 'offset%3D1'),
+        ("offset and page size spliced in", url == 'https://jobs.example.com/search?q=offset%3D1%3Blimit%3D50%3Blimit'),
+        ("current offset read back", capture._current_offset() == 3),
+    ]
+    failures = 0
+    for name, passed in checks:
+        print(f"{'✅' if passed else '❌'} {name}")
+        failures += not passed
+    return failures
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ['--self-test']:
+        sys.exit(1 if run_self_test() else 0)
+    print("usage: python response_capture.py --self-test")
@@ -0,0 +1,143 @@
+"""
+Streaming Result Sink
+Append-only JSONL (optionally gzip) output for scraped jobs
+
+Instead of holding every job of a session in memory and dumping one nested
+JSON document at the end, each enriched job is written as its own line the
+moment it leaves the pipeline. Per-company and per-session summaries follow
+as small records, so memory stays flat no matter how many jobs a run yields.
+
+Record types (one JSON object per line, tagged by "type"):
+    job            {"type": "job", "company": ..., "job": {...}}
+    gemini_error   {"type": "gemini_error", "company": ..., "job_title": ..., "error": ..., "raw_response": ...}
+    company        {"type": "company", "company": ..., <company entry without jobs>}
+    session        {"type": "session", <scraping_session block>}
+"""
+
+import gzip
+import json
+import threading
+
+JSONL_SUFFIXES = ('.jsonl', '.jsonl.gz')
+
+
+def is_jsonl_results_file(filename):
+    """True if filename is a streamed results file rather than a JSON document"""
+    return filename.endswith(JSONL_SUFFIXES)
+
+
+def open_results_file(filename, mode):
+    """Open a results file in text mode, transparently handling .gz"""
+    if filename.endswith('.gz'):
+        return gzip.open(filename, mode + 't', encoding='utf-8')
+    return open(filename, mode, encoding='utf-8')
+
+
+class JsonlResultSink:
+    """
+    Thread-safe JSONL writer shared by all pipeline batches.
+
+    The file is opened in append mode so a resumed session keeps writing to
+    the file of the interrupted run. Every record is flushed (a sync flush
+    for gzip) so a crash loses at most the record being written.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.file = open_results_file(filename, 'a')
+        self.counts = {'job': 0, 'gemini_error': 0, 'company': 0, 'session': 0}
+
+    def write_record(self, record):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+            self.counts[record['type']] = self.counts.get(record['type'], 0) + 1
+
+    def write_job(self, company_name, job):
+        """Write one finished job; fallback jobs go out as gemini_error records"""
+        if 'gemini_error' in job:
+            self.write_record({
+                'type': 'gemini_error',
+                'company': company_name,
+                'job_title': job.get('title', 'Unknown'),
+                'error': job['gemini_error'],
+                'raw_response': job.get('raw_gemini_response', '')
+            })
+        else:
+            self.write_record({'type': 'job', 'company': company_name, 'job': job})
+
+    def write_company(self, company_entry):
+        """Write a company summary (the company entry of the JSON format without its jobs)"""
+        record = {key: value for key, value in company_entry.items() if key != 'jobs'}
+        record['type'] = 'company'
+        self.write_record(record)
+
+    def write_session(self, session_block):
+        """Write the closing session summary"""
+        self.write_record(dict(session_block, type='session'))
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+
+def iter_result_records(filename):
+    """
+    Yield the records of a JSONL results file one at a time.
+
+    A torn last line (or a truncated gzip stream) from a crashed run ends the
+    iteration instead of failing the whole file.
+    """
+    with open_results_file(filename, 'r') as f:
+        try:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+        except EOFError:
+            print(f"⚠️ {filename} ends in a truncated gzip stream, stopping at the last complete record")
+
+
+def iter_result_jobs(filename):
+    """Yield (company_name, job) for every successfully enriched job in a JSONL results file"""
+    for record in iter_result_records(filename):
+        if record.get('type') == 'job':
+            yield record['company'], record['job']
+
+
+def load_results_document(filename):
+    """
+    Rebuild the nested {"scraping_session", "companies"} document from a
+    JSONL results file. Only meant for small tools (e.g. shard merging);
+    it holds the whole session in memory.
+    """
+    session = {}
+    companies = {}
+
+    for record in iter_result_records(filename):
+        record_type = record.pop('type', None)
+        if record_type == 'session':
+            session = record
+        elif record_type == 'company':
+            entry = companies.setdefault(record['company'], {'jobs': [], 'gemini_processing_errors': []})
+            entry.update({key: value for key, value in record.items() if key != 'gemini_processing_errors'})
+        elif record_type == 'job':
+            entry = companies.setdefault(record['company'], {'jobs': [], 'gemini_processing_errors': []})
+            entry['jobs'].append(record['job'])
+        elif record_type == 'gemini_error':
+            entry = companies.setdefault(record['company'], {'jobs': [], 'gemini_processing_errors': []})
+            entry['gemini_processing_errors'].append({
+                'job_title': record.get('job_title', 'Unknown'),
+                'error': record.get('error'),
+                'raw_response': record.get('raw_response', '')
+            })
+
+    return {'scraping_session': session, 'companies': companies}
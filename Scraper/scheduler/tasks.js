@@ -1,8 +1,62 @@
 // Graphile Worker tasks for ExiLead pipeline (separate scraping and database steps)
 const { spawn } = require('child_process');
+const net = require('net');
 const path = require('path');
 const fs = require('fs');
 
+// Send a run request to a warm scraper_daemon.py and stream its progress events.
+// Resolves with the final "completed" event, rejects on an "error" event or if no daemon is listening.
+function runViaDaemon(address, request, onEvent) {
+  return new Promise((resolve, reject) => {
+    const separator = address.lastIndexOf(':');
+    const host = separator > 0 ? address.slice(0, separator) : '127.0.0.1';
+    const port = parseInt(address.slice(separator + 1), 10);
+
+    const socket = net.createConnection({ host, port }, () => {
+      socket.write(JSON.stringify({ action: 'run', ...request }) + '\n');
+    });
+
+    let buffer = '';
+    let finished = false;
+    socket.setEncoding('utf8');
+    socket.on('data', (chunk) => {
+      buffer += chunk;
+      let newline;
+      while ((newline = buffer.indexOf('\n')) >= 0) {
+        const line = buffer.slice(0, newline).trim();
+        buffer = buffer.slice(newline + 1);
+        if (!line) continue;
+
+        let event;
+        try {
+          event = JSON.parse(line);
+        } catch (error) {
+          finished = true;
+          socket.destroy();
+          reject(new Error(`Malformed event from scraper daemon: ${line.slice(0, 200)}`));
+          return;
+        }
+        onEvent(event);
+        if (event.event === 'completed' || event.event === 'error') {
+          finished = true;
+          socket.end();
+          if (event.event === 'completed') {
+            resolve(event);
+          } else {
+            reject(new Error(event.error));
+          }
+        }
+      }
+    });
+    socket.on('error', (error) => {
+      if (!finished) reject(error);
+    });
+    socket.on('close', () => {
+      if (!finished) reject(new Error('Scraper daemon closed the connection before the run finished'));
+    });
+  });
+}
+
 // Task 1: Run Final_Scraper.py to scrape jobs
 async function runFinalScraper(payload, helpers) {
   const { job, withPgClient, addJob } = helpers;
@@ -29,6 +83,59 @@ async function runFinalScraper(payload, helpers) {
       throw error;
     }
 
+    // Prefer a warm scraper daemon when one is configured; fall back to spawning Final_Scraper.py
+    if (process.env.SCRAPER_DAEMON_ADDR) {
+      try {
+        console.log(`🛰️ Dispatching run to scraper daemon at ${process.env.SCRAPER_DAEMON_ADDR}`);
+        const progressLog = [];
+        const summary = await runViaDaemon(process.env.SCRAPER_DAEMON_ADDR, {
+          companies_file: payload && payload.companies_file,
+          companies: payload && payload.companies
+        }, (event) => {
+          progressLog.push(JSON.stringify(event));
+          if (event.event === 'company_done') {
+            console.log(`🏢 [DAEMON] ${event.company}: ${event.status}, ${event.jobs} jobs (${event.done}/${event.total})`);
+          }
+        });
+
+        await client.query(`
+          UPDATE scheduler_runs 
+          SET finished_at = NOW(),
+              status = 'success',
+              output = $1,
+              duration_seconds = EXTRACT(EPOCH FROM (NOW() - started_at))
+          WHERE id = $2
+        `, [progressLog.join('\n'), jobRunId]);
+
+        console.log(`📁 [WORKER] Results file: ${summary.results_file}`);
+        await addJob('runDatabasePipeline', {
+          resultsFile: summary.results_file,
+          scraperJobId: job.id
+        });
+        console.log('📊 [WORKER] Database pipeline job queued successfully');
+        return {
+          status: 'success',
+          resultsFile: summary.results_file,
+          nextJob: 'runDatabasePipeline'
+        };
+      } catch (error) {
+        if (error.code !== 'ECONNREFUSED') {
+          await client.query(`
+            UPDATE scheduler_runs 
+            SET finished_at = NOW(),
+                status = 'error',
+                error_message = $1,
+                duration_seconds = EXTRACT(EPOCH FROM (NOW() - started_at))
+            WHERE id = $2
+          `, [error.message, jobRunId]).catch((updateError) => {
+            console.error('❌ [WORKER] Failed to update job run record:', updateError);
+          });
+          throw error;
+        }
+        console.log('⚠️ [WORKER] Scraper daemon not reachable, spawning Final_Scraper.py instead');
+      }
+    }
+
     return new Promise((resolve, reject) => {
       // Path to the Final_Scraper.py
       const scraperPath = path.join(process.env.SCRAPER_PATH || 'C:\\Programs\\ExiLead\\Scraper', 'Final_Scraper.py');
@@ -69,7 +176,7 @@ async function runFinalScraper(payload, helpers) {
         process.stdout.write(output);
         
         // Look for results file creation
-        const resultsMatch = output.match(/Results saved to: ([^\n]+\.json)/);
+        const resultsMatch = output.match(/Results saved to: ([^\r\n]+\.json(?:l(?:\.gz)?)?)/);
         if (resultsMatch) {
           resultsFile = resultsMatch[1];
           console.log(`\n📁 [WORKER] Results file detected: ${resultsFile}\n`);
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Warm Scraper Daemon for Final_Scraper
+Keeps browsers, the job pipeline and all clients resident between runs
+
+Instead of spawning `python Final_Scraper.py` for every scheduled run (and
+paying for imports, Chromium start-up and selector parsing each time), the
+daemon starts one BrowserWorkerPool and one JobPipeline and serves run
+requests against them. A request can scrape the whole selectors file or
+just a few companies, so frequent small refreshes become cheap.
+
+Run requests arrive through either transport:
+  - a local TCP socket speaking JSON lines (one request line in, progress
+    event lines out, ending with a "completed" or "error" event)
+  - the scraper_run_requests Postgres table, claimed with
+    FOR UPDATE SKIP LOCKED and updated with progress as companies finish
+
+Usage:
+    python scraper_daemon.py                          # listen on SCRAPER_DAEMON_ADDR (127.0.0.1:8765)
+    python scraper_daemon.py --poll-db                # also serve the Postgres request table
+    python scraper_daemon.py --submit --company Amazon --company Nokia
+"""
+
+import os
+import json
+import time
+import socket
+import threading
+import socketserver
+from datetime import datetime
+from concurrent.futures import as_completed
+
+import psycopg2
+from dotenv import load_dotenv
+
+from apply_link_index import get_shared_index
+from enrichment_backends import close_shared_enrichment_backend
+from db_pool import pooled_connection
+from Final_Scraper import (
+    safe_print, GLOBAL_CONFIG, COMPANIES_CONFIG_FILE, BrowserWorkerPool, CheckpointJournal,
+    create_job_pipeline, load_companies_config, parse_shard_spec, select_shard, build_session_id,
+    build_results_filename, open_result_sink, count_result_jobs, print_session_summary, finish_session
+)
+
+load_dotenv()
+
+DEFAULT_DAEMON_ADDR = "127.0.0.1:8765"
+DEFAULT_POLL_INTERVAL = 5  # Seconds between polls of the request table
+
+RUN_REQUESTS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS scraper_run_requests (
+    id SERIAL PRIMARY KEY,
+    request JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    progress JSONB,
+    results_file TEXT,
+    error_message TEXT,
+    created_at TIMESTAMP DEFAULT NOW(),
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+)
+"""
+
+
+def parse_address(address):
+    """Split 'host:port' into (host, port)"""
+    host, _, port = (address or DEFAULT_DAEMON_ADDR).rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+class SelectorCache:
+    """Companies files parsed once and reloaded only when their mtime changes"""
+
+    def __init__(self):
+        self.entries = {}  # filename -> (mtime, companies)
+        self.lock = threading.Lock()
+
+    def get(self, filename):
+        mtime = os.path.getmtime(filename)
+        with self.lock:
+            cached = self.entries.get(filename)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+        companies = load_companies_config(filename)
+        if companies is None:
+            raise ValueError(f"Could not load companies file: {filename}")
+        with self.lock:
+            self.entries[filename] = (mtime, companies)
+        return companies
+
+
+class ScraperDaemon:
+    """
+    Resident scraper serving run requests against one warm worker pool.
+
+    Runs may overlap: their companies share the pool's queue and the per-host
+    politeness budget, while each run keeps its own checkpoint journal and
+    results file.
+    """
+
+    def __init__(self, worker_count=None):
+        self.pipeline = create_job_pipeline()
+        self.pool = BrowserWorkerPool(worker_count or GLOBAL_CONFIG['max_workers'], self.pipeline)
+        self.selectors = SelectorCache()
+        self.start_lock = threading.Lock()
+        self.last_session_second = None
+        self.active_runs = 0
+        self.completed_runs = 0
+
+    def start(self):
+        self.pipeline.start()
+        self.pool.start()
+        safe_print("✅ Scraper daemon is warm and ready for run requests")
+
+    def close(self):
+        self.pool.close()
+        self.pipeline.close()
+        # Stops the Gemini client thread and its HTTP session
+        close_shared_enrichment_backend()
+
+    def _allocate_start_time(self):
+        """
+        Session ids (and results file names) have one-second resolution, so two
+        runs accepted within the same second would collide; wait for the next one.
+        """
+        with self.start_lock:
+            while True:
+                start_time = datetime.now()
+                second = start_time.strftime('%Y%m%d_%H%M%S')
+                if second != self.last_session_second:
+                    self.last_session_second = second
+                    return start_time
+                time.sleep(0.05)
+
+    def select_companies(self, request):
+        """Resolve a run request into (companies_file, company configs, shard)"""
+        companies_file = request.get('companies_file') or COMPANIES_CONFIG_FILE
+        companies_config = self.selectors.get(companies_file)
+
+        wanted = request.get('companies')
+        if wanted:
+            wanted_names = {name.lower() for name in wanted}
+            companies_config = [c for c in companies_config if c.get('company', '').lower() in wanted_names]
+
+        shard = parse_shard_spec(request['shard']) if request.get('shard') else None
+        if shard:
+            companies_config = select_shard(companies_config, *shard)
+
+        return companies_file, companies_config, shard
+
+    def execute_run(self, request, report):
+        """
+        Scrape the companies of one run request.
+
+        report(event) is called with progress dicts: "accepted", one
+        "company_done" per finished company and a final "completed".
+        """
+        companies_file, companies_config, shard = self.select_companies(request)
+        if not companies_config:
+            raise ValueError("Run request matched no companies")
+
+        result_format = request.get('format') or GLOBAL_CONFIG['result_format']
+        # Reloads the known apply links if the resident copy has gone stale
+        get_shared_index(GLOBAL_CONFIG['apply_link_index_max_age'])
+        overall_start_time = self._allocate_start_time()
+        session_id = build_session_id(overall_start_time, shard)
+        checkpoint = CheckpointJournal(session_id, GLOBAL_CONFIG['checkpoint_dir'], store_jobs=result_format == 'json')
+        checkpoint.record_session(overall_start_time, companies_file, shard)
+        filename = build_results_filename(overall_start_time, shard, result_format)
+        result_sink = open_result_sink(filename, result_format)
+
+        with self.start_lock:
+            self.active_runs += 1
+        try:
+            report({'event': 'accepted', 'session_id': session_id, 'companies': len(companies_config),
+                    'results_file': filename})
+
+            futures = [self.pool.submit(company_config, overall_start_time, checkpoint, result_sink)
+                       for company_config in companies_config]
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                report({'event': 'company_done', 'session_id': session_id, 'company': result['company_name'],
+                        'status': result['status'], 'jobs': count_result_jobs(result)[0],
+                        'done': done, 'total': len(futures)})
+
+            all_results = [future.result() for future in futures]
+            overall_end_time = datetime.now()
+            print_session_summary(all_results, overall_start_time, overall_end_time)
+            saved = finish_session(all_results, overall_start_time, overall_end_time, filename, shard, checkpoint, result_sink)
+            result_sink = None
+            if not saved:
+                raise RuntimeError(f"Failed to save results for {session_id}, checkpoint kept at {checkpoint.path}")
+
+            safe_print(f"\n✅ Results saved to: {filename}")
+            summary = {'event': 'completed', 'session_id': session_id, 'results_file': os.path.abspath(filename),
+                       'companies': len(all_results), 'jobs': sum(count_result_jobs(r)[0] for r in all_results),
+                       'failed_companies': len([r for r in all_results if r['status'] == 'failed'])}
+            report(summary)
+            with self.start_lock:
+                self.completed_runs += 1
+            return summary
+        finally:
+            if result_sink:
+                result_sink.close()
+            checkpoint.close()
+            with self.start_lock:
+                self.active_runs -= 1
+
+    def status(self):
+        return {'event': 'status', 'workers': self.pool.worker_count, 'active_runs': self.active_runs,
+                'completed_runs': self.completed_runs}
+
+    # ------------------------------------------------------------------
+    # Transport: local TCP socket (JSON lines)
+    # ------------------------------------------------------------------
+
+    def serve_socket(self, address):
+        """Serve run requests on a local TCP socket until interrupted"""
+        daemon = self
+
+        class RunRequestHandler(socketserver.StreamRequestHandler):
+            def send(self, event):
+                # A client that hung up must not abort the run it started
+                try:
+                    self.wfile.write((json.dumps(event, default=str) + "\n").encode('utf-8'))
+                    self.wfile.flush()
+                except OSError:
+                    pass
+
+            def handle(self):
+                for line in self.rfile:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        request = json.loads(line)
+                        action = request.get('action', 'run')
+                        if action == 'ping':
+                            self.send({'event': 'pong'})
+                        elif action == 'status':
+                            self.send(daemon.status())
+                        elif action == 'run':
+                            daemon.execute_run(request, self.send)
+                        else:
+                            self.send({'event': 'error', 'error': f"Unknown action: {action}"})
+                    except Exception as e:
+                        safe_print(f"❌ Run request failed: {e}")
+                        self.send({'event': 'error', 'error': str(e)})
+
+        class ThreadingServer(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        host, port = parse_address(address)
+        with ThreadingServer((host, port), RunRequestHandler) as server:
+            safe_print(f"🛰️ Listening for run requests on {host}:{port}")
+            server.serve_forever()
+
+    # ------------------------------------------------------------------
+    # Transport: Postgres request table
+    # ------------------------------------------------------------------
+
+    def poll_database(self, poll_interval=DEFAULT_POLL_INTERVAL, stop_event=None):
+        """Claim and execute pending rows of scraper_run_requests until stopped"""
+        database_url = os.getenv('DATABASE_URL')
+        if not database_url:
+            safe_print("⚠️ DATABASE_URL not found, request table polling disabled")
+            return
+
+        table_ready = False
+        while not (stop_event and stop_event.is_set()):
+            try:
+                # Each iteration borrows a pooled connection, so a dropped server
+                # connection is replaced by the pool's health check on the next claim
+                with pooled_connection(autocommit=True) as conn:
+                    if not table_ready:
+                        with conn.cursor() as cursor:
+                            cursor.execute(RUN_REQUESTS_TABLE_SQL)
+                        table_ready = True
+                        safe_print("🗄️ Polling scraper_run_requests for run requests")
+
+                    claimed = self._claim_request(conn)
+                    if claimed is not None:
+                        self._execute_claimed_request(conn, *claimed)
+
+                if claimed is None:
+                    time.sleep(poll_interval)
+
+            except psycopg2.Error as e:
+                safe_print(f"⚠️ Request table polling error: {e}")
+                time.sleep(poll_interval)
+
+    def _claim_request(self, conn):
+        """Atomically move the oldest pending request to running; returns (id, request) or None"""
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                UPDATE scraper_run_requests
+                SET status = 'running', started_at = NOW()
+                WHERE id = (
+                    SELECT id FROM scraper_run_requests
+                    WHERE status = 'pending'
+                    ORDER BY created_at
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT 1
+                )
+                RETURNING id, request
+            """)
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        request_id, request = row
+        if isinstance(request, str):
+            request = json.loads(request)
+        return request_id, request or {}
+
+    def _execute_claimed_request(self, conn, request_id, request):
+        safe_print(f"📥 Claimed run request #{request_id}: {request}")
+        progress_errors = []
+
+        def report(event):
+            # Progress is informational; losing an update must not abort the run
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("UPDATE scraper_run_requests SET progress = %s WHERE id = %s",
+                                   (json.dumps(event, default=str), request_id))
+            except psycopg2.Error as e:
+                if not progress_errors:
+                    safe_print(f"⚠️ Could not record progress of run request #{request_id}: {e}")
+                progress_errors.append(e)
+
+        try:
+            summary = self.execute_run(request, report)
+        except Exception as e:
+            safe_print(f"❌ Run request #{request_id} failed: {e}")
+            self._finish_request(conn, request_id, 'failed', error_message=str(e))
+            return
+        self._finish_request(conn, request_id, 'completed', results_file=summary['results_file'])
+
+    def _finish_request(self, conn, request_id, status, results_file=None, error_message=None):
+        """
+        Record the outcome of a claimed request. If conn has failed, the
+        update is retried on a fresh pooled connection, since nothing else
+        ever moves a request out of 'running'.
+        """
+        sql = """
+            UPDATE scraper_run_requests
+            SET status = %s, results_file = %s, error_message = %s, finished_at = NOW()
+            WHERE id = %s
+        """
+        params = (status, results_file, error_message, request_id)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(sql, params)
+            return
+        except psycopg2.Error as e:
+            safe_print(f"⚠️ Could not mark run request #{request_id} {status}, retrying on a new connection: {e}")
+        with pooled_connection(autocommit=True) as fresh_conn:
+            with fresh_conn.cursor() as cursor:
+                cursor.execute(sql, params)
+
+
+def send_run_request(request, address=None, on_event=None, timeout=None):
+    """
+    Send one request to a running daemon and return its final event.
+
+    on_event(event) is called for every progress event. Raises
+    ConnectionRefusedError if no daemon is listening.
+    """
+    host, port = parse_address(address or os.getenv('SCRAPER_DAEMON_ADDR'))
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall((json.dumps(request) + "\n").encode('utf-8'))
+        with sock.makefile('r', encoding='utf-8') as stream:
+            for line in stream:
+                event = json.loads(line)
+                if on_event:
+                    on_event(event)
+                if event.get('event') in ('completed', 'error', 'pong', 'status'):
+                    return event
+    raise ConnectionError("Daemon closed the connection before the run finished")
+
+
+def main():
+    """Main function with command line interface"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Warm scraper daemon for Final_Scraper')
+    parser.add_argument('--listen', default=os.getenv('SCRAPER_DAEMON_ADDR', DEFAULT_DAEMON_ADDR),
+                        help='host:port for run requests (default: SCRAPER_DAEMON_ADDR or %s)' % DEFAULT_DAEMON_ADDR)
+    parser.add_argument('--poll-db', action='store_true', help='Also serve run requests from the scraper_run_requests table')
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL, help='Seconds between request table polls')
+    parser.add_argument('--workers', type=int, help='Number of concurrent browser workers')
+    parser.add_argument('--submit', action='store_true', help='Send a run request to a running daemon instead of starting one')
+    parser.add_argument('--companies-file', help='Companies JSON file for --submit (default: daemon default)')
+    parser.add_argument('--company', action='append', help='Only scrape this company (repeatable) for --submit')
+    parser.add_argument('--status', action='store_true', help='Show the status of a running daemon')
+
+    args = parser.parse_args()
+
+    if args.submit or args.status:
+        request = {'action': 'status'} if args.status else {'action': 'run', 'companies_file': args.companies_file,
+                                                            'companies': args.company}
+        try:
+            final_event = send_run_request(request, args.listen, on_event=lambda event: print(json.dumps(event)))
+        except ConnectionRefusedError:
+            safe_print(f"❌ No scraper daemon listening on {args.listen}")
+            raise SystemExit(1)
+        raise SystemExit(0 if final_event.get('event') != 'error' else 1)
+
+    daemon = ScraperDaemon(args.workers)
+    daemon.start()
+    stop_event = threading.Event()
+    try:
+        if args.poll_db:
+            threading.Thread(target=daemon.poll_database, args=(args.poll_interval, stop_event),
+                             name='request-table-poller', daemon=True).start()
+        daemon.serve_socket(args.listen)
+    except KeyboardInterrupt:
+        safe_print("\n🛑 Shutting down scraper daemon")
+    finally:
+        stop_event.set()
+        daemon.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -46,6 +46,14 @@ export const jobs = pgTable("jobs", {
   scrapedAt: timestamp("scraped_at"),
   jobDetailsInfo: text("job_details_info"), // Full HTML content from job page
   
+  // Deferred enrichment queue (see Scraper/enrichment_worker.py)
+  enrichmentStatus: text("enrichment_status").notNull().default("enriched"), // pending, processing, enriched, failed
+  enrichmentAttempts: integer("enrichment_attempts").notNull().default(0),
+  enrichmentError: text("enrichment_error"),
+  enrichmentClaimedAt: timestamp("enrichment_claimed_at"),
+  enrichmentNotBefore: timestamp("enrichment_not_before"), // retry backoff after a failed attempt
+  rawJob: jsonb("raw_job"),
+  
   createdAt: timestamp("created_at").defaultNow(),
 });
 